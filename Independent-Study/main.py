@@ -41,6 +41,9 @@ class Config:
     JWT_ALGORITHM = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES = 30
     CORS_ORIGINS = os.getenv("CORS_ORIGINS", "*").split(",")
+    GITHUB_TIMEOUT = float(os.getenv("GITHUB_TIMEOUT", "10"))
+    GITHUB_MAX_CONNECTIONS = int(os.getenv("GITHUB_MAX_CONNECTIONS", "10"))
+    GITHUB_MAX_KEEPALIVE = int(os.getenv("GITHUB_MAX_KEEPALIVE", "5"))
 
 # Database setup
 Base = declarative_base()
@@ -138,20 +141,54 @@ async def verify_token(credentials: HTTPAuthorizationCredentials = Security(secu
         )
 
 # GitHub integration
+# One pooled client for the app's lifetime so GitHub connections are reused
+github_client: Optional[httpx.AsyncClient] = None
+
+def create_github_client() -> httpx.AsyncClient:
+    try:
+        import h2  # noqa: F401
+        http2 = True
+    except ImportError:
+        http2 = False
+    return httpx.AsyncClient(
+        base_url="https://api.github.com",
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=Config.GITHUB_MAX_CONNECTIONS,
+            max_keepalive_connections=Config.GITHUB_MAX_KEEPALIVE,
+            keepalive_expiry=30.0
+        ),
+        timeout=httpx.Timeout(Config.GITHUB_TIMEOUT, connect=5.0)
+    )
+
+@app.on_event("startup")
+async def open_github_client():
+    global github_client
+    github_client = create_github_client()
+
+@app.on_event("shutdown")
+async def close_github_client():
+    global github_client
+    if github_client is not None:
+        await github_client.aclose()
+        github_client = None
+
 async def fetch_file_from_github(owner: str, repo: str, file_path: str) -> str:
-    url = f"https://api.github.com/repos/{owner}/{repo}/contents/{file_path}"
+    global github_client
+    if github_client is None:
+        github_client = create_github_client()
+    url = f"/repos/{owner}/{repo}/contents/{file_path}"
     headers = {"Authorization": f"token {Config.GITHUB_TOKEN}"}
-    
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(url, headers=headers)
-            response.raise_for_status()
-        except httpx.HTTPError as e:
-            logger.error(f"GitHub API error: {str(e)}")
-            if response.status_code == 404:
-                raise HTTPException(status_code=404, detail="File or repository not found")
-            raise HTTPException(status_code=500, detail="Failed to fetch file from GitHub")
-    
+
+    try:
+        response = await github_client.get(url, headers=headers)
+        response.raise_for_status()
+    except httpx.HTTPError as e:
+        logger.error(f"GitHub API error: {str(e)}")
+        if isinstance(e, httpx.HTTPStatusError) and e.response.status_code == 404:
+            raise HTTPException(status_code=404, detail="File or repository not found")
+        raise HTTPException(status_code=500, detail="Failed to fetch file from GitHub")
+
     content = response.json()["content"]
     return base64.b64decode(content).decode("utf-8")
 
@@ -10,6 +10,80 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = "AI Deception Framework"
     BACKEND_CORS_ORIGINS: List[str] = ["*"]
     LITERARY_VAULT_BASE_URL: str = "https://exios66.github.io/Literary-Vault/api/v1"
+    # Pooled keep-alive connections to Literary Vault; HTTP/2 when h2 is installed
+    LITERARY_VAULT_HTTP2: bool = True
+    LITERARY_VAULT_TIMEOUT: float = 10.0
+    LITERARY_VAULT_CONNECT_TIMEOUT: float = 5.0
+    LITERARY_VAULT_MAX_CONNECTIONS: int = 20
+    LITERARY_VAULT_MAX_KEEPALIVE: int = 10
+    LITERARY_VAULT_KEEPALIVE_EXPIRY: float = 30.0
+    # Local copy of each category's questions: served fresh for the TTL, then
+    # stale while revalidating with ETag/Last-Modified, and stale when the
+    # upstream fails
+    LITERARY_VAULT_CACHE_TTL: float = 300
+    LITERARY_VAULT_STALE_WHILE_REVALIDATE: float = 3600
+    LITERARY_VAULT_STALE_IF_ERROR: float = 24 * 3600
+    # SQLite snapshot of every category (init_db.py layout) loaded at startup
+    # and synced in the background every interval (0 syncs once); empty disables
+    LITERARY_VAULT_SNAPSHOT_PATH: str = "literary_vault.db"
+    LITERARY_VAULT_SYNC_INTERVAL: float = 3600
+    LITERARY_VAULT_SYNC_CONCURRENCY: int = 4
+
+    # Executor for CPU-bound analysis: "thread" or "process"
+    EXECUTOR_KIND: str = "thread"
+    # 0 uses one worker per CPU
+    EXECUTOR_MAX_WORKERS: int = 0
+    EXECUTOR_MAX_QUEUE: int = 64
+
+    # Model uploads are hashed and spooled in chunks; larger uploads go to disk
+    UPLOAD_CHUNK_SIZE: int = 1 << 20
+    UPLOAD_SPOOL_MAX_MEMORY: int = 8 << 20
+    # Empty uses the system temporary directory
+    UPLOAD_DIR: str = ""
+
+    # Resumable chunked uploads; partial files and their state survive restarts
+    RESUMABLE_UPLOAD_DIR: str = "uploads"
+    RESUMABLE_UPLOAD_DB_PATH: str = "uploads.db"
+    RESUMABLE_UPLOAD_CHUNK_SIZE: int = 8 << 20
+    RESUMABLE_UPLOAD_MAX_SIZE: int = 64 << 30
+    RESUMABLE_UPLOAD_TTL: float = 7 * 24 * 3600
+
+    # Worker processes for per-layer analysis of spooled models at least
+    # ANALYSIS_PARALLEL_MIN_BYTES large; 0 uses one per CPU, 1 disables
+    ANALYSIS_LAYER_WORKERS: int = 0
+    ANALYSIS_PARALLEL_MIN_BYTES: int = 64 << 20
+
+    # Model analysis results, cached by upload SHA-256; empty keeps them in memory only
+    ANALYSIS_CACHE_PATH: str = "analysis_cache.db"
+    ANALYSIS_CACHE_SIZE: int = 10000
+    ANALYSIS_CACHE_TTL: float = 30 * 24 * 3600
+    # Per-layer statistics by upload SHA-256, reused by analyses and diffs
+    ANALYSIS_LAYER_CACHE_PATH: str = "analysis_layers.db"
+    ANALYSIS_LAYER_CACHE_SIZE: int = 10000
+    # Fingerprints of analyzed models for nearest-neighbour lookups; empty disables
+    SIMILARITY_INDEX_PATH: str = "analysis_similarity.db"
+    # Indexes up to this many models are scanned exactly, larger ones via SimHash buckets
+    SIMILARITY_BRUTE_FORCE_LIMIT: int = 50000
+
+    # Detection
+    DETECTION_STREAM_CHUNK_SIZE: int = 256
+    # Micro-batching of concurrent /analyze calls; a window of 0 disables it
+    DETECTION_BATCH_WINDOW_MS: float = 5.0
+    DETECTION_BATCH_MAX_SIZE: int = 64
+    DETECTION_CACHE_SIZE: int = 100000
+    DETECTION_CACHE_TTL: float = 7 * 24 * 3600
+    # Empty keeps the cache in memory only
+    DETECTION_CACHE_PATH: str = ""
+    # Per-chunk feature cache for long documents
+    DOCUMENT_CHUNK_CACHE_SIZE: int = 200000
+    DOCUMENT_CHUNK_CACHE_PATH: str = ""
+
+    # Asynchronous question-set jobs
+    JOBS_DB_PATH: str = "jobs.db"
+    JOBS_WORKERS: int = 2
+    JOBS_CHUNK_SIZE: int = 500
+    JOBS_LEASE_SECONDS: float = 60
+    JOBS_POLL_INTERVAL: float = 0.5
     
     # API Keys and Secrets
     GITHUB_TOKEN: str = os.getenv("GITHUB_TOKEN", "")
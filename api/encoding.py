@@ -0,0 +1,75 @@
+"""
+Response encoding with content negotiation. Routers hand already-built models
+to encoded_response, which serializes them once with the fastest available
+encoder instead of letting FastAPI re-validate them against response_model.
+"""
+import json
+from enum import Enum
+from typing import Any
+
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+def to_builtins(content: Any) -> Any:
+    """
+    Convert models (and containers of models) into JSON-compatible builtins
+    """
+    if isinstance(content, BaseModel):
+        return content.model_dump(mode="json")
+    if isinstance(content, dict):
+        return {key: to_builtins(value) for key, value in content.items()}
+    if isinstance(content, (list, tuple)):
+        return [to_builtins(value) for value in content]
+    if isinstance(content, Enum):
+        return content.value
+    return content
+
+def _orjson_default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+def dumps_json(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_orjson_default)
+    return json.dumps(to_builtins(content), separators=(",", ":")).encode("utf-8")
+
+class FastJSONResponse(Response):
+    media_type = JSON_MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
+
+class MsgPackResponse(Response):
+    media_type = MSGPACK_MEDIA_TYPES[0]
+
+    def render(self, content: Any) -> bytes:
+        return msgpack.packb(to_builtins(content), use_bin_type=True)
+
+def wants_msgpack(request: Request) -> bool:
+    if msgpack is None:
+        return False
+    accept = request.headers.get("accept", "")
+    return any(media_type in accept for media_type in MSGPACK_MEDIA_TYPES)
+
+def encoded_response(request: Request, content: Any, status_code: int = 200) -> Response:
+    """
+    Encode content as MessagePack when the client accepts it, else JSON
+    """
+    if wants_msgpack(request):
+        return MsgPackResponse(content, status_code=status_code)
+    return FastJSONResponse(content, status_code=status_code)
@@ -1,7 +1,8 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from .routers import analysis, detection, literary_vault
+from .routers import analysis, detection, jobs, literary_vault, uploads
+from .services.executor import get_executor, get_layer_executor
 import logging
 import os
 from dotenv import load_dotenv
@@ -34,7 +35,9 @@ app.add_middleware(
 
 # Include routers
 app.include_router(analysis.router, prefix="/api/v1/analysis", tags=["analysis"])
+app.include_router(uploads.router, prefix="/api/v1/analysis/uploads", tags=["analysis"])
 app.include_router(detection.router, prefix="/api/v1/detection", tags=["detection"])
+app.include_router(jobs.router, prefix="/api/v1/detection/jobs", tags=["jobs"])
 app.include_router(literary_vault.router, prefix="/api/v1/literary-vault", tags=["literary-vault"])
 
 # Mount static files
@@ -46,4 +49,49 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"} 
\ No newline at end of file
+    return {"status": "healthy"}
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Report executor queue depth and wait times for capacity planning
+    """
+    layer_executor = get_layer_executor()
+    return {
+        "executor": get_executor().stats(),
+        "layer_executor": layer_executor.stats() if layer_executor is not None else None,
+    }
+
+@app.on_event("startup")
+async def start_job_workers():
+    jobs.workers.start()
+
+@app.on_event("startup")
+async def open_http_clients():
+    await literary_vault.client.start()
+    await literary_vault.warm_start()
+
+@app.on_event("shutdown")
+async def shutdown_workers():
+    await jobs.workers.stop()
+    get_executor().shutdown()
+    layer_executor = get_layer_executor()
+    if layer_executor is not None:
+        layer_executor.shutdown()
+
+@app.on_event("shutdown")
+async def close_result_caches():
+    # Writes back the recency of entries read from disk since the last write
+    for cache in (
+        detection.detector.cache, detection.detector.chunk_cache,
+        analysis.model_analyzer.cache, analysis.model_analyzer.layer_cache
+    ):
+        if cache is not None:
+            cache.close()
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    if literary_vault.snapshot is not None:
+        await literary_vault.snapshot.stop()
+    await literary_vault.client.close()
+ 
\ No newline at end of file
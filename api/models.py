@@ -9,9 +9,13 @@ class ModelType(str, Enum):
     OTHER = "other"
 
 class AnalysisRequest(BaseModel):
-    model_data: bytes = Field(..., description="Binary model data")
+    model_data: Optional[bytes] = Field(None, description="Binary model data")
+    model_path: Optional[str] = Field(None, description="Path to a spooled model file")
     model_type: ModelType
+    model_format: Optional[str] = Field(None, description="Reader format, e.g. npz or safetensors")
     description: Optional[str] = None
+    sha256: Optional[str] = None
+    size: Optional[int] = None
 
 class AnalysisResponse(BaseModel):
     model_type: ModelType
@@ -20,6 +24,63 @@ class AnalysisResponse(BaseModel):
     recommendation: str
     confidence_score: float
 
+class LayerDiff(BaseModel):
+    name: str
+    shape: List[int]
+    relative_l2: Optional[float] = Field(..., description="||candidate - base|| / ||base||; null if the base layer is all zeros")
+    cosine_similarity: float
+    max_abs_delta: float
+    changed_fraction: float
+    mean_shift: Optional[float] = Field(..., description="Change in mean, in base standard deviations")
+    std_ratio: Optional[float]
+    sparsity_delta: float
+
+class ModelDiffResponse(BaseModel):
+    base_sha256: Optional[str] = None
+    candidate_sha256: Optional[str] = None
+    compared_layers: int
+    unchanged_layers: int
+    changed_layers: List[LayerDiff]
+    added_layers: List[str]
+    removed_layers: List[str]
+    reshaped_layers: List[str]
+    distribution_shifts: List[str]
+
+class SimilarModel(BaseModel):
+    sha256: str
+    model_type: Optional[ModelType] = None
+    # Cosine similarity of the two models' fingerprints, in [-1, 1]
+    similarity: float
+
+class SimilarModelsResponse(BaseModel):
+    sha256: str
+    indexed_models: int
+    neighbours: List[SimilarModel]
+
+class ResumableUploadRequest(BaseModel):
+    size: int = Field(..., gt=0, description="Total size of the model file in bytes")
+    filename: Optional[str] = None
+    sha256: Optional[str] = Field(None, pattern="^[0-9a-fA-F]{64}$", description="Expected SHA-256 of the whole file")
+    chunk_size: Optional[int] = Field(None, ge=64 << 10, le=256 << 20)
+
+class ResumableUploadStatus(BaseModel):
+    upload_id: str
+    filename: Optional[str] = None
+    size: int
+    chunk_size: int
+    total_chunks: int
+    received_chunks: int
+    missing_chunks: List[int]
+    status: str
+    created_at: float
+    updated_at: float
+
+class UploadChunkReceipt(BaseModel):
+    upload_id: str
+    index: int
+    size: int
+    sha256: str
+
 class DeceptionDetectionRequest(BaseModel):
     content: str = Field(..., min_length=1, max_length=10000)
     context: Optional[str] = None
@@ -30,6 +91,42 @@ class DeceptionDetectionResponse(BaseModel):
     issues: List[str]
     recommendations: List[str]
 
+class DocumentDetectionRequest(BaseModel):
+    content: str = Field(..., min_length=1, max_length=5_000_000)
+    context: Optional[str] = None
+
+class DocumentDetectionResponse(DeceptionDetectionResponse):
+    chunks: int
+    reused_chunks: int
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: JobStatus
+    total: int
+    processed: int
+    progress: float
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
+
+class JobResult(DeceptionDetectionResponse):
+    index: int
+
+class JobResultsPage(BaseModel):
+    job_id: str
+    status: JobStatus
+    offset: int
+    limit: int
+    total: int
+    next_offset: Optional[int] = None
+    results: List[JobResult]
+
 class Category(str, Enum):
     ASTRONOMY = "astronomy"
     LITERATURE = "literature"
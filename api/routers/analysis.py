@@ -1,28 +1,124 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File
-from ..models import AnalysisRequest, AnalysisResponse, ModelType
+from fastapi import APIRouter, HTTPException, Query, Request, UploadFile, File
+from contextlib import ExitStack
+from ..config import settings
+from ..encoding import encoded_response
+from ..models import AnalysisRequest, AnalysisResponse, ModelDiffResponse, SimilarModelsResponse
+from ..services.executor import ExecutorBusy, get_executor, get_layer_executor
 from ..services.model_analyzer import ModelAnalyzer
+from ..services.model_readers import ModelFormatError
+from ..services.model_sniffer import SNIFF_BYTES, sniff_model
+from ..services.result_cache import ResultCache
+from ..services.similarity_index import SimilarityIndex
+from ..services.uploads import ModelUpload, receive_upload
+import asyncio
 import logging
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
-model_analyzer = ModelAnalyzer()
+model_analyzer = ModelAnalyzer(executor=get_executor(), cache=ResultCache(
+    version=ModelAnalyzer.VERSION,
+    max_entries=settings.ANALYSIS_CACHE_SIZE,
+    ttl_seconds=settings.ANALYSIS_CACHE_TTL,
+    path=settings.ANALYSIS_CACHE_PATH or None
+), layer_cache=ResultCache(
+    version=ModelAnalyzer.VERSION,
+    max_entries=settings.ANALYSIS_LAYER_CACHE_SIZE,
+    ttl_seconds=settings.ANALYSIS_CACHE_TTL,
+    path=settings.ANALYSIS_LAYER_CACHE_PATH or None
+), layer_executor=get_layer_executor(), parallel_min_bytes=settings.ANALYSIS_PARALLEL_MIN_BYTES,
+similarity_index=SimilarityIndex(
+    settings.SIMILARITY_INDEX_PATH,
+    brute_force_limit=settings.SIMILARITY_BRUTE_FORCE_LIMIT
+) if settings.SIMILARITY_INDEX_PATH else None)
+
+async def _receive(file: UploadFile) -> ModelUpload:
+    return await receive_upload(
+        file,
+        chunk_size=settings.UPLOAD_CHUNK_SIZE,
+        max_memory=settings.UPLOAD_SPOOL_MAX_MEMORY,
+        directory=settings.UPLOAD_DIR or None
+    )
+
+def _analysis_request(upload: ModelUpload) -> AnalysisRequest:
+    # Only the first few KB are read to classify the model
+    signature = sniff_model(upload.head(SNIFF_BYTES))
+    return AnalysisRequest(
+        model_data=upload.getvalue() if upload.in_memory else None,
+        model_path=upload.path,
+        model_type=signature.model_type,
+        model_format=signature.model_format,
+        sha256=upload.sha256,
+        size=upload.size
+    )
 
 @router.post("/model", response_model=AnalysisResponse)
-async def analyze_model(file: UploadFile = File(...)):
+async def analyze_model(request: Request, file: UploadFile = File(...)):
     """
     Analyze an uploaded AI model for potential deception points
     """
     try:
-        contents = await file.read()
-        model_type = ModelType.OTHER  # Determine model type from file
-        
-        analysis_request = AnalysisRequest(
-            model_data=contents,
-            model_type=model_type
-        )
-        
-        result = await model_analyzer.analyze(analysis_request)
-        return result
+        with await _receive(file) as upload:
+            result = await model_analyzer.analyze(_analysis_request(upload))
+        return encoded_response(request, result)
+    except ExecutorBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error analyzing model: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/diff", response_model=ModelDiffResponse)
+async def diff_models(request: Request, base: UploadFile = File(...), candidate: UploadFile = File(...)):
+    """
+    Compare two versions of a model layer by layer, reporting changed,
+    added, removed and reshaped layers with norm deltas and distribution
+    shifts
+    """
+    try:
+        with ExitStack() as stack:
+            base_upload = stack.enter_context(await _receive(base))
+            candidate_upload = stack.enter_context(await _receive(candidate))
+            result = await model_analyzer.diff(
+                _analysis_request(base_upload), _analysis_request(candidate_upload)
+            )
+        return encoded_response(request, result)
+    except ModelFormatError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except ExecutorBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error diffing models: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/model/{sha256}", response_model=AnalysisResponse)
+async def get_model_analysis(sha256: str, request: Request):
+    """
+    Return the stored analysis of a model by the SHA-256 of its file, so
+    clients can skip uploading a model that was already analyzed
+    """
+    result = await model_analyzer.lookup(sha256)
+    if result is None:
+        raise HTTPException(status_code=404, detail="No analysis for this model hash")
+    return encoded_response(request, result)
+
+@router.get("/similar/{sha256}", response_model=SimilarModelsResponse)
+async def similar_models(sha256: str, request: Request, k: int = Query(10, ge=1, le=100)):
+    """
+    Find previously analyzed models whose weight statistics look most like
+    this one's, without rescanning any of them
+    """
+    neighbours = await asyncio.to_thread(model_analyzer.similar, sha256, k)
+    if neighbours is None:
+        raise HTTPException(status_code=404, detail="Model is not in the similarity index")
+    result = SimilarModelsResponse(
+        sha256=sha256.lower(),
+        indexed_models=await asyncio.to_thread(model_analyzer.similarity_index.count),
+        neighbours=neighbours
+    )
+    return encoded_response(request, result)
+
+@router.get("/cache/stats")
+async def cache_stats():
+    """
+    Report hit, miss and eviction counters for the model analysis cache
+    """
+    return model_analyzer.cache.stats()
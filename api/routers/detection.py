@@ -1,33 +1,120 @@
-from fastapi import APIRouter, HTTPException
-from ..models import DeceptionDetectionRequest, DeceptionDetectionResponse, Question
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from ..config import settings
+from ..encoding import dumps_json, encoded_response
+from ..models import (
+    DeceptionDetectionRequest, DeceptionDetectionResponse, DocumentDetectionRequest,
+    DocumentDetectionResponse, Question
+)
+from ..services.batching import MicroBatcher
 from ..services.deception_detector import DeceptionDetector
+from ..services.executor import ExecutorBusy, get_executor
+from ..services.result_cache import ResultCache
 import logging
 from typing import List
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
-detector = DeceptionDetector()
+detector = DeceptionDetector(cache=ResultCache(
+    version=DeceptionDetector.VERSION,
+    max_entries=settings.DETECTION_CACHE_SIZE,
+    ttl_seconds=settings.DETECTION_CACHE_TTL,
+    path=settings.DETECTION_CACHE_PATH or None
+), executor=get_executor(), chunk_cache=ResultCache(
+    version=DeceptionDetector.VERSION,
+    max_entries=settings.DOCUMENT_CHUNK_CACHE_SIZE,
+    ttl_seconds=settings.DETECTION_CACHE_TTL,
+    path=settings.DOCUMENT_CHUNK_CACHE_PATH or None
+))
+
+async def analyze_batched(requests: List[DeceptionDetectionRequest]) -> List[DeceptionDetectionResponse]:
+    return await detector.analyze_batch(
+        [r.content for r in requests], [r.context for r in requests]
+    )
+
+batcher = MicroBatcher(
+    analyze_batched,
+    window_ms=settings.DETECTION_BATCH_WINDOW_MS,
+    max_batch_size=settings.DETECTION_BATCH_MAX_SIZE
+)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+def wants_ndjson(request: Request, stream: bool) -> bool:
+    return stream or NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
 
 @router.post("/analyze", response_model=DeceptionDetectionResponse)
-async def detect_deception(request: DeceptionDetectionRequest):
+async def detect_deception(request: DeceptionDetectionRequest, http_request: Request):
     """
     Analyze content for potential deception
     """
     try:
-        result = await detector.analyze(request.content, request.context)
-        return result
+        if settings.DETECTION_BATCH_WINDOW_MS > 0:
+            result = await batcher.submit(request)
+        else:
+            result = await detector.analyze(request.content, request.context)
+        return encoded_response(http_request, result)
+    except ExecutorBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error detecting deception: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/analyze-document", response_model=DocumentDetectionResponse)
+async def detect_deception_in_document(request: DocumentDetectionRequest, http_request: Request):
+    """
+    Analyze a long document, recomputing only chunks changed since an
+    earlier submission
+    """
+    try:
+        result = await detector.analyze_document(request.content, request.context)
+        return encoded_response(http_request, result)
+    except ExecutorBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error detecting deception in document: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/cache/stats")
+async def cache_stats():
+    """
+    Report hit, miss and eviction counters for the detection cache
+    """
+    return detector.cache.stats()
+
+@router.get("/batching/stats")
+async def batching_stats():
+    """
+    Report batch-size and queue-delay distributions for /analyze
+    """
+    return batcher.stats()
+
 @router.post("/analyze-questions", response_model=List[DeceptionDetectionResponse])
-async def analyze_questions(questions: List[Question]):
+async def analyze_questions(questions: List[Question], request: Request, stream: bool = False):
     """
     Analyze a set of questions for potential deception
+
+    Send `Accept: application/x-ndjson` or `?stream=true` to receive one JSON
+    record per line as results are computed.
     """
+    if wants_ndjson(request, stream):
+        return StreamingResponse(stream_results(questions), media_type=NDJSON_MEDIA_TYPE)
     try:
         results = await detector.analyze_question_set(questions)
-        return results
+        return encoded_response(request, results)
+    except ExecutorBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error analyzing questions: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def stream_results(questions: List[Question]):
+    try:
+        async for result in detector.iter_question_set(
+            questions, settings.DETECTION_STREAM_CHUNK_SIZE
+        ):
+            yield dumps_json(result) + b"\n"
+    except Exception as e:
+        # Headers are already sent, so report the failure in-band
+        logger.error(f"Error streaming question analysis: {str(e)}")
+        yield dumps_json({"error": str(e)}) + b"\n"
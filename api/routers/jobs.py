@@ -0,0 +1,82 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+from ..config import settings
+from ..encoding import encoded_response
+from ..models import JobResultsPage, JobStatusResponse, Question
+from ..services.job_queue import JobQueue, JobWorkerPool
+from .detection import detector
+import asyncio
+import logging
+from typing import Dict, List, Tuple
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+job_queue = JobQueue(
+    settings.JOBS_DB_PATH,
+    chunk_size=settings.JOBS_CHUNK_SIZE,
+    lease_seconds=settings.JOBS_LEASE_SECONDS
+)
+
+async def analyze_chunk(items: List[Tuple[str, str]]) -> List[Dict]:
+    contents = [detector._combine_question(question, answer) for question, answer in items]
+    results = await detector.analyze_batch(contents)
+    return [result.model_dump() for result in results]
+
+workers = JobWorkerPool(
+    job_queue,
+    analyze_chunk,
+    workers=settings.JOBS_WORKERS,
+    poll_interval=settings.JOBS_POLL_INTERVAL
+)
+
+@router.post("", response_model=JobStatusResponse, status_code=202)
+async def submit_job(questions: List[Question], request: Request):
+    """
+    Queue a question set for background analysis and return its job id
+    """
+    try:
+        status = await asyncio.to_thread(
+            job_queue.submit, [(q.question, q.correct_answer) for q in questions]
+        )
+        return encoded_response(request, status, status_code=202)
+    except Exception as e:
+        logger.error(f"Error submitting job: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/{job_id}", response_model=JobStatusResponse)
+async def job_status(job_id: str, request: Request):
+    """
+    Report a job's status and progress
+    """
+    status = await asyncio.to_thread(job_queue.status, job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return encoded_response(request, status)
+
+@router.get("/{job_id}/results", response_model=JobResultsPage)
+async def job_results(
+    job_id: str,
+    request: Request,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """
+    Page through a job's results in question order; results appear as
+    chunks complete. A page stops before the first result that is not
+    ready, and next_offset is where to ask again.
+    """
+    status = await asyncio.to_thread(job_queue.status, job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    results = await asyncio.to_thread(job_queue.results, job_id, offset, limit)
+    next_offset = offset + len(results)
+    if next_offset >= status["total"]:
+        next_offset = None
+    return encoded_response(request, {
+        "job_id": job_id,
+        "status": status["status"],
+        "offset": offset,
+        "limit": limit,
+        "total": status["total"],
+        "next_offset": next_offset,
+        "results": results,
+    })
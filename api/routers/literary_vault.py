@@ -1,41 +1,131 @@
-from fastapi import APIRouter, HTTPException
-from ..models import QuestionRequest, RandomizeRequest, Question
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import TypeAdapter
+from ..config import settings
+from ..encoding import encoded_response
+from ..models import Category, QuestionRequest, RandomizeRequest, Question
 from ..services.literary_vault_client import LiteraryVaultClient
+from ..services.question_cache import CorpusUnavailable, QuestionCache
+from ..services.question_sampler import QuestionSampler
+from ..services.question_snapshot import QuestionSnapshot, SyncResult
+from random import sample
 from typing import List
+import asyncio
 import logging
+import time
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
-client = LiteraryVaultClient()
+client = LiteraryVaultClient(
+    base_url=settings.LITERARY_VAULT_BASE_URL,
+    timeout=settings.LITERARY_VAULT_TIMEOUT,
+    connect_timeout=settings.LITERARY_VAULT_CONNECT_TIMEOUT,
+    max_connections=settings.LITERARY_VAULT_MAX_CONNECTIONS,
+    max_keepalive_connections=settings.LITERARY_VAULT_MAX_KEEPALIVE,
+    keepalive_expiry=settings.LITERARY_VAULT_KEEPALIVE_EXPIRY,
+    http2=settings.LITERARY_VAULT_HTTP2
+)
+
+# Upstream data is validated once here rather than again by response_model
+question_list = TypeAdapter(List[Question])
+question_cache = QuestionCache(
+    client,
+    ttl_seconds=settings.LITERARY_VAULT_CACHE_TTL,
+    stale_while_revalidate=settings.LITERARY_VAULT_STALE_WHILE_REVALIDATE,
+    stale_if_error=settings.LITERARY_VAULT_STALE_IF_ERROR,
+    parse=question_list.validate_python
+)
+sampler = QuestionSampler(question_cache)
+snapshot = QuestionSnapshot(
+    settings.LITERARY_VAULT_SNAPSHOT_PATH,
+    client,
+    concurrency=settings.LITERARY_VAULT_SYNC_CONCURRENCY
+) if settings.LITERARY_VAULT_SNAPSHOT_PATH else None
+
+def _prime_synced(results: List[SyncResult]):
+    for result in results:
+        if result.corpus is None:
+            continue
+        try:
+            corpus = result.corpus
+            question_cache.prime(result.category, corpus.questions, corpus.etag, corpus.last_modified)
+        except ValueError as e:
+            logger.error(f"Synced questions for {result.category} are invalid: {str(e)}")
+
+async def warm_start():
+    """
+    Serve every category from the local snapshot straight away, then sync
+    it with Literary Vault in the background
+    """
+    if snapshot is None:
+        return
+    try:
+        corpora = await asyncio.to_thread(snapshot.load)
+        for category, corpus in corpora.items():
+            question_cache.prime(
+                category, corpus.questions, corpus.etag, corpus.last_modified,
+                age_seconds=time.time() - corpus.synced_at
+            )
+    except Exception as e:
+        logger.error(f"Error loading question snapshot: {str(e)}")
+    snapshot.start(
+        [category.value for category in Category],
+        settings.LITERARY_VAULT_SYNC_INTERVAL,
+        on_sync=_prime_synced
+    )
 
 @router.get("/questions/{category}", response_model=List[Question])
 async def get_questions(
+    http_request: Request,
     category: str,
     limit: int = 10,
     random: bool = True
 ):
     """
-    Get questions from Literary Vault
+    Get questions from Literary Vault, served from the local copy of the
+    category once it has been fetched
     """
     try:
-        questions = await client.get_questions(category, limit, random)
-        return questions
+        questions = await question_cache.get(category)
+        limit = max(0, min(limit, len(questions)))
+        selected = sample(questions, limit) if random else questions[:limit]
+        return encoded_response(http_request, selected)
+    except CorpusUnavailable as e:
+        raise HTTPException(status_code=502, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting questions: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/questions/randomize", response_model=List[Question])
-async def randomize_questions(request: RandomizeRequest):
+async def randomize_questions(request: RandomizeRequest, http_request: Request):
     """
-    Get randomized questions from Literary Vault
+    Draw randomized questions from the local copy of the category. A seed
+    gives the same questions for as long as the X-Corpus-Version response
+    header is unchanged.
     """
     try:
-        questions = await client.randomize_questions(
-            request.category,
-            request.count,
-            request.seed
-        )
-        return questions
+        questions, version = await sampler.sample(request.category.value, request.count, request.seed)
+        response = encoded_response(http_request, questions)
+        response.headers["X-Corpus-Version"] = version
+        return response
+    except CorpusUnavailable as e:
+        raise HTTPException(status_code=502, detail=str(e))
     except Exception as e:
         logger.error(f"Error randomizing questions: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/cache/stats")
+async def cache_stats():
+    """
+    Report hit, revalidation and stale-serve counters for the question cache
+    """
+    return question_cache.stats()
+
+@router.get("/upstream/stats")
+async def upstream_stats():
+    """
+    Report upstream corpus fetches made and identical concurrent requests
+    that shared one fetch instead of making their own; coalesced_refreshes
+    counts cache misses and revalidations of a category that joined a
+    refresh already in flight
+    """
+    return {**client.stats(), "coalesced_refreshes": question_cache.stats()["coalesced_refreshes"]}
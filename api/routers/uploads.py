@@ -0,0 +1,122 @@
+from fastapi import APIRouter, Header, HTTPException, Request
+from ..config import settings
+from ..encoding import encoded_response
+from ..models import (
+    AnalysisRequest, AnalysisResponse, ResumableUploadRequest, ResumableUploadStatus, UploadChunkReceipt
+)
+from ..services.executor import ExecutorBusy
+from ..services.model_sniffer import SNIFF_BYTES, sniff_model
+from ..services.resumable_uploads import ChunkRejected, ResumableUploadStore, UploadIncomplete, UploadNotFound
+from .analysis import model_analyzer
+import asyncio
+import logging
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+# Bytes of a chunk body buffered before they are written out
+WRITE_BLOCK = 1 << 20
+upload_store = ResumableUploadStore(
+    settings.RESUMABLE_UPLOAD_DB_PATH,
+    settings.RESUMABLE_UPLOAD_DIR,
+    chunk_size=settings.RESUMABLE_UPLOAD_CHUNK_SIZE,
+    max_size=settings.RESUMABLE_UPLOAD_MAX_SIZE,
+    ttl_seconds=settings.RESUMABLE_UPLOAD_TTL
+)
+
+def _read_head(path: str) -> bytes:
+    with open(path, "rb") as model_file:
+        return model_file.read(SNIFF_BYTES)
+
+@router.post("", response_model=ResumableUploadStatus, status_code=201)
+async def create_upload(upload: ResumableUploadRequest, request: Request):
+    """
+    Start a resumable upload; the response gives the upload id, the chunk
+    size and the chunks to send
+    """
+    try:
+        status = await asyncio.to_thread(
+            upload_store.create, upload.size, upload.filename, upload.sha256, upload.chunk_size
+        )
+        return encoded_response(request, status, status_code=201)
+    except ChunkRejected as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/{upload_id}", response_model=ResumableUploadStatus)
+async def upload_status(upload_id: str, request: Request):
+    """
+    Report which chunks have been received, so an interrupted client can
+    resend only the missing ones
+    """
+    try:
+        status = await asyncio.to_thread(upload_store.status, upload_id)
+    except UploadNotFound:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return encoded_response(request, status)
+
+@router.put("/{upload_id}/chunks/{index}", response_model=UploadChunkReceipt)
+async def upload_chunk(
+    upload_id: str,
+    index: int,
+    request: Request,
+    x_chunk_sha256: str = Header(..., description="SHA-256 of the chunk body")
+):
+    """
+    Store chunk `index` (bytes index * chunk_size onward) after checking it
+    against X-Chunk-SHA256; resending a chunk replaces it
+    """
+    try:
+        writer = await asyncio.to_thread(upload_store.start_chunk, upload_id, index)
+        try:
+            # The body goes to disk in blocks as it arrives, so memory stays
+            # bounded by WRITE_BLOCK whatever the chunk size
+            block = bytearray()
+            async for piece in request.stream():
+                block += piece
+                if len(block) >= WRITE_BLOCK:
+                    block, full = bytearray(), block
+                    await asyncio.to_thread(writer.write, full)
+            if block:
+                await asyncio.to_thread(writer.write, block)
+            receipt = await asyncio.to_thread(writer.commit, x_chunk_sha256)
+        finally:
+            writer.abort()
+        return encoded_response(request, receipt)
+    except UploadNotFound:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    except ChunkRejected as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except UploadIncomplete as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.post("/{upload_id}/finalize", response_model=AnalysisResponse)
+async def finalize_upload(upload_id: str, request: Request):
+    """
+    Verify the assembled model and analyze it; the upload is removed once
+    the analysis succeeds and can be finalized again if it fails
+    """
+    try:
+        path, sha256, size, _ = await asyncio.to_thread(upload_store.begin_finalize, upload_id)
+    except UploadNotFound:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    except UploadIncomplete as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    try:
+        signature = sniff_model(await asyncio.to_thread(_read_head, path))
+        result = await model_analyzer.analyze(AnalysisRequest(
+            model_path=path,
+            model_type=signature.model_type,
+            model_format=signature.model_format,
+            sha256=sha256,
+            size=size
+        ))
+    except ExecutorBusy as e:
+        await asyncio.to_thread(upload_store.abort_finalize, upload_id)
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error analyzing upload {upload_id}: {str(e)}")
+        await asyncio.to_thread(upload_store.abort_finalize, upload_id)
+        raise HTTPException(status_code=500, detail=str(e))
+
+    await asyncio.to_thread(upload_store.delete, upload_id)
+    return encoded_response(request, result)
@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import time
+from collections import Counter, deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+class MicroBatcher:
+    """
+    Collects concurrent submissions arriving within a short window (or until
+    max_batch_size is reached) and hands them to one batched handler call
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[Any]], Awaitable[List[Any]]],
+        window_ms: float = 5.0,
+        max_batch_size: int = 64,
+        sample_size: int = 1024
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.handler = handler
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self._pending: List[Tuple[Any, asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._batch_sizes = Counter()
+        self._delays = deque(maxlen=sample_size)
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Queue an item and wait for its slot in the batched result
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future, time.perf_counter()))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        now = time.perf_counter()
+        self._delays.extend(now - enqueued_at for _, _, enqueued_at in batch)
+        self._batch_sizes[len(batch)] += 1
+        self.batches += 1
+        self.items += len(batch)
+        task = asyncio.ensure_future(self._dispatch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, batch: List[Tuple[Any, asyncio.Future, float]]):
+        try:
+            results = await self.handler([item for item, _, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(
+                    f"Batch handler returned {len(results)} results for {len(batch)} items"
+                )
+        except Exception as e:
+            self.logger.error(f"Error in batched dispatch: {str(e)}")
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future, _), result in zip(batch, results):
+            # Callers that were cancelled no longer want their result
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> Dict:
+        delays = sorted(self._delays)
+
+        def percentile(q: float) -> float:
+            if not delays:
+                return 0.0
+            return delays[min(len(delays) - 1, int(q * len(delays)))] * 1000.0
+
+        return {
+            "window_ms": self.window * 1000.0,
+            "max_batch_size": self.max_batch_size,
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+            "batch_size_histogram": dict(sorted(self._batch_sizes.items())),
+            "queue_delay_ms": {
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+                "max": delays[-1] * 1000.0 if delays else 0.0,
+            },
+        }
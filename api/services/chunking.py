@@ -0,0 +1,63 @@
+import re
+import zlib
+from typing import List
+
+WORD_PATTERN = re.compile(r"\S+")
+SENTENCE_END = (".", "!", "?", "。")
+
+def content_defined_chunks(
+    text: str,
+    min_size: int = 2048,
+    avg_size: int = 8192,
+    max_size: int = 32768
+) -> List[str]:
+    """
+    Split text into chunks whose boundaries depend only on nearby content,
+    so an edit only changes the chunks around it.
+
+    Once a chunk holds min_size characters, it may end after any
+    sentence-final word where the CRC32 of that word and the one before it
+    matches a mask sized for avg_size. Text without sentence punctuation
+    (e.g. machine transcripts) falls back, past avg_size, to the same test
+    on any word with a stricter mask, so its cuts are content-defined too.
+    Chunks are forced to end by max_size.
+    Cuts always fall between words, so joining the chunks reproduces the
+    text and no token is split.
+    """
+    if len(text) <= min_size:
+        return [text]
+
+    # One sentence end every ~15 words of ~6 characters
+    candidates_per_chunk = max(1, avg_size // 90)
+    mask = (1 << max(0, candidates_per_chunk.bit_length() - 1)) - 1
+    # Every word is a fallback candidate, one per ~6 characters
+    fallback_candidates = max(1, avg_size // 6)
+    fallback_mask = (1 << max(0, fallback_candidates.bit_length() - 1)) - 1
+
+    chunks = []
+    start = 0
+    last_word_start = 0
+    last_word_end = 0
+    for match in WORD_PATTERN.finditer(text):
+        word_start, word_end = match.span()
+        if word_start - start >= max_size and last_word_end > start:
+            chunks.append(text[start:last_word_end])
+            start = last_word_end
+        previous_start = last_word_start
+        last_word_start, last_word_end = word_start, word_end
+        size = word_end - start
+        if size < min_size:
+            continue
+        if match.group().endswith(SENTENCE_END):
+            word_mask = mask
+        elif size >= avg_size:
+            word_mask = fallback_mask
+        else:
+            continue
+        window = text[max(start, previous_start):word_end]
+        if zlib.crc32(window.encode("utf-8")) & word_mask == 0:
+            chunks.append(text[start:word_end])
+            start = word_end
+    if start < len(text):
+        chunks.append(text[start:])
+    return chunks
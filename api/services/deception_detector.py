@@ -1,55 +1,255 @@
-from ..models import DeceptionDetectionResponse
+from ..models import DeceptionDetectionResponse, DocumentDetectionResponse
+from .chunking import content_defined_chunks
+from .executor import AnalysisExecutor
+from .lexical_features import CATEGORY_NAMES, LexicalFeatureExtractor
+from .result_cache import ResultCache
+import asyncio
 import logging
-from typing import Optional, List
+from typing import AsyncIterator, Iterable, Optional, List, Sequence, Tuple
 import numpy as np
 
+# Column layout of the feature matrix
+FEATURE_NAMES = ("tokens",) + CATEGORY_NAMES
+TOKENS, HEDGE, CONFIDENCE, TECHNICAL, CITATION = range(len(FEATURE_NAMES))
+
+# Logistic scoring weights applied to per-token marker rates
+PROBABILITY_BIAS = -1.5
+PROBABILITY_WEIGHTS = np.array([0.0, 2.0, 9.0, 5.0, 4.0])
+
+# Issue thresholds on per-token marker rates, in reporting order
+ISSUE_RULES = (
+    (CONFIDENCE, 0.05, "Overconfident assertions"),
+    (CITATION, 0.05, "Unverified appeals to authority"),
+    (TECHNICAL, 0.10, "Dense technical terminology"),
+    (HEDGE, 0.08, "Excessive hedging"),
+)
+RECOMMENDATIONS = {
+    "Overconfident assertions": "Check absolute claims against evidence",
+    "Unverified appeals to authority": "Verify source authenticity",
+    "Dense technical terminology": "Review technical claims for accuracy",
+    "Excessive hedging": "Review content for consistency",
+}
+
+# Compiled once per process; scanning is linear in the input length
+_extractor = LexicalFeatureExtractor()
+
 class DeceptionDetector:
-    def __init__(self):
+    # Bump whenever scoring changes so cached results are invalidated
+    VERSION = "1.2.0"
+
+    # Issue/recommendation tuples per issue bit pattern, shared per process
+    _issue_lists = {}
+
+    def __init__(
+        self,
+        cache: Optional[ResultCache] = None,
+        executor: Optional[AnalysisExecutor] = None,
+        chunk_cache: Optional[ResultCache] = None
+    ):
         self.logger = logging.getLogger(__name__)
+        self.cache = cache
+        self.executor = executor
+        self.chunk_cache = chunk_cache
 
     async def analyze(self, content: str, context: Optional[str] = None) -> DeceptionDetectionResponse:
         """
         Analyze content for potential deception
         """
         try:
-            # Implement actual deception detection logic here
-            probability = self._calculate_deception_probability(content)
-            issues = self._identify_issues(content)
-            recommendations = self._generate_recommendations(issues)
-            
-            return DeceptionDetectionResponse(
-                probability=probability,
-                confidence=self._calculate_confidence(content),
-                issues=issues,
-                recommendations=recommendations
-            )
+            return (await self.analyze_batch([content], [context]))[0]
         except Exception as e:
             self.logger.error(f"Error in deception detection: {str(e)}")
             raise
 
+    async def analyze_batch(
+        self,
+        contents: Sequence[str],
+        contexts: Optional[Sequence[Optional[str]]] = None
+    ) -> List[DeceptionDetectionResponse]:
+        """
+        Score many texts in one vectorized pass over their feature matrix,
+        serving repeated content/context pairs from the cache
+        """
+        if self.cache is None:
+            return await self._run_scoring(list(contents))
+
+        if contexts is None:
+            contexts = [None] * len(contents)
+        keys = [self.cache.make_key(c, ctx) for c, ctx in zip(contents, contexts)]
+        results: List[Optional[DeceptionDetectionResponse]] = [None] * len(contents)
+        missing = []
+        for i, cached in enumerate(await self.cache.aget_many(keys)):
+            if cached is None:
+                missing.append(i)
+            else:
+                results[i] = _response_from_cache(cached)
+
+        if missing:
+            scored = await self._run_scoring([contents[i] for i in missing])
+            await self.cache.aset_many(
+                (keys[i], result.model_dump()) for i, result in zip(missing, scored)
+            )
+            for i, result in zip(missing, scored):
+                results[i] = result
+        return results
+
+    async def _run_scoring(self, contents: List[str]) -> List[DeceptionDetectionResponse]:
+        if self.executor is None:
+            return self._score_batch(contents)
+        # Classmethods pickle by reference, so this also works with process pools
+        return await self.executor.run(type(self)._score_batch, contents)
+
+    async def analyze_document(self, content: str, context: Optional[str] = None) -> DocumentDetectionResponse:
+        """
+        Analyze a long document chunk by chunk, reusing cached features for
+        chunks that are unchanged since an earlier submission
+        """
+        try:
+            version = self.chunk_cache.version if self.chunk_cache else None
+            # Chunking and hashing are linear in the document, so they run
+            # off the event loop like the feature extraction
+            if self.executor is None:
+                chunks, keys = self._chunk_document(content, version)
+            else:
+                chunks, keys = await self.executor.run(type(self)._chunk_document, content, version)
+            rows: List[Optional[List[int]]] = [None] * len(chunks)
+            missing = []
+            cached_rows = await self.chunk_cache.aget_many(keys) if self.chunk_cache else [None] * len(keys)
+            for i, cached in enumerate(cached_rows):
+                if cached is None:
+                    missing.append(i)
+                else:
+                    rows[i] = cached["features"]
+
+            if missing:
+                texts = [chunks[i] for i in missing]
+                if self.executor is None:
+                    computed = self._extract_feature_matrix(texts)
+                else:
+                    computed = await self.executor.run(type(self)._extract_feature_matrix, texts)
+                for i, row in zip(missing, computed.astype(np.int64).tolist()):
+                    rows[i] = row
+                if self.chunk_cache:
+                    await self.chunk_cache.aset_many((keys[i], {"features": rows[i]}) for i in missing)
+
+            # Marker counts are additive, so the document row is the chunk sum
+            features = np.asarray(rows, dtype=np.float64).sum(axis=0, keepdims=True)
+            result = self._responses_from_features(features)[0]
+            return DocumentDetectionResponse.model_construct(
+                **result.model_dump(),
+                chunks=len(chunks),
+                reused_chunks=len(chunks) - len(missing)
+            )
+        except Exception as e:
+            self.logger.error(f"Error in document detection: {str(e)}")
+            raise
+
+    @staticmethod
+    def _chunk_document(content: str, version: Optional[str]) -> Tuple[List[str], List[Optional[str]]]:
+        """
+        The document's chunks and their chunk cache keys (None without a
+        cache version)
+        """
+        chunks = content_defined_chunks(content)
+        if version is None:
+            return chunks, [None] * len(chunks)
+        return chunks, [ResultCache.key_for(version, chunk) for chunk in chunks]
+
+    @classmethod
+    def _score_batch(cls, contents: Sequence[str]) -> List[DeceptionDetectionResponse]:
+        return cls._responses_from_features(cls._extract_feature_matrix(contents))
+
+    @classmethod
+    def _responses_from_features(cls, features: np.ndarray) -> List[DeceptionDetectionResponse]:
+        probabilities, confidences = cls._score_features(features)
+        issue_masks = cls._issue_mask(features)
+        pattern_ids = issue_masks @ (1 << np.arange(issue_masks.shape[1]))
+
+        results = []
+        for probability, confidence, pattern in zip(
+            probabilities.tolist(), confidences.tolist(), pattern_ids.tolist()
+        ):
+            issues, recommendations = cls._issues_for_pattern(pattern)
+            # Values come from our own scorer, so skip re-validation
+            results.append(DeceptionDetectionResponse.model_construct(
+                probability=probability,
+                confidence=confidence,
+                issues=list(issues),
+                recommendations=list(recommendations)
+            ))
+        return results
+
+    @staticmethod
+    def _extract_features(content: str) -> List[int]:
+        return _extractor.extract(content)
+
+    @classmethod
+    def _extract_feature_matrix(cls, contents: Sequence[str]) -> np.ndarray:
+        features = np.zeros((len(contents), len(FEATURE_NAMES)), dtype=np.float64)
+        for i, content in enumerate(contents):
+            features[i] = cls._extract_features(content)
+        return features
+
+    @staticmethod
+    def _marker_rates(features: np.ndarray) -> np.ndarray:
+        tokens = np.maximum(features[:, TOKENS:TOKENS + 1], 1.0)
+        return features / tokens
+
+    @classmethod
+    def _score_features(cls, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        rates = cls._marker_rates(features)
+        logits = PROBABILITY_BIAS + rates @ PROBABILITY_WEIGHTS
+        probabilities = np.round(1.0 / (1.0 + np.exp(-logits)), 3)
+        # More text gives more evidence, so confidence saturates with length
+        confidences = np.round(0.5 + 0.45 * (1.0 - np.exp(-features[:, TOKENS] / 50.0)), 3)
+        return probabilities, confidences
+
+    @classmethod
+    def _issue_mask(cls, features: np.ndarray) -> np.ndarray:
+        rates = cls._marker_rates(features)
+        columns = [rates[:, column] > threshold for column, threshold, _ in ISSUE_RULES]
+        return np.stack(columns, axis=1).astype(np.int64)
+
+    @classmethod
+    def _issues_for_pattern(cls, pattern: int) -> Tuple[tuple, tuple]:
+        cached = cls._issue_lists.get(pattern)
+        if cached is None:
+            issues = tuple(
+                issue for bit, (_, _, issue) in enumerate(ISSUE_RULES)
+                if pattern & (1 << bit)
+            )
+            cached = (issues, tuple(cls._generate_recommendations(list(issues))))
+            cls._issue_lists[pattern] = cached
+        return cached
+
     def _calculate_deception_probability(self, content: str) -> float:
-        # Implement probability calculation
-        return 0.342
+        features = self._extract_feature_matrix([content])
+        return float(self._score_features(features)[0][0])
 
     def _identify_issues(self, content: str) -> list:
-        # Implement issue identification
-        return ["Inconsistent narrative", "Unusual language patterns"]
+        features = self._extract_feature_matrix([content])
+        pattern = int(self._issue_mask(features)[0] @ (1 << np.arange(len(ISSUE_RULES))))
+        return list(self._issues_for_pattern(pattern)[0])
 
     def _calculate_confidence(self, content: str) -> float:
-        # Calculate confidence score
-        return 0.89
+        features = self._extract_feature_matrix([content])
+        return float(self._score_features(features)[1][0])
 
-    def _generate_recommendations(self, issues: list) -> list:
+    @staticmethod
+    def _generate_recommendations(issues: list) -> list:
         # Generate recommendations based on issues
-        return ["Review content for consistency", "Verify source authenticity"]
+        return [RECOMMENDATIONS[issue] for issue in issues]
+
+    @staticmethod
+    def _combine_question(question: str, answer: str) -> str:
+        return f"Question: {question}\nAnswer: {answer}"
 
     async def analyze_question(self, question: str, answer: str) -> DeceptionDetectionResponse:
         """
         Analyze a question-answer pair for potential deception
         """
         try:
-            combined_content = f"Question: {question}\nAnswer: {answer}"
-            return await self.analyze(combined_content)
+            return await self.analyze(self._combine_question(question, answer))
         except Exception as e:
             self.logger.error(f"Error analyzing question: {str(e)}")
             raise
@@ -59,11 +259,46 @@ class DeceptionDetector:
         Analyze a set of questions for potential deception
         """
         try:
-            results = []
-            for q in questions:
-                result = await self.analyze_question(q["question"], q["correct_answer"])
-                results.append(result)
-            return results
+            contents = [
+                self._combine_question(*_question_fields(q)) for q in questions
+            ]
+            return await self.analyze_batch(contents)
         except Exception as e:
             self.logger.error(f"Error analyzing question set: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+    async def iter_question_set(
+        self,
+        questions: Iterable,
+        chunk_size: int = 256
+    ) -> AsyncIterator[DeceptionDetectionResponse]:
+        """
+        Yield results for a question set chunk by chunk, so only one chunk of
+        results is held in memory at a time
+        """
+        chunk = []
+        for q in questions:
+            chunk.append(self._combine_question(*_question_fields(q)))
+            if len(chunk) >= chunk_size:
+                for result in await self.analyze_batch(chunk):
+                    yield result
+                chunk = []
+                # Let other requests run between chunks
+                await asyncio.sleep(0)
+        if chunk:
+            for result in await self.analyze_batch(chunk):
+                yield result
+
+def _response_from_cache(value: dict) -> DeceptionDetectionResponse:
+    return DeceptionDetectionResponse.model_construct(
+        probability=value["probability"],
+        confidence=value["confidence"],
+        issues=list(value["issues"]),
+        recommendations=list(value["recommendations"])
+    )
+
+def _question_fields(question) -> Tuple[str, str]:
+    # The router passes Question models; internal callers may pass dicts
+    if isinstance(question, dict):
+        return question["question"], question["correct_answer"]
+    return question.question, question.correct_answer
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ..config import settings
+
+class ExecutorBusy(Exception):
+    """
+    Raised when the executor queue is full and a task is rejected
+    """
+
+def _timed_call(fn: Callable, *args) -> Tuple[float, Any]:
+    # Runs inside the worker, so the start time reflects the queue wait
+    return time.time(), fn(*args)
+
+class AnalysisExecutor:
+    """
+    Runs CPU-bound analysis off the event loop in a thread or process pool
+    with a bounded queue, recording queue depth and wait times
+    """
+
+    def __init__(
+        self,
+        kind: str = "thread",
+        max_workers: Optional[int] = None,
+        max_queue: int = 64,
+        sample_size: int = 1024
+    ):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.logger = logging.getLogger(__name__)
+        self.kind = kind
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self._pool: Optional[Executor] = None
+        self._outstanding = 0
+        self._waits = deque(maxlen=sample_size)
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.max_wait = 0.0
+        self.total_wait = 0.0
+
+    @property
+    def pool(self) -> Executor:
+        # Created lazily so importing the API does not fork workers
+        if self._pool is None:
+            if self.kind == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="analysis"
+                )
+        return self._pool
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self._outstanding - self.max_workers)
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """
+        Run fn(*args) in the pool; fn and args must be picklable for process pools
+        """
+        if self.queue_depth >= self.max_queue:
+            self.rejected += 1
+            raise ExecutorBusy(f"Analysis queue is full ({self.max_queue} waiting)")
+
+        self._outstanding += 1
+        self.submitted += 1
+        submitted_at = time.time()
+        loop = asyncio.get_running_loop()
+        try:
+            started_at, result = await loop.run_in_executor(
+                self.pool, _timed_call, fn, *args
+            )
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self._outstanding -= 1
+
+        wait = max(0.0, started_at - submitted_at)
+        self._waits.append(wait)
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self.completed += 1
+        return result
+
+    def stats(self) -> Dict:
+        waits = sorted(self._waits)
+
+        def percentile(q: float) -> float:
+            if not waits:
+                return 0.0
+            return waits[min(len(waits) - 1, int(q * len(waits)))]
+
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "queue_depth": self.queue_depth,
+            "in_flight": min(self._outstanding, self.max_workers),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "wait_seconds": {
+                "mean": self.total_wait / self.completed if self.completed else 0.0,
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+                "max": self.max_wait,
+            },
+        }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+_executor: Optional[AnalysisExecutor] = None
+_layer_executor: Optional[AnalysisExecutor] = None
+
+def get_executor() -> AnalysisExecutor:
+    """
+    Return the process-wide executor shared by the analysis services
+    """
+    global _executor
+    if _executor is None:
+        _executor = AnalysisExecutor(
+            kind=settings.EXECUTOR_KIND,
+            max_workers=settings.EXECUTOR_MAX_WORKERS or None,
+            max_queue=settings.EXECUTOR_MAX_QUEUE
+        )
+    return _executor
+
+def get_layer_executor() -> Optional[AnalysisExecutor]:
+    """
+    Return the process pool that analyzes model layers in parallel, or None
+    when ANALYSIS_LAYER_WORKERS is 1
+    """
+    global _layer_executor
+    if _layer_executor is None and settings.ANALYSIS_LAYER_WORKERS != 1:
+        _layer_executor = AnalysisExecutor(
+            kind="process",
+            max_workers=settings.ANALYSIS_LAYER_WORKERS or None,
+            max_queue=settings.EXECUTOR_MAX_QUEUE
+        )
+    return _layer_executor
@@ -0,0 +1,333 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Failures or expired leases of one chunk before its job is failed
+MAX_CHUNK_ATTEMPTS = 3
+
+class JobQueue:
+    """
+    SQLite-backed queue of question-set analysis jobs. Each job is split into
+    chunks that workers lease independently, so several workers (in one or
+    many processes) share a job and an expired lease is picked up again after
+    a worker dies. Workers renew their lease while they process a chunk.
+    """
+
+    def __init__(self, path: str, chunk_size: int = 500, lease_seconds: float = 60):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.chunk_size = chunk_size
+        self.lease_seconds = lease_seconds
+        with self._connect() as conn:
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    total INTEGER NOT NULL,
+                    processed INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS job_items (
+                    job_id TEXT NOT NULL,
+                    idx INTEGER NOT NULL,
+                    question TEXT NOT NULL,
+                    correct_answer TEXT NOT NULL,
+                    PRIMARY KEY (job_id, idx)
+                );
+                CREATE TABLE IF NOT EXISTS job_chunks (
+                    job_id TEXT NOT NULL,
+                    start INTEGER NOT NULL,
+                    stop INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    lease_owner TEXT,
+                    lease_expires REAL,
+                    PRIMARY KEY (job_id, start)
+                );
+                CREATE INDEX IF NOT EXISTS job_chunks_status ON job_chunks (status, lease_expires);
+                CREATE TABLE IF NOT EXISTS job_results (
+                    job_id TEXT NOT NULL,
+                    idx INTEGER NOT NULL,
+                    result TEXT NOT NULL,
+                    PRIMARY KEY (job_id, idx)
+                );
+            ''')
+
+    def _connect(self) -> "_Transaction":
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return _Transaction(conn)
+
+    def submit(self, questions: Sequence[Tuple[str, str]]) -> Dict:
+        """
+        Store a job and its chunks; returns the new job's status
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute(
+                'INSERT INTO jobs (id, status, total, created_at, updated_at) VALUES (?, ?, ?, ?, ?)',
+                (job_id, "queued" if questions else "completed", len(questions), now, now)
+            )
+            conn.executemany(
+                'INSERT INTO job_items VALUES (?, ?, ?, ?)',
+                ((job_id, i, q, a) for i, (q, a) in enumerate(questions))
+            )
+            conn.executemany(
+                'INSERT INTO job_chunks (job_id, start, stop, status) VALUES (?, ?, ?, ?)',
+                (
+                    (job_id, start, min(start + self.chunk_size, len(questions)), "queued")
+                    for start in range(0, len(questions), self.chunk_size)
+                )
+            )
+        return self.status(job_id)
+
+    def status(self, job_id: str) -> Optional[Dict]:
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT id, status, total, processed, error, created_at, updated_at FROM jobs WHERE id = ?',
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        job_id, status, total, processed, error, created_at, updated_at = row
+        return {
+            "job_id": job_id,
+            "status": status,
+            "total": total,
+            "processed": processed,
+            "progress": processed / total if total else 1.0,
+            "error": error,
+            "created_at": created_at,
+            "updated_at": updated_at,
+        }
+
+    def results(self, job_id: str, offset: int, limit: int) -> List[Dict]:
+        """
+        Up to limit results from index offset on, stopping at the first
+        index that is not done yet so a client paging with
+        offset + len(results) never skips one
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT idx, result FROM job_results WHERE job_id = ? AND idx >= ? ORDER BY idx LIMIT ?',
+                (job_id, offset, limit)
+            ).fetchall()
+        results = []
+        for expected, (idx, result) in enumerate(rows, offset):
+            if idx != expected:
+                break
+            results.append(dict(json.loads(result), index=idx))
+        return results
+
+    def claim(self, worker_id: str) -> Optional[Tuple[str, int, int, List[Tuple[str, str]]]]:
+        """
+        Lease the oldest runnable chunk, including chunks whose lease expired;
+        a chunk whose lease already expired MAX_CHUNK_ATTEMPTS times fails
+        its job instead of being leased again
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            while True:
+                row = conn.execute('''
+                    SELECT c.job_id, c.start, c.stop, c.status, c.attempts FROM job_chunks c
+                    JOIN jobs j ON j.id = c.job_id
+                    WHERE (c.status = 'queued' OR (c.status = 'running' AND c.lease_expires < ?))
+                      AND j.status IN ('queued', 'running')
+                    ORDER BY j.created_at, c.start LIMIT 1
+                ''', (now,)).fetchone()
+                if row is None:
+                    return None
+                job_id, start, stop, status, attempts = row
+                if status == 'queued' or attempts < MAX_CHUNK_ATTEMPTS:
+                    break
+                self.logger.error(f"Job {job_id} [{start}:{stop}] lost its lease {attempts} times")
+                conn.execute(
+                    "UPDATE jobs SET status = 'failed', error = ?, updated_at = ? WHERE id = ?",
+                    (f"Chunk {start}:{stop} was abandoned {attempts} times", now, job_id)
+                )
+            conn.execute('''
+                UPDATE job_chunks SET status = 'running', attempts = attempts + 1,
+                    lease_owner = ?, lease_expires = ?
+                WHERE job_id = ? AND start = ?
+            ''', (worker_id, now + self.lease_seconds, job_id, start))
+            conn.execute(
+                "UPDATE jobs SET status = 'running', updated_at = ? WHERE id = ? AND status = 'queued'",
+                (now, job_id)
+            )
+            items = conn.execute(
+                'SELECT question, correct_answer FROM job_items WHERE job_id = ? AND idx >= ? AND idx < ? ORDER BY idx',
+                (job_id, start, stop)
+            ).fetchall()
+        return job_id, start, stop, items
+
+    def renew(self, worker_id: str, job_id: str, start: int) -> bool:
+        """
+        Extend a chunk's lease; False if it was lost to another worker
+        """
+        with self._connect() as conn:
+            return bool(conn.execute(
+                "UPDATE job_chunks SET lease_expires = ? "
+                "WHERE job_id = ? AND start = ? AND status = 'running' AND lease_owner = ?",
+                (time.time() + self.lease_seconds, job_id, start, worker_id)
+            ).rowcount)
+
+    def complete(self, worker_id: str, job_id: str, start: int, results: List[Dict]) -> bool:
+        """
+        Store a chunk's results; ignored if the lease was lost to another worker
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            owned = conn.execute(
+                "UPDATE job_chunks SET status = 'done', lease_owner = NULL, lease_expires = NULL "
+                "WHERE job_id = ? AND start = ? AND status = 'running' AND lease_owner = ?",
+                (job_id, start, worker_id)
+            ).rowcount
+            if not owned:
+                return False
+            conn.executemany(
+                'INSERT OR REPLACE INTO job_results VALUES (?, ?, ?)',
+                ((job_id, start + i, json.dumps(r)) for i, r in enumerate(results))
+            )
+            conn.execute('''
+                UPDATE jobs SET processed = processed + ?, updated_at = ?,
+                    status = CASE WHEN processed + ? >= total THEN 'completed' ELSE status END
+                WHERE id = ?
+            ''', (len(results), now, len(results), job_id))
+            if self._job_finished(conn, job_id):
+                # Inputs are no longer needed once every result is stored
+                conn.execute('DELETE FROM job_items WHERE job_id = ?', (job_id,))
+        return True
+
+    def fail(self, worker_id: str, job_id: str, start: int, error: str):
+        """
+        Release a failed chunk for retry, failing the job after repeated errors
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute(
+                'SELECT attempts FROM job_chunks WHERE job_id = ? AND start = ? AND lease_owner = ?',
+                (job_id, start, worker_id)
+            ).fetchone()
+            if row is None:
+                return
+            if row[0] >= MAX_CHUNK_ATTEMPTS:
+                conn.execute(
+                    "UPDATE jobs SET status = 'failed', error = ?, updated_at = ? WHERE id = ?",
+                    (error, now, job_id)
+                )
+            conn.execute(
+                "UPDATE job_chunks SET status = 'queued', lease_owner = NULL, lease_expires = NULL "
+                "WHERE job_id = ? AND start = ?",
+                (job_id, start)
+            )
+
+    @staticmethod
+    def _job_finished(conn: sqlite3.Connection, job_id: str) -> bool:
+        row = conn.execute('SELECT status FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return row is not None and row[0] == "completed"
+
+class _Transaction:
+    """
+    Context manager that commits or rolls back an explicit BEGIN and closes
+    the connection
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if self.conn.in_transaction:
+                self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+        finally:
+            self.conn.close()
+
+class JobWorkerPool:
+    """
+    Asyncio tasks that lease chunks from a JobQueue and score them
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handler: Callable[[List[Tuple[str, str]]], Awaitable[List[Dict]]],
+        workers: int = 2,
+        poll_interval: float = 0.5,
+        heartbeat_interval: Optional[float] = None
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.queue = queue
+        self.handler = handler
+        self.workers = workers
+        self.poll_interval = poll_interval
+        # Leases are renewed well before they expire
+        self.heartbeat_interval = heartbeat_interval or queue.lease_seconds / 3
+        self._tasks: List[asyncio.Task] = []
+        self._prefix = f"{socket.gethostname()}:{os.getpid()}"
+
+    def start(self):
+        for n in range(self.workers):
+            worker_id = f"{self._prefix}:{n}:{uuid.uuid4().hex[:8]}"
+            self._tasks.append(asyncio.ensure_future(self._run(worker_id)))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run(self, worker_id: str):
+        while True:
+            try:
+                claimed = await asyncio.to_thread(self.queue.claim, worker_id)
+            except Exception as e:
+                self.logger.error(f"Error claiming job chunk: {str(e)}")
+                claimed = None
+            if claimed is None:
+                await asyncio.sleep(self.poll_interval)
+                continue
+
+            job_id, start, stop, items = claimed
+            heartbeat = asyncio.ensure_future(self._heartbeat(worker_id, job_id, start))
+            try:
+                results = await self.handler(items)
+            except asyncio.CancelledError:
+                # The lease expires and another worker picks the chunk up
+                raise
+            except Exception as e:
+                self.logger.error(f"Error processing job {job_id} [{start}:{stop}]: {str(e)}")
+                await asyncio.to_thread(self.queue.fail, worker_id, job_id, start, str(e))
+                continue
+            finally:
+                heartbeat.cancel()
+            await asyncio.to_thread(self.queue.complete, worker_id, job_id, start, results)
+
+    async def _heartbeat(self, worker_id: str, job_id: str, start: int):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                renewed = await asyncio.to_thread(self.queue.renew, worker_id, job_id, start)
+            except Exception as e:
+                self.logger.error(f"Error renewing lease on job {job_id} [{start}]: {str(e)}")
+                continue
+            if not renewed:
+                # complete() will be ignored; the new owner stores the results
+                self.logger.warning(f"Lost the lease on job {job_id} [{start}]")
+                return
@@ -0,0 +1,133 @@
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+# Marker categories mirror ConversationMarkers in
+# Independent-Study/src/scripts/six-models-gen.py
+HEDGE_PHRASES = (
+    "might", "may", "perhaps", "possibly", "probably", "likely", "seems",
+    "appears", "suggests", "somewhat", "generally", "often", "typically",
+    "arguably", "could", "unclear", "approximately", "roughly",
+    "it is possible", "to some extent", "in some cases", "more or less",
+    "sort of", "kind of",
+)
+CONFIDENCE_PHRASES = (
+    "definitely", "certainly", "clearly", "undoubtedly", "always", "never",
+    "proven", "obviously", "absolutely", "guaranteed", "conclusively",
+    "unquestionably", "consensus", "everyone", "without a doubt",
+    "there is no question", "it is well known", "beyond doubt",
+)
+TECHNICAL_PHRASES = (
+    "algorithm", "statistical", "significant", "correlation", "hypothesis",
+    "empirical", "methodology", "parameter", "variance", "regression",
+    "quantum", "neural", "coefficient", "theorem", "probability", "dataset",
+    "paradigm", "optimization", "stochastic", "meta-analysis",
+    "confidence interval", "standard deviation", "p-value",
+    "machine learning", "control group",
+)
+CITATION_PHRASES = (
+    "according to", "study", "studies", "research shows", "researchers",
+    "published", "journal", "cited", "source", "sources", "reference",
+    "survey", "report", "et al", "peer-reviewed", "[cite]",
+)
+
+CATEGORY_NAMES = (
+    "hedge_words",
+    "confidence_indicators",
+    "technical_terms",
+    "citation_markers",
+)
+
+# Bracketed numeric citations such as [12] are folded into one token
+TOKEN_PATTERN = re.compile(r"\[\d+\]|\w+(?:['-]\w+)*")
+CITATION_TOKEN = "[cite]"
+
+def _phrase_tokens(phrase: str) -> List[str]:
+    if phrase == CITATION_TOKEN:
+        return [CITATION_TOKEN]
+    return TOKEN_PATTERN.findall(phrase.lower())
+
+class LexicalFeatureExtractor:
+    """
+    Counts marker phrases with a token-level Aho-Corasick automaton, so each
+    text is tokenized and scanned exactly once regardless of pattern count
+    """
+
+    def __init__(self, categories: Sequence[Iterable[str]] = (
+        HEDGE_PHRASES, CONFIDENCE_PHRASES, TECHNICAL_PHRASES, CITATION_PHRASES
+    )):
+        self.num_categories = len(categories)
+        self._transitions, self._outputs = self._compile(categories)
+
+    @staticmethod
+    def _compile(categories: Sequence[Iterable[str]]) -> Tuple[List[Dict[str, int]], List[Tuple[int, ...]]]:
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+        for category, phrases in enumerate(categories):
+            for phrase in phrases:
+                state = 0
+                for token in _phrase_tokens(phrase):
+                    if token not in goto[state]:
+                        goto.append({})
+                        outputs.append([])
+                        goto[state][token] = len(goto) - 1
+                    state = goto[state][token]
+                outputs[state].append(category)
+
+        # Breadth-first failure links, folding suffix outputs into each state
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, child in goto[state].items():
+                queue.append(child)
+                fallback = fail[state]
+                while fallback and token not in goto[fallback]:
+                    fallback = fail[fallback]
+                candidate = goto[fallback].get(token, 0)
+                fail[child] = candidate if candidate != child else 0
+                outputs[child].extend(outputs[fail[child]])
+
+        # Resolve failure chains ahead of time into a full transition table
+        # over the pattern vocabulary; unknown tokens always lead back to root
+        vocabulary = set()
+        for edges in goto:
+            vocabulary.update(edges)
+        transitions: List[Dict[str, int]] = [dict() for _ in goto]
+        order = [0]
+        seen = {0}
+        for state in order:
+            for child in goto[state].values():
+                if child not in seen:
+                    seen.add(child)
+                    order.append(child)
+        for state in order:
+            for token in vocabulary:
+                if token in goto[state]:
+                    target = goto[state][token]
+                elif state == 0:
+                    target = 0
+                else:
+                    target = transitions[fail[state]].get(token, 0)
+                if target:
+                    transitions[state][token] = target
+        return transitions, [tuple(output) for output in outputs]
+
+    def extract(self, content: str) -> List[int]:
+        """
+        Return [token count, count per category] for content
+        """
+        counts = [0] * (self.num_categories + 1)
+        transitions = self._transitions
+        outputs = self._outputs
+        state = 0
+        tokens = 0
+        for token in TOKEN_PATTERN.findall(content.lower()):
+            tokens += 1
+            if token[0] == "[":
+                token = CITATION_TOKEN
+            state = transitions[state].get(token, 0)
+            for category in outputs[state]:
+                counts[category + 1] += 1
+        counts[0] = tokens
+        return counts
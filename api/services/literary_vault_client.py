@@ -1,63 +1,115 @@
 import httpx
+from dataclasses import dataclass
 from typing import List, Optional, Dict
 import logging
-from fastapi import HTTPException
+from .single_flight import SingleFlight
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+@dataclass
+class CorpusFetch:
+    # None when the server answered 304 Not Modified
+    questions: Optional[List[Dict]]
+    etag: Optional[str]
+    last_modified: Optional[str]
 
 class LiteraryVaultClient:
-    def __init__(self):
-        self.base_url = "https://exios66.github.io/Literary-Vault/api/v1"
+    """
+    Client for the Literary Vault API. One pooled httpx.AsyncClient is
+    shared by all requests so connections (and TLS sessions) are reused;
+    it is opened by start() and closed by close() with the application.
+    Identical concurrent corpus fetches (e.g. a cache refresh and a
+    snapshot sync) share one upstream call and its result, which callers
+    must not mutate.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "https://exios66.github.io/Literary-Vault/api/v1",
+        timeout: float = 10.0,
+        connect_timeout: float = 5.0,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        http2: bool = True
+    ):
+        self.base_url = base_url
         self.logger = logging.getLogger(__name__)
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        # HTTP/2 needs the optional h2 package; fall back to HTTP/1.1 keep-alive
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self._client: Optional[httpx.AsyncClient] = None
+        self.flights = SingleFlight()
 
-    async def get_questions(
-        self, 
-        category: str, 
-        limit: Optional[int] = 10,
-        random: Optional[bool] = True
-    ) -> List[Dict]:
-        """
-        Fetch questions from Literary Vault API
-        """
-        try:
-            params = {
-                "limit": limit,
-                "random": random
-            }
-            
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/questions/{category}",
-                    params=params
-                )
-                response.raise_for_status()
-                return response.json()
-        except httpx.HTTPError as e:
-            self.logger.error(f"Error fetching questions: {str(e)}")
-            raise HTTPException(status_code=500, detail="Failed to fetch questions")
-
-    async def randomize_questions(
+    async def start(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url, http2=self.http2, limits=self.limits, timeout=self.timeout
+            )
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _http(self) -> httpx.AsyncClient:
+        # Opened on first use when called outside the application lifecycle
+        if self._client is None:
+            await self.start()
+        return self._client
+
+    async def fetch_corpus(
         self,
         category: str,
-        count: Optional[int] = 5,
-        seed: Optional[int] = None
-    ) -> List[Dict]:
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ) -> CorpusFetch:
+        """
+        Fetch every question in a category, conditionally on the validators
+        of a copy already held; raises httpx.HTTPError on failure.
+
+        GET /questions/{category} without parameters is the category's
+        whole question list (the static Literary Vault site serves one
+        file per category). A response that is not a list, or that links
+        to a next page, raises ValueError rather than being taken as the
+        full corpus.
+        """
+        return await self.flights.run(
+            ("corpus", category, etag, last_modified),
+            lambda: self._fetch_corpus(category, etag, last_modified)
+        )
+
+    async def _fetch_corpus(self, category: str, etag: Optional[str], last_modified: Optional[str]) -> CorpusFetch:
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        client = await self._http()
+        response = await client.get(f"/questions/{category}", headers=headers)
+        if response.status_code == 304:
+            return CorpusFetch(
+                None,
+                response.headers.get("etag", etag),
+                response.headers.get("last-modified", last_modified)
+            )
+        response.raise_for_status()
+        questions = response.json()
+        if not isinstance(questions, list) or "next" in response.links:
+            raise ValueError(f"/questions/{category} did not return the whole category")
+        return CorpusFetch(questions, response.headers.get("etag"), response.headers.get("last-modified"))
+
+    def stats(self) -> Dict:
         """
-        Get randomized questions from Literary Vault API
+        Corpus fetches made and requests that shared an in-flight fetch
         """
-        try:
-            data = {
-                "category": category,
-                "count": count
-            }
-            if seed is not None:
-                data["seed"] = seed
-
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/questions/randomize",
-                    json=data
-                )
-                response.raise_for_status()
-                return response.json()
-        except httpx.HTTPError as e:
-            self.logger.error(f"Error randomizing questions: {str(e)}")
-            raise HTTPException(status_code=500, detail="Failed to randomize questions") 
\ No newline at end of file
+        return self.flights.stats()
@@ -1,45 +1,326 @@
-from ..models import AnalysisRequest, AnalysisResponse, ModelType
+from ..models import AnalysisRequest, AnalysisResponse, LayerDiff, ModelDiffResponse, ModelType
+from .executor import AnalysisExecutor
+from .result_cache import ResultCache
+from .similarity_index import SimilarityIndex, fingerprint
+from .model_readers import READERS, ModelFormatError, ModelReader, ModelSource, open_model_buffer, open_reader
+from .model_diff import ModelDiff, apply_distribution_shift, diff_models, is_changed, shift_flags
+from .weight_stats import LayerStats, is_float_tensor, layer_anomalies, layer_stats
+import asyncio
+import heapq
 import logging
-import numpy as np
-from typing import List
+import math
+from typing import Dict, List, Optional, Tuple
+
+# Weights scanned at which confidence reaches ~63% of its headroom
+CONFIDENCE_SCALE = 100_000
 
 class ModelAnalyzer:
-    def __init__(self):
+    # Bump when analysis output changes so cached results are invalidated
+    VERSION = "2.1.1"
+
+    def __init__(
+        self,
+        executor: Optional[AnalysisExecutor] = None,
+        cache: Optional[ResultCache] = None,
+        layer_cache: Optional[ResultCache] = None,
+        layer_executor: Optional[AnalysisExecutor] = None,
+        parallel_min_bytes: int = 64 << 20,
+        similarity_index: Optional[SimilarityIndex] = None
+    ):
         self.logger = logging.getLogger(__name__)
+        self.executor = executor
+        self.cache = cache
+        # Per-layer statistics by content hash, shared by analyses and diffs
+        self.layer_cache = layer_cache
+        # Process pool that spreads the layers of large file-backed models
+        self.layer_executor = layer_executor
+        self.parallel_min_bytes = parallel_min_bytes
+        # Fingerprints of every model whose layers were scanned
+        self.similarity_index = similarity_index
+
+    async def lookup(self, sha256: str) -> Optional[AnalysisResponse]:
+        """
+        Return the cached analysis of the model with this content hash, if any
+        """
+        if self.cache is None:
+            return None
+        cached = await self.cache.aget(self.cache.make_key(sha256.lower()))
+        return AnalysisResponse.model_validate(cached) if cached is not None else None
 
     async def analyze(self, request: AnalysisRequest) -> AnalysisResponse:
         """
         Analyze an AI model for potential deception points
         """
         try:
-            # Implement actual model analysis logic here
-            deception_points = self._analyze_deception_points(request.model_data)
-            accuracy = self._calculate_accuracy(request.model_data)
-            recommendation = self._generate_recommendation(deception_points)
-            
-            return AnalysisResponse(
-                model_type=request.model_type,
-                accuracy=accuracy,
-                deception_points=deception_points,
-                recommendation=recommendation,
-                confidence_score=self._calculate_confidence(deception_points)
-            )
+            if request.sha256:
+                cached = await self.lookup(request.sha256)
+                if cached is not None:
+                    return cached
+            stats = await self.layer_statistics(request)
+            result = self._build_response(request.model_type, request.model_format, stats)
+            if self.cache is not None and request.sha256:
+                await self.cache.aset(self.cache.make_key(request.sha256.lower()), result.model_dump(mode="json"))
+            return result
         except Exception as e:
             self.logger.error(f"Error in model analysis: {str(e)}")
             raise
 
-    def _analyze_deception_points(self, model_data: bytes) -> List[str]:
-        # Implement deception point analysis
-        return ["Potential bias in output layer", "Unusual activation patterns"]
+    async def layer_statistics(self, request: AnalysisRequest) -> Optional[List[LayerStats]]:
+        """
+        Per-layer statistics for a model, or None when its weights cannot be
+        read; reused from the layer cache when the model was seen before
+        """
+        key = None
+        if self.layer_cache is not None and request.sha256:
+            key = self.layer_cache.make_key(request.sha256.lower())
+            cached = await self.layer_cache.aget(key)
+            if cached is not None:
+                stats = [LayerStats.from_dict(layer) for layer in cached["layers"]]
+                # Models scanned before the index existed are added on their next visit
+                if self.similarity_index is not None and stats:
+                    await asyncio.to_thread(self._index, request, stats, True)
+                return stats
+        source = request.model_path or request.model_data
+        if source is None:
+            raise ValueError("Analysis request has neither model_data nor model_path")
+        stats = None
+        if self._parallel(request):
+            stats = await self._parallel_layer_stats(request.model_path, request.model_format)
+        if stats is None:
+            stats = await self._call(type(self)._run_layer_stats, source, request.model_format)
+        if key is not None and stats is not None:
+            await self.layer_cache.aset(key, {"layers": [layer.to_dict() for layer in stats]})
+        if self.similarity_index is not None and request.sha256 and stats:
+            await asyncio.to_thread(self._index, request, stats)
+        return stats
+
+    def _index(self, request: AnalysisRequest, stats: List[LayerStats], only_new: bool = False):
+        # Blocking SQLite work; callers run it in a worker thread
+        if only_new and self.similarity_index.get(request.sha256) is not None:
+            return
+        self.similarity_index.add(request.sha256, fingerprint(stats), request.model_type.value)
+
+    def similar(self, sha256: str, k: int = 10) -> Optional[List[Dict]]:
+        """
+        The k indexed models whose fingerprints are closest to this model's,
+        or None when the model has not been indexed
+        """
+        if self.similarity_index is None:
+            return None
+        vector = self.similarity_index.get(sha256)
+        if vector is None:
+            return None
+        return self.similarity_index.query(vector, k, exclude=sha256)
+
+    async def diff(self, base: AnalysisRequest, candidate: AnalysisRequest) -> ModelDiffResponse:
+        """
+        Compare two models layer by layer: weight deltas are computed by
+        streaming both models chunk by chunk, distribution shifts come from
+        the (possibly cached) per-layer statistics
+        """
+        key = None
+        if self.cache is not None and base.sha256 and candidate.sha256:
+            key = self.cache.make_key("diff", base.sha256.lower(), candidate.sha256.lower())
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                return ModelDiffResponse.model_validate(cached)
+
+        base_stats = await self.layer_statistics(base)
+        candidate_stats = await self.layer_statistics(candidate)
+        for label, stats, request in (("base", base_stats, base), ("candidate", candidate_stats, candidate)):
+            if stats is None:
+                raise ModelFormatError(f"Cannot read the {label} model's weights ({request.model_format or 'unknown format'})")
+
+        model_diff = await self._call(
+            type(self)._run_diff,
+            base.model_path or base.model_data, base.model_format,
+            candidate.model_path or candidate.model_data, candidate.model_format
+        )
+        base_by_name = {layer.name: layer for layer in base_stats}
+        candidate_by_name = {layer.name: layer for layer in candidate_stats}
+        changed = []
+        for delta in model_diff.deltas:
+            if not is_changed(delta):
+                continue
+            if delta.name in base_by_name and delta.name in candidate_by_name:
+                apply_distribution_shift(delta, base_by_name[delta.name], candidate_by_name[delta.name])
+            changed.append(delta)
+
+        result = ModelDiffResponse(
+            base_sha256=base.sha256,
+            candidate_sha256=candidate.sha256,
+            compared_layers=len(model_diff.deltas),
+            unchanged_layers=len(model_diff.deltas) - len(changed),
+            changed_layers=[LayerDiff(**delta.to_dict()) for delta in changed],
+            added_layers=model_diff.added,
+            removed_layers=model_diff.removed,
+            reshaped_layers=model_diff.reshaped,
+            distribution_shifts=[flag for delta in changed for flag in shift_flags(delta)]
+        )
+        if key is not None:
+            await self.cache.aset(key, result.model_dump(mode="json"))
+        return result
+
+    async def _call(self, fn, *args):
+        if self.executor is None:
+            return fn(*args)
+        return await self.executor.run(fn, *args)
+
+    def _parallel(self, request: AnalysisRequest) -> bool:
+        # Workers map the spooled file themselves; in-memory uploads are
+        # small enough that dispatch would cost more than it saves
+        return (
+            self.layer_executor is not None
+            and self.layer_executor.max_workers > 1
+            and request.model_path is not None
+            and (request.size or 0) >= self.parallel_min_bytes
+        )
+
+    async def _parallel_layer_stats(self, path: str, model_format: Optional[str]) -> Optional[List[LayerStats]]:
+        """
+        Split the layers into byte-balanced groups and reduce each group in
+        its own worker process; returns None when the model has no readable
+        layers so the caller falls back to the serial path
+        """
+        groups = await self._call(
+            type(self)._plan_layer_groups, path, model_format, self.layer_executor.max_workers
+        )
+        if not groups:
+            return None
+        parts = await asyncio.gather(*(
+            self.layer_executor.run(type(self)._group_layer_stats, path, model_format, group)
+            for group in groups
+        ))
+        # Merge in file order so the result does not depend on scheduling
+        indexed = sorted(item for part in parts for item in part)
+        return [stats for _, stats in indexed]
+
+    @classmethod
+    def _plan_layer_groups(cls, path: str, model_format: Optional[str], workers: int) -> Optional[List[List[int]]]:
+        with open_model_buffer(path) as buffer:
+            reader = cls._open_reader(model_format, buffer, path)
+            if reader is None:
+                return None
+            try:
+                layers = [(info.nbytes, i) for i, info in enumerate(reader.tensors) if is_float_tensor(info)]
+            finally:
+                reader.close()
+        if len(layers) < 2:
+            return None
+        # Largest layers first, each to the group with the fewest bytes so far
+        heap = [(0, n, []) for n in range(min(workers, len(layers)))]
+        for nbytes, i in sorted(layers, reverse=True):
+            total, n, group = heapq.heappop(heap)
+            group.append(i)
+            heapq.heappush(heap, (total + nbytes, n, group))
+        return [sorted(group) for _, _, group in sorted(heap, key=lambda entry: entry[1])]
+
+    @classmethod
+    def _group_layer_stats(
+        cls,
+        path: str,
+        model_format: Optional[str],
+        indices: List[int]
+    ) -> List[Tuple[int, LayerStats]]:
+        # Runs in a worker process, which maps the file rather than receiving
+        # pickled arrays; only the small LayerStats are sent back
+        with open_model_buffer(path) as buffer:
+            reader = open_reader(model_format, buffer, path)
+            try:
+                results = [(i, layer_stats(reader, reader.tensors[i])) for i in indices]
+            finally:
+                reader.close()
+        return [(i, stats) for i, stats in results if stats is not None]
+
+    @classmethod
+    def _run_layer_stats(cls, source: ModelSource, model_format: Optional[str]) -> Optional[List[LayerStats]]:
+        with open_model_buffer(source) as buffer:
+            reader = cls._open_reader(model_format, buffer, source)
+            try:
+                return cls._collect_layer_stats(reader)
+            finally:
+                if reader is not None:
+                    reader.close()
+
+    @classmethod
+    def _run_diff(
+        cls,
+        base_source: ModelSource,
+        base_format: Optional[str],
+        candidate_source: ModelSource,
+        candidate_format: Optional[str]
+    ) -> ModelDiff:
+        with open_model_buffer(base_source) as base_buffer, open_model_buffer(candidate_source) as candidate_buffer:
+            base = open_reader(base_format, base_buffer, base_source)
+            try:
+                candidate = open_reader(candidate_format, candidate_buffer, candidate_source)
+                try:
+                    return diff_models(base, candidate)
+                finally:
+                    candidate.close()
+            finally:
+                base.close()
+
+    @classmethod
+    def _build_response(
+        cls,
+        model_type: ModelType,
+        model_format: Optional[str],
+        stats: Optional[List[LayerStats]]
+    ) -> AnalysisResponse:
+        deception_points = cls._analyze_deception_points(stats, model_format)
+        recommendation = cls._generate_recommendation(deception_points)
+
+        return AnalysisResponse(
+            model_type=model_type,
+            accuracy=cls._calculate_accuracy(stats),
+            deception_points=deception_points,
+            recommendation=recommendation,
+            confidence_score=cls._calculate_confidence(stats)
+        )
+
+    @staticmethod
+    def _open_reader(model_format: Optional[str], buffer: memoryview, source: ModelSource) -> Optional[ModelReader]:
+        if model_format not in READERS:
+            return None
+        try:
+            return open_reader(model_format, buffer, source)
+        except (ModelFormatError, KeyError, ValueError, OSError) as e:
+            logging.getLogger(__name__).warning(f"Could not read {model_format} model: {str(e)}")
+            return None
+
+    @staticmethod
+    def _collect_layer_stats(reader: Optional[ModelReader]) -> Optional[List[LayerStats]]:
+        if reader is None:
+            return None
+        # Layers are reduced one at a time, in bounded chunks
+        stats = (layer_stats(reader, info) for info in reader.tensors)
+        return [layer for layer in stats if layer is not None]
+
+    @staticmethod
+    def _analyze_deception_points(stats: Optional[List[LayerStats]], model_format: Optional[str]) -> List[str]:
+        if stats is None:
+            if model_format is None:
+                return ["Unrecognized model format; weights were not inspected"]
+            if model_format not in READERS:
+                return [f"Weights in {model_format} models are not inspected"]
+            return [f"Could not parse the {model_format} model; weights were not inspected"]
+        return [anomaly for layer in stats for anomaly in layer_anomalies(layer)]
 
-    def _calculate_accuracy(self, model_data: bytes) -> float:
+    @staticmethod
+    def _calculate_accuracy(stats: Optional[List[LayerStats]]) -> float:
         # Implement accuracy calculation
         return 0.918
 
-    def _generate_recommendation(self, deception_points: List[str]) -> str:
+    @staticmethod
+    def _generate_recommendation(deception_points: List[str]) -> str:
         # Generate recommendations based on findings
+        if not deception_points:
+            return "No anomalies found in the model weights"
         return "Consider reviewing the model's training data for potential biases"
 
-    def _calculate_confidence(self, deception_points: List[str]) -> float:
-        # Calculate confidence score
-        return 0.85 
\ No newline at end of file
+    @staticmethod
+    def _calculate_confidence(stats: Optional[List[LayerStats]]) -> float:
+        # Confidence grows with the number of weights actually inspected
+        scanned = sum(layer.count for layer in stats or ())
+        return round(0.5 + 0.45 * (1 - math.exp(-scanned / CONFIDENCE_SCALE)), 3)
@@ -0,0 +1,183 @@
+from .model_readers import ModelReader, TensorInfo
+from .weight_stats import LayerStats, is_float_tensor
+import math
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+
+# Elements per chunk of each model held at once while comparing a layer pair
+DIFF_CHUNK_ELEMENTS = 1 << 18
+
+# A layer whose relative L2 change is at most this is reported as unchanged
+CHANGE_TOLERANCE = 1e-7
+
+# Distribution shift thresholds
+MAX_MEAN_SHIFT = 0.5
+MAX_STD_RATIO = 2.0
+MAX_RELATIVE_L2 = 1.0
+MIN_COSINE_SIMILARITY = 0.5
+
+@dataclass
+class LayerDelta:
+    name: str
+    shape: List[int]
+    # ||candidate - base|| / ||base||; None when the base layer is all zeros
+    relative_l2: Optional[float]
+    cosine_similarity: float
+    max_abs_delta: float
+    # Share of weights whose value changed at all
+    changed_fraction: float
+    # Distribution shift from the per-layer statistics: mean change in
+    # units of the base std, and the ratio of the stds; None when the base
+    # layer is constant
+    mean_shift: Optional[float] = 0.0
+    std_ratio: Optional[float] = 1.0
+    sparsity_delta: float = 0.0
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+@dataclass
+class ModelDiff:
+    deltas: List[LayerDelta]
+    added: List[str]
+    removed: List[str]
+    reshaped: List[str]
+
+def _aligned_chunks(
+    base: Iterator[np.ndarray],
+    candidate: Iterator[np.ndarray]
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    # Readers may chunk differently (e.g. HDF5 row slabs), so re-cut both
+    # streams at common boundaries
+    left = right = np.empty(0)
+    while True:
+        if not left.size:
+            left = next(base, None)
+        if not right.size:
+            right = next(candidate, None)
+        if left is None or right is None:
+            return
+        n = min(left.size, right.size)
+        yield left[:n], right[:n]
+        left, right = left[n:], right[n:]
+
+def _flat_chunks(reader: ModelReader, info: TensorInfo, order: str, chunk_elements: int) -> Iterator[np.ndarray]:
+    if info.fortran_order == (order == "F"):
+        yield from reader.iter_chunks(info, chunk_elements)
+        return
+    # Element order differs between the two files; bring this layer into
+    # the other's order (one layer in its storage dtype)
+    flat = reader.read(info).reshape(-1, order=order)
+    for start in range(0, flat.size, chunk_elements):
+        yield flat[start:start + chunk_elements]
+
+def layer_delta(
+    base: ModelReader,
+    base_info: TensorInfo,
+    candidate: ModelReader,
+    candidate_info: TensorInfo,
+    chunk_elements: int = DIFF_CHUNK_ELEMENTS
+) -> LayerDelta:
+    """
+    Compare two same-shaped layers chunk by chunk, holding one chunk of each
+    in float64 at a time
+    """
+    order = "F" if base_info.fortran_order else "C"
+    base_sq = candidate_sq = dot = delta_sq = max_abs = 0.0
+    changed = 0
+    pairs = _aligned_chunks(
+        base.iter_chunks(base_info, chunk_elements),
+        _flat_chunks(candidate, candidate_info, order, chunk_elements)
+    )
+    for left, right in pairs:
+        left = left.astype(np.float64)
+        right = right.astype(np.float64)
+        delta = right - left
+        base_sq += float(np.dot(left, left))
+        candidate_sq += float(np.dot(right, right))
+        dot += float(np.dot(left, right))
+        delta_sq += float(np.dot(delta, delta))
+        if delta.size:
+            max_abs = max(max_abs, float(np.abs(delta).max()))
+        changed += int(np.count_nonzero(delta))
+
+    base_norm = math.sqrt(base_sq)
+    candidate_norm = math.sqrt(candidate_sq)
+    if base_norm > 0:
+        relative_l2 = math.sqrt(delta_sq) / base_norm
+    else:
+        relative_l2 = 0.0 if candidate_norm == 0 else None
+    if base_norm > 0 and candidate_norm > 0:
+        cosine = dot / (base_norm * candidate_norm)
+    else:
+        cosine = 1.0 if base_norm == candidate_norm else 0.0
+    size = base_info.size
+    return LayerDelta(
+        name=base_info.name,
+        shape=list(base_info.shape),
+        relative_l2=relative_l2,
+        cosine_similarity=cosine,
+        max_abs_delta=max_abs,
+        changed_fraction=changed / size if size else 0.0,
+    )
+
+def diff_models(base: ModelReader, candidate: ModelReader, chunk_elements: int = DIFF_CHUNK_ELEMENTS) -> ModelDiff:
+    """
+    Match float layers by name and compare each pair in turn
+    """
+    base_layers = {info.name: info for info in base.tensors if is_float_tensor(info)}
+    candidate_layers = {info.name: info for info in candidate.tensors if is_float_tensor(info)}
+    deltas = []
+    reshaped = []
+    for name, base_info in base_layers.items():
+        candidate_info = candidate_layers.get(name)
+        if candidate_info is None:
+            continue
+        if tuple(candidate_info.shape) != tuple(base_info.shape):
+            reshaped.append(name)
+            continue
+        deltas.append(layer_delta(base, base_info, candidate, candidate_info, chunk_elements))
+    return ModelDiff(
+        deltas=deltas,
+        added=[name for name in candidate_layers if name not in base_layers],
+        removed=[name for name in base_layers if name not in candidate_layers],
+        reshaped=reshaped,
+    )
+
+def apply_distribution_shift(delta: LayerDelta, base: LayerStats, candidate: LayerStats):
+    """
+    Fill in the distribution-shift fields of a delta from per-layer stats
+    """
+    if base.std > 0:
+        delta.mean_shift = (candidate.mean - base.mean) / base.std
+        delta.std_ratio = candidate.std / base.std
+    else:
+        delta.mean_shift = 0.0 if candidate.mean == base.mean else None
+        delta.std_ratio = 1.0 if candidate.std == 0 else None
+    delta.sparsity_delta = candidate.sparsity - base.sparsity
+
+def shift_flags(delta: LayerDelta) -> List[str]:
+    """
+    Describe a changed layer's shifts that exceed the thresholds
+    """
+    name = delta.name
+    flags = []
+    if delta.relative_l2 is None:
+        flags.append(f"Layer {name} was all zeros and now has weights")
+    else:
+        if delta.relative_l2 > MAX_RELATIVE_L2:
+            flags.append(f"Layer {name} changed by {delta.relative_l2:.2f}x its norm")
+        if delta.cosine_similarity < MIN_COSINE_SIMILARITY:
+            flags.append(f"Layer {name} points in a new direction (cosine {delta.cosine_similarity:.2f})")
+    if delta.mean_shift is None or delta.std_ratio is None:
+        flags.append(f"Layer {name} was constant and changed")
+    else:
+        if abs(delta.mean_shift) > MAX_MEAN_SHIFT:
+            flags.append(f"Layer {name} mean moved by {delta.mean_shift:+.2f} standard deviations")
+        if not 1 / MAX_STD_RATIO <= delta.std_ratio <= MAX_STD_RATIO:
+            flags.append(f"Layer {name} spread changed by a factor of {delta.std_ratio:.2f}")
+    return flags
+
+def is_changed(delta: LayerDelta) -> bool:
+    return delta.changed_fraction > 0 and (delta.relative_l2 is None or delta.relative_l2 > CHANGE_TOLERANCE)
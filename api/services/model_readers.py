@@ -0,0 +1,312 @@
+import ast
+import io
+import json
+import mmap
+import struct
+import zipfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple, Type, Union
+
+import numpy as np
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+# A model is either a path to a spooled file or a small in-memory payload;
+# both are cheap to hand to a process pool
+ModelSource = Union[str, bytes]
+
+NPY_MAGIC = b"\x93NUMPY"
+ZIP_LOCAL_HEADER = struct.Struct("<4s22xHH")
+BFLOAT16 = "bfloat16"
+
+SAFETENSORS_DTYPES = {
+    "F64": "<f8", "F32": "<f4", "F16": "<f2", "BF16": BFLOAT16,
+    "I64": "<i8", "I32": "<i4", "I16": "<i2", "I8": "i1",
+    "U64": "<u8", "U32": "<u4", "U16": "<u2", "U8": "u1", "BOOL": "?",
+}
+
+class ModelFormatError(ValueError):
+    """
+    Raised when a model file cannot be parsed by the selected reader
+    """
+
+@contextmanager
+def open_model_buffer(source: ModelSource) -> Iterator[memoryview]:
+    """
+    Expose a model as a read-only buffer without copying it: file-backed
+    sources are memory-mapped, in-memory sources are wrapped in a memoryview
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        yield memoryview(source)
+        return
+    with open(source, "rb") as model_file:
+        try:
+            mapped = mmap.mmap(model_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            yield memoryview(b"")
+            return
+        view = memoryview(mapped)
+        try:
+            yield view
+        finally:
+            try:
+                view.release()
+                mapped.close()
+            except BufferError:
+                # An array view outlived the reader; the mapping closes when
+                # that array is garbage collected
+                pass
+
+@dataclass
+class TensorInfo:
+    name: str
+    dtype: str
+    shape: Tuple[int, ...]
+    # Byte offset of the data in the model buffer when it can be viewed
+    # in place; None when the tensor must be decoded (e.g. compressed)
+    offset: Optional[int]
+    fortran_order: bool = False
+
+    @property
+    def size(self) -> int:
+        return int(np.prod(self.shape, dtype=np.int64))
+
+    @property
+    def storage_dtype(self) -> np.dtype:
+        return np.dtype("<u2") if self.dtype == BFLOAT16 else np.dtype(self.dtype)
+
+    @property
+    def nbytes(self) -> int:
+        return self.size * self.storage_dtype.itemsize
+
+def to_float(chunk: np.ndarray, dtype: str) -> np.ndarray:
+    if dtype == BFLOAT16:
+        # bfloat16 is the upper half of a float32
+        return (chunk.astype(np.uint32) << 16).view(np.float32)
+    return chunk
+
+class ModelReader:
+    """
+    Lazily reads tensors from a model buffer. Only headers and the tensor
+    index are parsed up front; weights are exposed on demand as zero-copy
+    NumPy views wherever the format stores them uncompressed.
+    """
+
+    format = "unknown"
+
+    def __init__(self, buffer: memoryview, source: ModelSource):
+        self.buffer = buffer
+        self.source = source
+        self.tensors: List[TensorInfo] = self._index()
+
+    def _index(self) -> List[TensorInfo]:
+        raise NotImplementedError
+
+    def _check_extent(self, info: TensorInfo) -> TensorInfo:
+        # Truncated or corrupt files must fail here, not inside np.frombuffer
+        if info.offset is not None and (info.offset < 0 or info.offset + info.nbytes > len(self.buffer)):
+            raise ModelFormatError(
+                f"Tensor {info.name} ({info.nbytes} bytes at offset {info.offset}) "
+                f"extends past the end of the {len(self.buffer)} byte file"
+            )
+        return info
+
+    def tensor(self, name: str) -> TensorInfo:
+        for info in self.tensors:
+            if info.name == name:
+                return info
+        raise KeyError(name)
+
+    def read(self, info: TensorInfo) -> np.ndarray:
+        """
+        Return the tensor in its storage dtype, as a view when possible
+        """
+        if info.offset is None:
+            return self._decode(info)
+        flat = np.frombuffer(self.buffer, dtype=info.storage_dtype, count=info.size, offset=info.offset)
+        return flat.reshape(info.shape, order="F" if info.fortran_order else "C")
+
+    def iter_chunks(self, info: TensorInfo, max_elements: int = 1 << 22) -> Iterator[np.ndarray]:
+        """
+        Yield the tensor's elements as flat chunks of at most max_elements,
+        converted to a NumPy float type where the storage type has none
+        """
+        if info.offset is None:
+            flat = self._decode(info).reshape(-1)
+        else:
+            flat = np.frombuffer(self.buffer, dtype=info.storage_dtype, count=info.size, offset=info.offset)
+        for start in range(0, info.size, max_elements):
+            yield to_float(flat[start:start + max_elements], info.dtype)
+
+    def _decode(self, info: TensorInfo) -> np.ndarray:
+        raise ModelFormatError(f"Tensor {info.name} has no in-place data")
+
+    def close(self):
+        pass
+
+def _parse_npy_header(buffer: memoryview, offset: int) -> Tuple[np.dtype, Tuple[int, ...], bool, int]:
+    if bytes(buffer[offset:offset + 6]) != NPY_MAGIC:
+        raise ModelFormatError("Missing .npy magic")
+    try:
+        major = buffer[offset + 6]
+        if major == 1:
+            header_len = struct.unpack_from("<H", buffer, offset + 8)[0]
+            header_start = offset + 10
+        else:
+            header_len = struct.unpack_from("<I", buffer, offset + 8)[0]
+            header_start = offset + 12
+        if header_start + header_len > len(buffer):
+            raise ModelFormatError("Truncated .npy header")
+        header = ast.literal_eval(bytes(buffer[header_start:header_start + header_len]).decode("latin1"))
+        dtype = np.dtype(header["descr"])
+        shape = tuple(int(dim) for dim in header["shape"])
+        fortran_order = bool(header["fortran_order"])
+    except (IndexError, struct.error, SyntaxError, ValueError, TypeError, KeyError) as e:
+        if isinstance(e, ModelFormatError):
+            raise
+        raise ModelFormatError(f"Malformed .npy header: {e}")
+    if any(dim < 0 for dim in shape):
+        raise ModelFormatError("Negative dimension in .npy header")
+    if dtype.hasobject:
+        raise ModelFormatError("Object arrays are not supported")
+    return dtype, shape, fortran_order, header_start + header_len
+
+class NpyReader(ModelReader):
+    format = "npy"
+
+    def _index(self) -> List[TensorInfo]:
+        dtype, shape, fortran_order, data_offset = _parse_npy_header(self.buffer, 0)
+        return [self._check_extent(TensorInfo("array", dtype.str, shape, data_offset, fortran_order))]
+
+class NpzReader(ModelReader):
+    format = "npz"
+
+    def _index(self) -> List[TensorInfo]:
+        source = self.source if isinstance(self.source, str) else io.BytesIO(self.source)
+        try:
+            self._zip = zipfile.ZipFile(source)
+        except zipfile.BadZipFile as e:
+            raise ModelFormatError(str(e))
+        tensors = []
+        for member in self._zip.infolist():
+            if not member.filename.endswith(".npy"):
+                continue
+            name = member.filename[:-4]
+            if member.compress_type == zipfile.ZIP_STORED:
+                # Stored members can be viewed in place behind their local header
+                if member.header_offset + ZIP_LOCAL_HEADER.size > len(self.buffer):
+                    raise ModelFormatError(f"Truncated local header for {member.filename}")
+                signature, name_len, extra_len = ZIP_LOCAL_HEADER.unpack_from(self.buffer, member.header_offset)
+                if signature != b"PK\x03\x04":
+                    raise ModelFormatError(f"Bad local header for {member.filename}")
+                start = member.header_offset + ZIP_LOCAL_HEADER.size + name_len + extra_len
+                dtype, shape, fortran_order, data_offset = _parse_npy_header(self.buffer, start)
+                tensors.append(self._check_extent(TensorInfo(name, dtype.str, shape, data_offset, fortran_order)))
+            else:
+                with self._zip.open(member) as stream:
+                    if np.lib.format.read_magic(stream) == (1, 0):
+                        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(stream)
+                    else:
+                        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(stream)
+                tensors.append(TensorInfo(name, dtype.str, shape, None, fortran_order))
+        return tensors
+
+    def _decode(self, info: TensorInfo) -> np.ndarray:
+        # Compressed members are inflated one tensor at a time
+        with self._zip.open(info.name + ".npy") as stream:
+            return np.lib.format.read_array(stream)
+
+    def close(self):
+        self._zip.close()
+
+class SafetensorsReader(ModelReader):
+    format = "safetensors"
+
+    def _index(self) -> List[TensorInfo]:
+        if len(self.buffer) < 8:
+            raise ModelFormatError("Truncated safetensors header")
+        header_len = struct.unpack_from("<Q", self.buffer, 0)[0]
+        if header_len > len(self.buffer) - 8:
+            raise ModelFormatError("Safetensors header exceeds file size")
+        try:
+            header = json.loads(bytes(self.buffer[8:8 + header_len]))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise ModelFormatError(f"Malformed safetensors header: {e}")
+        base = 8 + header_len
+        tensors = []
+        for name, entry in header.items():
+            if name == "__metadata__":
+                continue
+            dtype = SAFETENSORS_DTYPES.get(entry["dtype"])
+            if dtype is None:
+                raise ModelFormatError(f"Unsupported safetensors dtype {entry['dtype']}")
+            start, end = entry["data_offsets"]
+            info = TensorInfo(name, dtype, tuple(entry["shape"]), base + start)
+            if start < 0 or end - start != info.nbytes:
+                raise ModelFormatError(
+                    f"Tensor {name} spans {end - start} bytes but its shape and dtype need {info.nbytes}"
+                )
+            tensors.append(self._check_extent(info))
+        tensors.sort(key=lambda info: info.offset)
+        return tensors
+
+class HDF5Reader(ModelReader):
+    format = "hdf5"
+
+    def _index(self) -> List[TensorInfo]:
+        if h5py is None:
+            raise ModelFormatError("Reading HDF5 models requires h5py")
+        source = self.source if isinstance(self.source, str) else io.BytesIO(self.source)
+        self._file = h5py.File(source, "r")
+        self._datasets: Dict[str, "h5py.Dataset"] = {}
+        tensors = []
+
+        def visit(name, node):
+            if not isinstance(node, h5py.Dataset) or node.dtype.kind not in "fiub":
+                return
+            self._datasets[name] = node
+            offset = None
+            # Contiguous, uncompressed datasets can be viewed in place
+            if node.chunks is None and node.compression is None and node.size:
+                offset = node.id.get_offset()
+            tensors.append(self._check_extent(TensorInfo(name, node.dtype.str, node.shape, offset)))
+
+        try:
+            self._file.visititems(visit)
+        except Exception:
+            self._file.close()
+            raise
+        return tensors
+
+    def _decode(self, info: TensorInfo) -> np.ndarray:
+        return self._datasets[info.name][()]
+
+    def iter_chunks(self, info: TensorInfo, max_elements: int = 1 << 22) -> Iterator[np.ndarray]:
+        if info.offset is not None or not info.shape:
+            yield from super().iter_chunks(info, max_elements)
+            return
+        # Decode chunked datasets a slab of rows at a time
+        dataset = self._datasets[info.name]
+        row_elements = max(1, info.size // max(1, info.shape[0]))
+        rows = max(1, max_elements // row_elements)
+        for start in range(0, info.shape[0], rows):
+            yield dataset[start:start + rows].reshape(-1)
+
+    def close(self):
+        self._file.close()
+
+READERS: Dict[str, Type[ModelReader]] = {
+    reader.format: reader
+    for reader in (NpyReader, NpzReader, SafetensorsReader, HDF5Reader)
+}
+
+def open_reader(model_format: str, buffer: memoryview, source: ModelSource) -> ModelReader:
+    reader_class = READERS.get(model_format)
+    if reader_class is None:
+        raise ModelFormatError(f"No reader for format {model_format}")
+    return reader_class(buffer, source)
@@ -0,0 +1,110 @@
+from ..models import ModelType
+from .model_readers import NPY_MAGIC, ZIP_LOCAL_HEADER
+import re
+import struct
+from dataclasses import dataclass
+from typing import Optional
+
+# Bytes of the upload inspected; every signature below fits well inside
+SNIFF_BYTES = 4096
+
+HDF5_SIGNATURE = b"\x89HDF\r\n\x1a\n"
+# HDF5 files with a user block put the superblock at a power of two >= 512
+HDF5_OFFSETS = (0, 512, 1024, 2048)
+ZIP_SIGNATURE = b"PK\x03\x04"
+PICKLE_PROTOCOLS = range(2, 6)
+MAX_SAFETENSORS_HEADER = 100 << 20
+
+# Tensor, module or operator names that identify the architecture
+TRANSFORMER_MARKERS = re.compile(
+    rb"attn|attention|q_proj|k_proj|v_proj|query|key_value|transformer|encoder\.layer|decoder\.layer",
+    re.IGNORECASE
+)
+TREE_MARKERS = re.compile(
+    rb"sklearn\.tree|sklearn\.ensemble\._(?:forest|gb|iforest)|xgboost|lightgbm|catboost|TreeEnsemble"
+)
+
+@dataclass(frozen=True)
+class ModelSignature:
+    # Format detected from the magic bytes, e.g. "hdf5" or "pickle"; None
+    # when no signature matched
+    model_format: Optional[str]
+    model_type: ModelType
+
+UNKNOWN = ModelSignature(None, ModelType.OTHER)
+
+def _network_type(head: bytes) -> ModelType:
+    if TRANSFORMER_MARKERS.search(head):
+        return ModelType.TRANSFORMER
+    return ModelType.NEURAL_NETWORK
+
+def _read_varint(data: bytes, offset: int):
+    value = shift = 0
+    while offset < len(data) and shift < 64:
+        byte = data[offset]
+        value |= (byte & 0x7F) << shift
+        offset += 1
+        if not byte & 0x80:
+            return value, offset
+        shift += 7
+    return None, offset
+
+def _sniff_zip(head: bytes) -> ModelSignature:
+    if len(head) < ZIP_LOCAL_HEADER.size:
+        return ModelSignature("zip", ModelType.OTHER)
+    _, name_len, _ = ZIP_LOCAL_HEADER.unpack_from(head, 0)
+    first_member = head[ZIP_LOCAL_HEADER.size:ZIP_LOCAL_HEADER.size + name_len]
+    if first_member.endswith(b".npy"):
+        return ModelSignature("npz", _network_type(head))
+    # torch.save writes <name>/data.pkl first; Keras 3 writes metadata.json
+    if first_member.endswith(b"data.pkl") or b"/data/" in first_member:
+        return ModelSignature("pytorch", _network_type(head))
+    if first_member in (b"metadata.json", b"config.json", b"model.weights.h5"):
+        return ModelSignature("keras", _network_type(head))
+    return ModelSignature("zip", ModelType.OTHER)
+
+def _sniff_pickle(head: bytes) -> ModelSignature:
+    # Pickles are classified by the module names they reference; they are
+    # never unpickled
+    if TREE_MARKERS.search(head):
+        return ModelSignature("pickle", ModelType.DECISION_TREE)
+    if b"torch" in head or b"keras" in head or b"tensorflow" in head:
+        return ModelSignature("pickle", _network_type(head))
+    return ModelSignature("pickle", ModelType.OTHER)
+
+def _is_safetensors(head: bytes) -> bool:
+    if len(head) < 10:
+        return False
+    header_len = struct.unpack_from("<Q", head, 0)[0]
+    return 2 <= header_len <= MAX_SAFETENSORS_HEADER and head[8:10] in (b'{"', b"{ ", b"{\n")
+
+def _is_onnx(head: bytes) -> bool:
+    # ModelProto starts with ir_version (field 1, varint) followed by another
+    # top-level field: producer name/version, domain, model version, doc
+    # string, graph or opset import
+    if len(head) < 4 or head[0] != 0x08:
+        return False
+    ir_version, offset = _read_varint(head, 1)
+    if ir_version is None or not 1 <= ir_version <= 32 or offset >= len(head):
+        return False
+    return head[offset] in (0x12, 0x1A, 0x22, 0x28, 0x32, 0x3A, 0x42)
+
+def sniff_model(head: bytes) -> ModelSignature:
+    """
+    Identify a model's format and type from its first bytes
+    (SNIFF_BYTES are enough), without parsing the rest of the file
+    """
+    if any(head[offset:offset + len(HDF5_SIGNATURE)] == HDF5_SIGNATURE for offset in HDF5_OFFSETS):
+        return ModelSignature("hdf5", _network_type(head))
+    if head.startswith(NPY_MAGIC):
+        return ModelSignature("npy", ModelType.OTHER)
+    if head.startswith(ZIP_SIGNATURE):
+        return _sniff_zip(head)
+    if len(head) >= 2 and head[0] == 0x80 and head[1] in PICKLE_PROTOCOLS:
+        return _sniff_pickle(head)
+    if _is_safetensors(head):
+        return ModelSignature("safetensors", _network_type(head))
+    if _is_onnx(head):
+        model_type = ModelType.DECISION_TREE if TREE_MARKERS.search(head) else _network_type(head)
+        return ModelSignature("onnx", model_type)
+    return UNKNOWN
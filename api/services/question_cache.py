@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import httpx
+
+from .literary_vault_client import LiteraryVaultClient
+from .single_flight import SingleFlight
+
+class CorpusUnavailable(Exception):
+    """
+    Raised when a category's questions cannot be fetched and no usable
+    stale copy is held
+    """
+
+@dataclass
+class CorpusEntry:
+    questions: List[Any]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    # time.monotonic() of the last fetch or successful revalidation
+    validated_at: float
+
+class QuestionCache:
+    """
+    Read-through cache of each category's question corpus. Entries are
+    fresh for ttl_seconds; for stale_while_revalidate seconds after that
+    they are still served while one background request revalidates them
+    with If-None-Match / If-Modified-Since, and for stale_if_error seconds
+    they are served when the upstream cannot be reached.
+    """
+
+    def __init__(
+        self,
+        client: LiteraryVaultClient,
+        ttl_seconds: float = 300,
+        stale_while_revalidate: float = 3600,
+        stale_if_error: float = 86400,
+        max_categories: int = 256,
+        parse: Optional[Callable[[List[Dict]], List[Any]]] = None
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.stale_while_revalidate = stale_while_revalidate
+        self.stale_if_error = stale_if_error
+        self.max_categories = max_categories
+        # Applied once per downloaded corpus, e.g. to validate it
+        self.parse = parse
+        self._entries: "OrderedDict[str, CorpusEntry]" = OrderedDict()
+        # Concurrent refreshes of one category share a single request
+        self._refreshes = SingleFlight()
+        self._background: Set[asyncio.Task] = set()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.not_modified = 0
+        self.stale_on_error = 0
+        self.errors = 0
+
+    async def get(self, category: str) -> List[Any]:
+        """
+        Return the category's questions, fetching or revalidating as needed
+        """
+        entry = self._entries.get(category)
+        if entry is not None:
+            age = time.monotonic() - entry.validated_at
+            self._entries.move_to_end(category)
+            if age < self.ttl_seconds:
+                self.hits += 1
+                return entry.questions
+            if age < self.ttl_seconds + self.stale_while_revalidate:
+                self.stale_hits += 1
+                self._revalidate_in_background(category)
+                return entry.questions
+        else:
+            self.misses += 1
+        return (await self._refresh(category)).questions
+
+    def prime(
+        self,
+        category: str,
+        questions: List[Dict],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        age_seconds: float = 0.0
+    ):
+        """
+        Install a copy of a category obtained elsewhere (e.g. a local
+        snapshot) that was last validated age_seconds ago
+        """
+        entry = CorpusEntry(
+            self.parse(questions) if self.parse else questions,
+            etag, last_modified, time.monotonic() - max(age_seconds, 0.0)
+        )
+        self._store(category, entry)
+
+    def _store(self, category: str, entry: CorpusEntry):
+        self._entries[category] = entry
+        self._entries.move_to_end(category)
+        while len(self._entries) > self.max_categories:
+            self._entries.popitem(last=False)
+
+    def _revalidate_in_background(self, category: str):
+        if self._refreshes.in_flight(category):
+            return
+        task = asyncio.ensure_future(self._refresh(category))
+        # Keep a reference until done; failures were already logged
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    async def _refresh(self, category: str) -> CorpusEntry:
+        return await self._refreshes.run(category, lambda: self._fetch(category))
+
+    async def _fetch(self, category: str) -> CorpusEntry:
+        entry = self._entries.get(category)
+        try:
+            if entry is not None:
+                self.revalidations += 1
+                fetched = await self.client.fetch_corpus(category, entry.etag, entry.last_modified)
+            else:
+                fetched = await self.client.fetch_corpus(category)
+            if fetched.questions is None and entry is not None:
+                self.not_modified += 1
+                entry.etag, entry.last_modified = fetched.etag, fetched.last_modified
+                entry.validated_at = time.monotonic()
+                return entry
+            if fetched.questions is None:
+                raise ValueError("Upstream answered 304 without a cached copy")
+            questions = self.parse(fetched.questions) if self.parse else fetched.questions
+        except (httpx.HTTPError, ValueError) as e:
+            self.errors += 1
+            self.logger.warning(f"Could not refresh questions for {category}: {str(e)}")
+            if entry is not None:
+                age = time.monotonic() - entry.validated_at
+                if age < self.ttl_seconds + self.stale_if_error:
+                    self.stale_on_error += 1
+                    return entry
+            raise CorpusUnavailable(f"Questions for {category} are unavailable") from e
+
+        entry = CorpusEntry(questions, fetched.etag, fetched.last_modified, time.monotonic())
+        self._store(category, entry)
+        return entry
+
+    def stats(self) -> Dict:
+        return {
+            "categories": len(self._entries),
+            "ttl_seconds": self.ttl_seconds,
+            "stale_while_revalidate": self.stale_while_revalidate,
+            "stale_if_error": self.stale_if_error,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "not_modified": self.not_modified,
+            "stale_on_error": self.stale_on_error,
+            "errors": self.errors,
+            "coalesced_refreshes": self._refreshes.coalesced,
+        }
@@ -0,0 +1,51 @@
+import hashlib
+import random
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from .question_cache import QuestionCache
+
+class QuestionSampler:
+    """
+    Reproducible draws from the locally cached corpus of a category. The
+    corpus is put in a canonical order (by id) and fingerprinted once per
+    downloaded copy, so a given seed yields the same questions for as long
+    as the corpus version is unchanged, with no upstream request.
+    """
+
+    def __init__(self, cache: QuestionCache):
+        self.cache = cache
+        # category -> (the cached list it was prepared from, sorted corpus, version)
+        self._prepared: Dict[str, Tuple[List[BaseModel], List[BaseModel], str]] = {}
+
+    @staticmethod
+    def corpus_version(corpus: List[BaseModel]) -> str:
+        digest = hashlib.sha256()
+        for question in corpus:
+            digest.update(question.model_dump_json().encode("utf-8"))
+            digest.update(b"\n")
+        return digest.hexdigest()[:16]
+
+    async def corpus(self, category: str) -> Tuple[List[BaseModel], str]:
+        """
+        The category's questions in canonical order and their version
+        """
+        questions = await self.cache.get(category)
+        prepared = self._prepared.get(category)
+        # Revalidations that return 304 keep the same list, so this is
+        # recomputed only when a new copy was downloaded
+        if prepared is None or prepared[0] is not questions:
+            ordered = sorted(questions, key=lambda question: (question.id, question.model_dump_json()))
+            prepared = (questions, ordered, self.corpus_version(ordered))
+            self._prepared[category] = prepared
+        return prepared[1], prepared[2]
+
+    async def sample(self, category: str, count: int, seed: Optional[int] = None) -> Tuple[List[BaseModel], str]:
+        """
+        Draw up to count distinct questions; returns them with the corpus
+        version they were drawn from. Unseeded draws are not reproducible.
+        """
+        ordered, version = await self.corpus(category)
+        rng = random.Random(seed) if seed is not None else random.Random()
+        return rng.sample(ordered, min(max(count, 0), len(ordered))), version
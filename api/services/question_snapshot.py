@@ -0,0 +1,241 @@
+"""
+Local SQLite snapshot of every Literary Vault category, in the questions
+table layout created by init_db.py, so the API can start warm without the
+upstream. Run a one-off sync with
+
+    python -m api.services.question_snapshot --db literary_vault.db
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+from .literary_vault_client import LiteraryVaultClient
+
+@dataclass
+class SnapshotCorpus:
+    questions: List[Dict]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    # time.time() of the last sync that fetched or revalidated it
+    synced_at: float
+
+@dataclass
+class SyncResult:
+    category: str
+    # "updated", "unchanged" or "failed"
+    status: str
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    corpus: Optional[SnapshotCorpus] = None
+    error: Optional[str] = None
+
+def _row_id(category: str, question_id) -> str:
+    # questions.id is the table's primary key, but upstream ids are only
+    # unique within a category
+    return f"{category}:{question_id}"
+
+def _question_id(category: str, row_id: str) -> str:
+    prefix = f"{category}:"
+    return row_id[len(prefix):] if row_id.startswith(prefix) else row_id
+
+def _row_values(question: Dict) -> Tuple[str, str, Optional[str]]:
+    options = question.get("options")
+    return (
+        question["question"],
+        question["correct_answer"],
+        json.dumps(options) if options is not None else None,
+    )
+
+class QuestionSnapshot:
+    """
+    Syncs Literary Vault categories into SQLite. Each category is fetched
+    conditionally on the validators of the last sync, and only rows that
+    changed are written, in one transaction per category. Rows are keyed
+    by category and question id, so categories that reuse an id do not
+    overwrite each other.
+    """
+
+    def __init__(self, path: str, client: LiteraryVaultClient, concurrency: int = 4):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.client = client
+        self.concurrency = max(1, concurrency)
+        self._task: Optional[asyncio.Task] = None
+        with closing(self._connect()) as conn, conn:
+            # Same table as init_db.py, plus the per-category sync state
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS questions (
+                    id TEXT PRIMARY KEY,
+                    category TEXT NOT NULL,
+                    question TEXT NOT NULL,
+                    correct_answer TEXT NOT NULL,
+                    options TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+                CREATE INDEX IF NOT EXISTS questions_category ON questions (category);
+                CREATE TABLE IF NOT EXISTS question_sync (
+                    category TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    synced_at REAL NOT NULL
+                );
+            ''')
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(questions)')}
+        if not {"id", "category", "question", "correct_answer", "options"} <= columns:
+            raise ValueError(f"{path} has a questions table in another layout than init_db.py's")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    def load(self) -> Dict[str, SnapshotCorpus]:
+        """
+        Every synced category's questions, ordered by id
+        """
+        corpora: Dict[str, SnapshotCorpus] = {}
+        with closing(self._connect()) as conn:
+            for category, etag, last_modified, synced_at in conn.execute(
+                'SELECT category, etag, last_modified, synced_at FROM question_sync'
+            ):
+                corpora[category] = SnapshotCorpus([], etag, last_modified, synced_at)
+            for id_, category, question, correct_answer, options in conn.execute(
+                'SELECT id, category, question, correct_answer, options FROM questions ORDER BY id'
+            ):
+                corpus = corpora.get(category)
+                if corpus is not None:
+                    corpus.questions.append({
+                        "id": _question_id(category, id_),
+                        "question": question,
+                        "correct_answer": correct_answer,
+                        "options": json.loads(options) if options is not None else None,
+                    })
+        return corpora
+
+    def _validators(self, category: str) -> Tuple[Optional[str], Optional[str]]:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                'SELECT etag, last_modified FROM question_sync WHERE category = ?', (category,)
+            ).fetchone()
+        return row if row is not None else (None, None)
+
+    def _apply(
+        self,
+        category: str,
+        questions: Optional[List[Dict]],
+        etag: Optional[str],
+        last_modified: Optional[str]
+    ) -> SyncResult:
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO question_sync VALUES (?, ?, ?, ?)',
+                (category, etag, last_modified, now)
+            )
+            if questions is None:
+                return SyncResult(category, "unchanged")
+            existing = {
+                row[0]: row[1:] for row in conn.execute(
+                    'SELECT id, question, correct_answer, options FROM questions WHERE category = ?',
+                    (category,)
+                )
+            }
+            incoming = {_row_id(category, question["id"]): _row_values(question) for question in questions}
+            changed = [
+                (id_, category) + values
+                for id_, values in incoming.items() if existing.get(id_) != values
+            ]
+            removed = [(id_,) for id_ in existing if id_ not in incoming]
+            conn.executemany(
+                'INSERT INTO questions (id, category, question, correct_answer, options) VALUES (?, ?, ?, ?, ?) '
+                'ON CONFLICT(id) DO UPDATE SET question = excluded.question, '
+                'correct_answer = excluded.correct_answer, options = excluded.options',
+                changed
+            )
+            conn.executemany('DELETE FROM questions WHERE id = ?', removed)
+        updated = sum(1 for row in changed if row[0] in existing)
+        return SyncResult(
+            category, "updated",
+            inserted=len(changed) - updated, updated=updated, deleted=len(removed),
+            corpus=SnapshotCorpus(questions, etag, last_modified, now)
+        )
+
+    async def sync_category(self, category: str) -> SyncResult:
+        try:
+            etag, last_modified = await asyncio.to_thread(self._validators, category)
+            fetched = await self.client.fetch_corpus(category, etag, last_modified)
+            return await asyncio.to_thread(
+                self._apply, category, fetched.questions, fetched.etag, fetched.last_modified
+            )
+        except (httpx.HTTPError, ValueError, KeyError, sqlite3.Error) as e:
+            self.logger.warning(f"Could not sync questions for {category}: {str(e)}")
+            return SyncResult(category, "failed", error=str(e))
+
+    async def sync(self, categories: Iterable[str]) -> List[SyncResult]:
+        """
+        Sync the categories with at most `concurrency` fetches in flight
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(category: str) -> SyncResult:
+            async with semaphore:
+                return await self.sync_category(category)
+
+        return list(await asyncio.gather(*(bounded(category) for category in categories)))
+
+    def start(self, categories: List[str], interval: float, on_sync=None):
+        """
+        Sync now and then every `interval` seconds (once when interval is
+        0) in the background; on_sync receives each round's results
+        """
+        self._task = asyncio.ensure_future(self._run(categories, interval, on_sync))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self, categories: List[str], interval: float, on_sync):
+        while True:
+            results = await self.sync(categories)
+            if on_sync is not None:
+                on_sync(results)
+            if interval <= 0:
+                return
+            await asyncio.sleep(interval)
+
+def main():
+    from ..config import settings
+    from ..models import Category
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db", default=settings.LITERARY_VAULT_SNAPSHOT_PATH or "literary_vault.db")
+    parser.add_argument("--categories", nargs="+", default=[category.value for category in Category])
+    parser.add_argument("--concurrency", type=int, default=settings.LITERARY_VAULT_SYNC_CONCURRENCY)
+    args = parser.parse_args()
+
+    async def run() -> List[SyncResult]:
+        client = LiteraryVaultClient(base_url=settings.LITERARY_VAULT_BASE_URL)
+        try:
+            return await QuestionSnapshot(args.db, client, args.concurrency).sync(args.categories)
+        finally:
+            await client.close()
+
+    results = asyncio.run(run())
+    for result in results:
+        detail = result.error or f"+{result.inserted} ~{result.updated} -{result.deleted}"
+        print(f"{result.category:<16} {result.status:<9} {detail}")
+    raise SystemExit(1 if any(result.status == "failed" for result in results) else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Keys per SQL statement, below SQLite's bound parameter limit
+SQL_BATCH = 500
+# Recency updates of persisted entries held back before they are written
+TOUCH_BATCH = 256
+
+class ResultCache:
+    """
+    LRU cache of JSON-serializable results with a TTL and optional SQLite
+    persistence. Entries written under a different version are ignored and
+    purged when the cache is opened.
+
+    Memory hits never touch SQLite. The async methods do their SQLite work
+    in a worker thread, so the event loop does not wait on the file; the
+    sync methods do it on the calling thread.
+    """
+
+    def __init__(
+        self,
+        version: str,
+        max_entries: int = 10000,
+        ttl_seconds: float = 86400,
+        path: Optional[str] = None
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.version = version
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self._entries: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        # Guards the in-memory entries and counters; the connection has its
+        # own lock so memory hits never wait behind disk work
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._db = None
+        # Rows in the file, tracked so writes need not count the table
+        self._rows = 0
+        # key -> accessed_at of disk hits not yet written back
+        self._touched: Dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        if path:
+            self._open_db(path)
+
+    def _open_db(self, path: str):
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS result_cache (
+                key TEXT PRIMARY KEY,
+                version TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        ''')
+        self._db.execute(
+            'CREATE INDEX IF NOT EXISTS result_cache_accessed ON result_cache (accessed_at)'
+        )
+        stale = self._db.execute(
+            'DELETE FROM result_cache WHERE version != ? OR expires_at <= ?',
+            (self.version, time.time())
+        ).rowcount
+        self._db.commit()
+        self._rows = self._db.execute('SELECT COUNT(*) FROM result_cache').fetchone()[0]
+        if stale:
+            self.logger.info(f"Purged {stale} stale entries from {path}")
+
+    def make_key(self, *parts: Optional[str]) -> str:
+        """
+        Hash the given parts together with the cache version
+        """
+        return self.key_for(self.version, *parts)
+
+    @staticmethod
+    def key_for(version: str, *parts: Optional[str]) -> str:
+        """
+        make_key() for a cache of the given version, usable where the
+        cache itself is not at hand (e.g. in a worker process)
+        """
+        digest = hashlib.sha256()
+        for part in (version,) + parts:
+            data = (part or "").encode("utf-8")
+            # Length prefix keeps ("ab", "c") and ("a", "bc") distinct
+            digest.update(len(data).to_bytes(8, "little"))
+            digest.update(data)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        return self.get_many([key])[0]
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[Dict]]:
+        results, missing = self._get_cached(keys)
+        if missing:
+            self._fill(results, keys, missing)
+        return results
+
+    async def aget(self, key: str) -> Optional[Dict]:
+        return (await self.aget_many([key]))[0]
+
+    async def aget_many(self, keys: Sequence[str]) -> List[Optional[Dict]]:
+        """
+        get_many() that reads entries missing from memory in a worker thread
+        """
+        results, missing = self._get_cached(keys)
+        if missing:
+            if self._db is None:
+                self._fill(results, keys, missing)
+            else:
+                await asyncio.to_thread(self._fill, results, keys, missing)
+        return results
+
+    def set(self, key: str, value: Dict):
+        self.set_many([(key, value)])
+
+    def set_many(self, items: Iterable[Tuple[str, Dict]]):
+        """
+        Store several entries, persisting them in a single transaction
+        """
+        rows = self._remember_many(items)
+        if rows:
+            self._persist(rows)
+
+    async def aset(self, key: str, value: Dict):
+        await self.aset_many([(key, value)])
+
+    async def aset_many(self, items: Iterable[Tuple[str, Dict]]):
+        """
+        set_many() that persists the entries in a worker thread; they are
+        served from memory immediately
+        """
+        rows = self._remember_many(items)
+        if rows:
+            await asyncio.to_thread(self._persist, rows)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        with self._db_lock:
+            if self._db is not None:
+                self._db.execute('DELETE FROM result_cache')
+                self._db.commit()
+                self._rows = 0
+                self._touched.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "version": self.version,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "persistent": self._db is not None,
+                "persisted_entries": self._rows,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+    def close(self):
+        with self._db_lock:
+            if self._db is not None:
+                self._flush_touches()
+                self._db.commit()
+                self._db.close()
+                self._db = None
+
+    def _remember(self, key: str, value: Dict, expires_at: float):
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _get_cached(self, keys: Sequence[str]) -> Tuple[List[Optional[Dict]], List[int]]:
+        # Memory pass: the values found and the positions still to look up
+        now = time.time()
+        results: List[Optional[Dict]] = [None] * len(keys)
+        missing = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is not None:
+                    expires_at, value = entry
+                    if expires_at > now:
+                        self._entries.move_to_end(key)
+                        self.hits += 1
+                        results[i] = value
+                        continue
+                    del self._entries[key]
+                    self.expirations += 1
+                missing.append(i)
+        return results, missing
+
+    def _fill(self, results: List[Optional[Dict]], keys: Sequence[str], missing: List[int]):
+        loaded = self._load_many([keys[i] for i in missing], time.time())
+        with self._lock:
+            for i in missing:
+                stored = loaded.get(keys[i])
+                if stored is None:
+                    self.misses += 1
+                    continue
+                self.hits += 1
+                expires_at, value = stored
+                self._remember(keys[i], value, expires_at)
+                results[i] = value
+
+    def _remember_many(self, items: Iterable[Tuple[str, Dict]]) -> List[Tuple]:
+        # Returns the rows to persist, if there is a file
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        rows = []
+        with self._lock:
+            for key, value in items:
+                self._remember(key, value, expires_at)
+                if self._db is not None:
+                    rows.append((key, value, expires_at, now))
+        return rows
+
+    def _load_many(self, keys: List[str], now: float) -> Dict[str, Tuple[float, Dict]]:
+        loaded: Dict[str, Tuple[float, Dict]] = {}
+        with self._db_lock:
+            if self._db is None:
+                return loaded
+            expired = []
+            for batch in _batches(keys):
+                for key, value, expires_at in self._db.execute(
+                    'SELECT key, value, expires_at FROM result_cache '
+                    f'WHERE version = ? AND key IN ({", ".join("?" * len(batch))})',
+                    [self.version] + batch
+                ):
+                    if expires_at <= now:
+                        expired.append(key)
+                    else:
+                        loaded[key] = (expires_at, json.loads(value))
+                        self._touched[key] = now
+            if expired:
+                self._delete(expired)
+                with self._lock:
+                    self.expirations += len(expired)
+            if expired or len(self._touched) >= TOUCH_BATCH:
+                self._flush_touches()
+                self._db.commit()
+        return loaded
+
+    def _persist(self, rows: List[Tuple]):
+        with self._db_lock:
+            if self._db is None:
+                return
+            keys = list({row[0] for row in rows})
+            existing = 0
+            for batch in _batches(keys):
+                existing += self._db.execute(
+                    f'SELECT COUNT(*) FROM result_cache WHERE key IN ({", ".join("?" * len(batch))})',
+                    batch
+                ).fetchone()[0]
+            self._db.executemany(
+                'INSERT OR REPLACE INTO result_cache VALUES (?, ?, ?, ?, ?)',
+                [(key, self.version, json.dumps(value), expires_at, now) for key, value, expires_at, now in rows]
+            )
+            self._rows += len(keys) - existing
+            for key in keys:
+                self._touched.pop(key, None)
+            self._flush_touches()
+            self._prune_db()
+            self._db.commit()
+
+    def _delete(self, keys: List[str]):
+        for batch in _batches(keys):
+            self._rows -= self._db.execute(
+                f'DELETE FROM result_cache WHERE key IN ({", ".join("?" * len(batch))})', batch
+            ).rowcount
+
+    def _flush_touches(self):
+        if self._touched:
+            self._db.executemany(
+                'UPDATE result_cache SET accessed_at = ? WHERE key = ?',
+                [(accessed_at, key) for key, accessed_at in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def _prune_db(self):
+        # Keep the file bounded by the same LRU limit as memory
+        overflow = self._rows - self.max_entries
+        if overflow > 0:
+            self._rows -= self._db.execute('''
+                DELETE FROM result_cache WHERE key IN (
+                    SELECT key FROM result_cache ORDER BY accessed_at LIMIT ?
+                )
+            ''', (overflow,)).rowcount
+
+def _batches(keys: List[str]) -> Iterable[List[str]]:
+    for start in range(0, len(keys), SQL_BATCH):
+        yield keys[start:start + SQL_BATCH]
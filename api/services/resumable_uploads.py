@@ -0,0 +1,359 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+from typing import Dict, List, Optional, Tuple
+
+# A finalize or chunk write that has not finished within this time is
+# assumed to have died with its server process
+FINALIZE_LEASE_SECONDS = 3600
+
+class UploadNotFound(LookupError):
+    """
+    Raised when an upload id is unknown or has expired
+    """
+
+class ChunkRejected(ValueError):
+    """
+    Raised when a chunk has the wrong index, length or checksum
+    """
+
+class UploadIncomplete(Exception):
+    """
+    Raised when an upload cannot be finalized yet
+    """
+
+class ResumableUploadStore:
+    """
+    State for chunked uploads that survive dropped connections and server
+    restarts. Each upload is a preallocated file that chunks are written into
+    at their offsets; received chunks are recorded in SQLite only once their
+    bytes are on disk, so a client can ask which chunks are still missing and
+    resend just those. Chunk bodies are streamed to their offset as they
+    arrive; an upload cannot be finalized while a chunk is being written.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        directory: str,
+        chunk_size: int = 8 << 20,
+        max_size: int = 64 << 30,
+        ttl_seconds: float = 7 * 24 * 3600
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS uploads (
+                    id TEXT PRIMARY KEY,
+                    filename TEXT,
+                    size INTEGER NOT NULL,
+                    chunk_size INTEGER NOT NULL,
+                    sha256 TEXT,
+                    status TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS upload_chunks (
+                    upload_id TEXT NOT NULL,
+                    idx INTEGER NOT NULL,
+                    sha256 TEXT NOT NULL,
+                    PRIMARY KEY (upload_id, idx)
+                );
+                CREATE TABLE IF NOT EXISTS chunk_writes (
+                    token TEXT PRIMARY KEY,
+                    upload_id TEXT NOT NULL,
+                    idx INTEGER NOT NULL,
+                    started_at REAL NOT NULL
+                );
+            ''')
+        self.purge_expired()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    def _file_path(self, upload_id: str) -> str:
+        return os.path.join(self.directory, f"{upload_id}.part")
+
+    def create(
+        self,
+        size: int,
+        filename: Optional[str] = None,
+        sha256: Optional[str] = None,
+        chunk_size: Optional[int] = None
+    ) -> Dict:
+        """
+        Register an upload and preallocate its file; returns its status
+        """
+        if size > self.max_size:
+            raise ChunkRejected(f"Upload exceeds the {self.max_size} byte limit")
+        upload_id = uuid.uuid4().hex
+        chunk_size = chunk_size or self.chunk_size
+        file_path = self._file_path(upload_id)
+        with open(file_path, "wb") as part:
+            part.truncate(size)
+            if hasattr(os, "posix_fallocate"):
+                try:
+                    # Reserve the blocks now so a full disk fails here, not mid-upload
+                    os.posix_fallocate(part.fileno(), 0, size)
+                except OSError as e:
+                    part.close()
+                    os.unlink(file_path)
+                    raise ChunkRejected(f"Cannot reserve {size} bytes: {e.strerror}")
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                'INSERT INTO uploads VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (upload_id, filename, size, chunk_size, sha256.lower() if sha256 else None, "pending", now, now)
+            )
+        return self.status(upload_id)
+
+    def status(self, upload_id: str) -> Dict:
+        with closing(self._connect()) as conn:
+            upload = self._load(conn, upload_id)
+            received = {
+                idx for (idx,) in conn.execute(
+                    'SELECT idx FROM upload_chunks WHERE upload_id = ?', (upload_id,)
+                )
+            }
+        filename, size, chunk_size, _, status, created_at, updated_at = upload
+        total_chunks = -(-size // chunk_size)
+        return {
+            "upload_id": upload_id,
+            "filename": filename,
+            "size": size,
+            "chunk_size": chunk_size,
+            "total_chunks": total_chunks,
+            "received_chunks": len(received),
+            "missing_chunks": [idx for idx in range(total_chunks) if idx not in received],
+            "status": status,
+            "created_at": created_at,
+            "updated_at": updated_at,
+        }
+
+    def chunk_length(self, upload_id: str, index: int) -> int:
+        """
+        Expected byte length of chunk `index`; the last chunk may be short
+        """
+        with closing(self._connect()) as conn:
+            _, size, chunk_size, *_ = self._load(conn, upload_id)
+        if not 0 <= index < -(-size // chunk_size):
+            raise ChunkRejected(f"Chunk index {index} is out of range")
+        return min(chunk_size, size - index * chunk_size)
+
+    def start_chunk(self, upload_id: str, index: int) -> "ChunkWriter":
+        """
+        Begin writing chunk `index` at its offset. Any earlier copy of the
+        chunk stops counting as received until the new one is committed,
+        and a write of it still in progress (or left behind by a crashed
+        server) is superseded and will not be recorded.
+        """
+        expected = self.chunk_length(upload_id, index)
+        token = uuid.uuid4().hex
+        with closing(self._connect()) as conn, conn:
+            # Taken under the write lock, so begin_finalize either sees
+            # this write in progress or has already claimed the upload
+            conn.execute('BEGIN IMMEDIATE')
+            _, _, chunk_size, _, status, *_ = self._load(conn, upload_id)
+            if status != "pending":
+                raise UploadIncomplete(f"Upload is {status}")
+            conn.execute('DELETE FROM upload_chunks WHERE upload_id = ? AND idx = ?', (upload_id, index))
+            conn.execute('DELETE FROM chunk_writes WHERE upload_id = ? AND idx = ?', (upload_id, index))
+            conn.execute(
+                'INSERT INTO chunk_writes VALUES (?, ?, ?, ?)', (token, upload_id, index, time.time())
+            )
+        try:
+            part = open(self._file_path(upload_id), "r+b")
+        except OSError:
+            self._end_write(token)
+            raise
+        part.seek(index * chunk_size)
+        return ChunkWriter(self, upload_id, index, expected, token, part)
+
+    def write_chunk(self, upload_id: str, index: int, data: bytes, checksum: str) -> Dict:
+        """
+        Verify a chunk against its SHA-256 and write it at its offset
+        """
+        writer = self.start_chunk(upload_id, index)
+        try:
+            writer.write(data)
+            return writer.commit(checksum)
+        finally:
+            writer.abort()
+
+    def _record_chunk(self, token: str, upload_id: str, index: int, digest: Optional[str]):
+        with closing(self._connect()) as conn, conn:
+            # The status is re-checked in the transaction that records the
+            # chunk; the write marker is cleared either way
+            conn.execute('BEGIN IMMEDIATE')
+            current = conn.execute('DELETE FROM chunk_writes WHERE token = ?', (token,)).rowcount
+            status = conn.execute('SELECT status FROM uploads WHERE id = ?', (upload_id,)).fetchone()
+            if current and digest is not None and status == ("pending",):
+                conn.execute(
+                    'INSERT OR REPLACE INTO upload_chunks VALUES (?, ?, ?)', (upload_id, index, digest)
+                )
+                conn.execute('UPDATE uploads SET updated_at = ? WHERE id = ?', (time.time(), upload_id))
+        if status is None:
+            raise UploadNotFound(upload_id)
+        if status[0] != "pending":
+            raise UploadIncomplete(f"Upload is {status[0]}")
+        if not current:
+            raise ChunkRejected(f"Chunk {index} was resent while this copy was being written")
+
+    def _end_write(self, token: str):
+        with closing(self._connect()) as conn, conn:
+            conn.execute('DELETE FROM chunk_writes WHERE token = ?', (token,))
+
+    def begin_finalize(self, upload_id: str, read_size: int = 1 << 20) -> Tuple[str, str, int, Optional[str]]:
+        """
+        Check that every chunk arrived and hash the assembled file; returns
+        (path, sha256, size, filename). The upload is marked as finalizing
+        so chunks can no longer change underneath the analysis.
+        """
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            # Checked and claimed in one transaction so no chunk can start
+            # or finish in between
+            conn.execute('BEGIN IMMEDIATE')
+            filename, size, chunk_size, *_ = self._load(conn, upload_id)
+            (received,) = conn.execute(
+                'SELECT COUNT(*) FROM upload_chunks WHERE upload_id = ?', (upload_id,)
+            ).fetchone()
+            missing = -(-size // chunk_size) - received
+            if missing:
+                raise UploadIncomplete(f"{missing} chunks are missing")
+            (writing,) = conn.execute(
+                'SELECT COUNT(*) FROM chunk_writes WHERE upload_id = ? AND started_at >= ?',
+                (upload_id, now - FINALIZE_LEASE_SECONDS)
+            ).fetchone()
+            if writing:
+                raise UploadIncomplete(f"{writing} chunks are still being written")
+            claimed = conn.execute(
+                "UPDATE uploads SET status = 'finalizing', updated_at = ? WHERE id = ? "
+                "AND (status = 'pending' OR (status = 'finalizing' AND updated_at < ?))",
+                (now, upload_id, now - FINALIZE_LEASE_SECONDS)
+            ).rowcount
+        if not claimed:
+            raise UploadIncomplete("Upload is already being finalized")
+
+        file_path = self._file_path(upload_id)
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as part:
+            for block in iter(lambda: part.read(read_size), b""):
+                digest.update(block)
+        sha256 = digest.hexdigest()
+        with closing(self._connect()) as conn:
+            expected_sha256 = self._load(conn, upload_id)[3]
+        if expected_sha256 and expected_sha256 != sha256:
+            self.abort_finalize(upload_id)
+            raise UploadIncomplete("Assembled file does not match the declared SHA-256")
+        return file_path, sha256, size, filename
+
+    def abort_finalize(self, upload_id: str):
+        """
+        Return a finalizing upload to pending, e.g. after a failed analysis
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE uploads SET status = 'pending', updated_at = ? WHERE id = ?",
+                (time.time(), upload_id)
+            )
+
+    def delete(self, upload_id: str):
+        with closing(self._connect()) as conn, conn:
+            conn.execute('DELETE FROM upload_chunks WHERE upload_id = ?', (upload_id,))
+            conn.execute('DELETE FROM chunk_writes WHERE upload_id = ?', (upload_id,))
+            conn.execute('DELETE FROM uploads WHERE id = ?', (upload_id,))
+        try:
+            os.unlink(self._file_path(upload_id))
+        except FileNotFoundError:
+            pass
+
+    def purge_expired(self) -> int:
+        """
+        Delete uploads that have not received a chunk within the TTL
+        """
+        cutoff = time.time() - self.ttl_seconds
+        with closing(self._connect()) as conn:
+            expired: List[str] = [
+                upload_id for (upload_id,) in conn.execute(
+                    'SELECT id FROM uploads WHERE updated_at < ?', (cutoff,)
+                )
+            ]
+        for upload_id in expired:
+            self.delete(upload_id)
+        if expired:
+            self.logger.info(f"Purged {len(expired)} expired uploads")
+        return len(expired)
+
+    @staticmethod
+    def _load(conn: sqlite3.Connection, upload_id: str) -> Tuple:
+        row = conn.execute(
+            'SELECT filename, size, chunk_size, sha256, status, created_at, updated_at FROM uploads WHERE id = ?',
+            (upload_id,)
+        ).fetchone()
+        if row is None:
+            raise UploadNotFound(upload_id)
+        return row
+
+class ChunkWriter:
+    """
+    One chunk being streamed to its offset in the upload file. The bytes
+    are hashed as they are written and the chunk is recorded by commit()
+    only if it has the expected length and checksum.
+    """
+
+    def __init__(self, store: ResumableUploadStore, upload_id: str, index: int, expected: int, token: str, part):
+        self.store = store
+        self.upload_id = upload_id
+        self.index = index
+        self.expected = expected
+        self.size = 0
+        self._token = token
+        self._part = part
+        self._digest = hashlib.sha256()
+
+    def write(self, data: bytes):
+        if self.size + len(data) > self.expected:
+            raise ChunkRejected(f"Chunk {self.index} must be {self.expected} bytes")
+        self._digest.update(data)
+        self._part.write(data)
+        self.size += len(data)
+
+    def commit(self, checksum: str) -> Dict:
+        if self.size != self.expected:
+            raise ChunkRejected(f"Chunk {self.index} must be {self.expected} bytes, got {self.size}")
+        part, self._part = self._part, None
+        with part:
+            part.flush()
+            # The chunk is only recorded once its bytes are durable
+            os.fsync(part.fileno())
+        digest = self._digest.hexdigest()
+        matches = digest == checksum.lower()
+        token, self._token = self._token, None
+        self.store._record_chunk(token, self.upload_id, self.index, digest if matches else None)
+        if not matches:
+            raise ChunkRejected(f"Checksum mismatch for chunk {self.index}")
+        return {"upload_id": self.upload_id, "index": self.index, "size": self.size, "sha256": digest}
+
+    def abort(self):
+        """
+        Give up on the chunk, leaving it missing; a no-op after commit()
+        """
+        if self._part is not None:
+            self._part.close()
+            self._part = None
+        if self._token is not None:
+            token, self._token = self._token, None
+            self.store._end_write(token)
@@ -0,0 +1,183 @@
+from .weight_stats import LayerStats
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import closing
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+# Per-layer statistics summarized by their quantiles across layers
+FINGERPRINT_STATS = (
+    "mean", "std", "rms", "skewness", "excess_kurtosis", "sparsity", "outlier_fraction", "abs_max",
+    "spectral_ratio",
+)
+FINGERPRINT_QUANTILES = (0.0, 0.25, 0.5, 0.75, 1.0)
+# Layer shapes are feature-hashed into this many buckets to capture architecture
+SHAPE_BUCKETS = 16
+FINGERPRINT_DIM = len(FINGERPRINT_STATS) * len(FINGERPRINT_QUANTILES) + 2 + SHAPE_BUCKETS
+
+# SimHash: random hyperplanes split into bands; models sharing any band's
+# bucket are candidates for an exact cosine comparison
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 8
+SIMHASH_SEED = 20240521
+
+def _squash(values: np.ndarray) -> np.ndarray:
+    # Keeps kurtosis in the hundreds from drowning out sparsity in [0, 1]
+    return np.sign(values) * np.log1p(np.abs(values))
+
+def fingerprint(stats: Sequence[LayerStats]) -> Optional[np.ndarray]:
+    """
+    Summarize a model's per-layer statistics as a fixed-length, unit-norm
+    float32 vector; None for models without float layers
+    """
+    if not stats:
+        return None
+    table = np.array(
+        [[getattr(layer, name) or 0.0 for name in FINGERPRINT_STATS] for layer in stats],
+        dtype=np.float64
+    )
+    table[~np.isfinite(table)] = 0.0
+    quantiles = np.quantile(table, FINGERPRINT_QUANTILES, axis=0).T.ravel()
+    total = sum(layer.count for layer in stats)
+    shapes = np.zeros(SHAPE_BUCKETS)
+    for layer in stats:
+        shapes[zlib.crc32(repr(tuple(layer.shape)).encode("ascii")) % SHAPE_BUCKETS] += 1
+    vector = np.concatenate([
+        _squash(quantiles),
+        # Sizes on a log scale, roughly in [0, 3]
+        [np.log1p(total) / 10, np.log1p(len(stats)) / 3],
+        np.log1p(shapes) / 3,
+    ])
+    norm = np.linalg.norm(vector)
+    return (vector / norm if norm > 0 else vector).astype(np.float32)
+
+def _planes() -> np.ndarray:
+    return np.random.default_rng(SIMHASH_SEED).standard_normal((SIMHASH_BITS, FINGERPRINT_DIM))
+
+def simhash_bands(vector: np.ndarray, planes: np.ndarray) -> List[int]:
+    bits = (planes @ vector.astype(np.float64)) > 0
+    width = SIMHASH_BITS // SIMHASH_BANDS
+    weights = 1 << np.arange(width)
+    return [int(bits[band * width:(band + 1) * width] @ weights) for band in range(SIMHASH_BANDS)]
+
+class SimilarityIndex:
+    """
+    SQLite-backed index of model fingerprints with nearest-neighbour search
+    by cosine similarity. Small indexes are scanned exactly from an
+    in-memory matrix; beyond brute_force_limit models, SimHash bands narrow
+    the scan to candidates that share a bucket with the query.
+    """
+
+    def __init__(self, path: str, brute_force_limit: int = 50000):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.brute_force_limit = brute_force_limit
+        self._planes = _planes()
+        self._lock = threading.Lock()
+        self._matrix: Optional[np.ndarray] = None
+        self._keys: List[str] = []
+        self._types: List[Optional[str]] = []
+        self._loaded_count = -1
+        with closing(self._connect()) as conn, conn:
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS model_fingerprints (
+                    sha256 TEXT PRIMARY KEY,
+                    model_type TEXT,
+                    vector BLOB NOT NULL,
+                    created_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS fingerprint_bands (
+                    band INTEGER NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    sha256 TEXT NOT NULL,
+                    PRIMARY KEY (band, bucket, sha256)
+                );
+            ''')
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    def add(self, sha256: str, vector: np.ndarray, model_type: Optional[str] = None):
+        sha256 = sha256.lower()
+        bands = simhash_bands(vector, self._planes)
+        with closing(self._connect()) as conn, conn:
+            conn.execute('DELETE FROM fingerprint_bands WHERE sha256 = ?', (sha256,))
+            conn.execute(
+                'INSERT OR REPLACE INTO model_fingerprints VALUES (?, ?, ?, ?)',
+                (sha256, model_type, vector.astype(np.float32).tobytes(), time.time())
+            )
+            conn.executemany(
+                'INSERT INTO fingerprint_bands VALUES (?, ?, ?)',
+                ((band, bucket, sha256) for band, bucket in enumerate(bands))
+            )
+
+    def get(self, sha256: str) -> Optional[np.ndarray]:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                'SELECT vector FROM model_fingerprints WHERE sha256 = ?', (sha256.lower(),)
+            ).fetchone()
+        return np.frombuffer(row[0], dtype=np.float32) if row is not None else None
+
+    def count(self) -> int:
+        with closing(self._connect()) as conn:
+            return conn.execute('SELECT COUNT(*) FROM model_fingerprints').fetchone()[0]
+
+    def query(self, vector: np.ndarray, k: int = 10, exclude: Optional[str] = None) -> List[Dict]:
+        """
+        Return up to k stored models most similar to vector, best first
+        """
+        count = self.count()
+        if count <= self.brute_force_limit:
+            keys, types, matrix = self._all_vectors(count)
+        else:
+            keys, types, matrix = self._candidates(vector)
+        if not keys:
+            return []
+        scores = matrix @ vector.astype(np.float32)
+        exclude = exclude.lower() if exclude else None
+        top = min(len(keys), k + 1)
+        order = np.argpartition(-scores, top - 1)[:top]
+        order = order[np.argsort(-scores[order], kind="stable")]
+        results = [
+            {"sha256": keys[i], "model_type": types[i], "similarity": float(scores[i])}
+            for i in order if keys[i] != exclude
+        ]
+        return results[:k]
+
+    def _all_vectors(self, count: int) -> Tuple[List[str], List[Optional[str]], np.ndarray]:
+        # Reloaded only when another writer (or process) changed the table
+        with self._lock:
+            if self._matrix is None or count != self._loaded_count:
+                with closing(self._connect()) as conn:
+                    rows = conn.execute(
+                        'SELECT sha256, model_type, vector FROM model_fingerprints ORDER BY sha256'
+                    ).fetchall()
+                self._keys = [row[0] for row in rows]
+                self._types = [row[1] for row in rows]
+                self._matrix = self._stack(row[2] for row in rows)
+                self._loaded_count = count
+            return self._keys, self._types, self._matrix
+
+    def _candidates(self, vector: np.ndarray) -> Tuple[List[str], List[Optional[str]], np.ndarray]:
+        bands = simhash_bands(vector, self._planes)
+        clause = " OR ".join("(b.band = ? AND b.bucket = ?)" for _ in bands)
+        params = [value for band, bucket in enumerate(bands) for value in (band, bucket)]
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                'SELECT DISTINCT f.sha256, f.model_type, f.vector FROM fingerprint_bands b '
+                f'JOIN model_fingerprints f ON f.sha256 = b.sha256 WHERE {clause}',
+                params
+            ).fetchall()
+        return [row[0] for row in rows], [row[1] for row in rows], self._stack(row[2] for row in rows)
+
+    @staticmethod
+    def _stack(blobs) -> np.ndarray:
+        vectors = [np.frombuffer(blob, dtype=np.float32) for blob in blobs]
+        if not vectors:
+            return np.empty((0, FINGERPRINT_DIM), dtype=np.float32)
+        return np.vstack(vectors)
@@ -0,0 +1,107 @@
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import tempfile
+from typing import BinaryIO, Optional
+
+from fastapi import UploadFile
+
+class ModelUpload:
+    """
+    An uploaded model spooled in memory up to max_memory bytes and to a named
+    temporary file beyond that, hashed incrementally as it is written
+    """
+
+    def __init__(self, filename: Optional[str] = None, max_memory: int = 8 << 20, directory: Optional[str] = None):
+        self.logger = logging.getLogger(__name__)
+        self.filename = filename
+        self.max_memory = max_memory
+        self.directory = directory or None
+        self.size = 0
+        self.path: Optional[str] = None
+        self._hash = hashlib.sha256()
+        self._file: BinaryIO = io.BytesIO()
+
+    @property
+    def sha256(self) -> str:
+        return self._hash.hexdigest()
+
+    @property
+    def in_memory(self) -> bool:
+        return self.path is None
+
+    def write(self, chunk: bytes):
+        self._hash.update(chunk)
+        self.size += len(chunk)
+        if self.in_memory and self.size > self.max_memory:
+            self._rollover()
+        self._file.write(chunk)
+
+    def _rollover(self):
+        spooled = tempfile.NamedTemporaryFile(
+            prefix="model-upload-", dir=self.directory, delete=False
+        )
+        spooled.write(self._file.getbuffer())
+        self._file = spooled
+        self.path = spooled.name
+
+    def finish(self):
+        self._file.flush()
+        self._file.seek(0)
+
+    def getvalue(self) -> bytes:
+        """
+        Return the contents of an in-memory upload
+        """
+        if not self.in_memory:
+            raise ValueError("Upload was spooled to disk; use path instead")
+        return self._file.getvalue()
+
+    def head(self, size: int) -> bytes:
+        position = self._file.tell()
+        self._file.seek(0)
+        data = self._file.read(size)
+        self._file.seek(position)
+        return data
+
+    def close(self):
+        self._file.close()
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+    def __enter__(self) -> "ModelUpload":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+async def receive_upload(
+    upload: UploadFile,
+    chunk_size: int = 1 << 20,
+    max_memory: int = 8 << 20,
+    directory: Optional[str] = None
+) -> ModelUpload:
+    """
+    Copy an UploadFile into a ModelUpload chunk by chunk, so the whole model
+    is never held in memory at once. Starlette's multipart parser has
+    already spooled the body to its own temporary file by now, so large
+    models are written to disk twice; the hashing and writing run in a
+    worker thread so the event loop is not stalled meanwhile.
+    """
+    spooled = ModelUpload(upload.filename, max_memory=max_memory, directory=directory)
+    try:
+        while True:
+            chunk = await upload.read(chunk_size)
+            if not chunk:
+                break
+            await asyncio.to_thread(spooled.write, chunk)
+        await asyncio.to_thread(spooled.finish)
+    except Exception:
+        spooled.close()
+        raise
+    return spooled
@@ -0,0 +1,249 @@
+from .model_readers import BFLOAT16, ModelReader, TensorInfo, to_float
+import math
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+
+# Elements per working chunk; small enough to stay cache-resident
+STATS_CHUNK_ELEMENTS = 1 << 16
+SPECTRAL_ITERATIONS = 8
+OUTLIER_SIGMA = 6.0
+DEAD_UNIT_TOLERANCE = 1e-8
+
+# Layers smaller than this (biases, scalars) are not judged on distribution
+MIN_LAYER_ELEMENTS = 64
+
+# Anomaly thresholds
+MAX_SPARSITY = 0.9
+MAX_OUTLIER_FRACTION = 1e-3
+MAX_EXCESS_KURTOSIS = 50.0
+MAX_SPECTRAL_RATIO = 5.0
+MAX_DEAD_UNIT_RATIO = 0.5
+
+@dataclass
+class LayerStats:
+    name: str
+    dtype: str
+    shape: List[int]
+    count: int
+    non_finite: int
+    mean: float
+    std: float
+    rms: float
+    skewness: float
+    excess_kurtosis: float
+    sparsity: float
+    outlier_fraction: float
+    abs_max: float
+    # Only computed for tensors with at least two dimensions, viewed as a
+    # (shape[0], -1) matrix; a dead unit is an all-zero row of that matrix
+    spectral_norm: Optional[float] = None
+    spectral_ratio: Optional[float] = None
+    dead_unit_ratio: Optional[float] = None
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, value: Dict) -> "LayerStats":
+        return cls(**value)
+
+def is_float_tensor(info: TensorInfo) -> bool:
+    return info.dtype == BFLOAT16 or info.storage_dtype.kind == "f"
+
+def _float_chunks(flat: np.ndarray, info: TensorInfo, chunk_elements: int) -> Iterator[np.ndarray]:
+    # Half-precision types are widened to float32 a chunk at a time; float32
+    # chunks are views of the model buffer and float64 is read as is
+    for start in range(0, flat.size, chunk_elements):
+        yield _working_copy(flat[start:start + chunk_elements], info)
+
+def _working_copy(chunk: np.ndarray, info: TensorInfo) -> np.ndarray:
+    work = np.float64 if info.storage_dtype.itemsize > 4 else np.float32
+    chunk = to_float(chunk, info.dtype)
+    # Views at unaligned offsets fall off NumPy's vectorized and BLAS paths
+    return chunk.astype(work, copy=not chunk.flags.aligned)
+
+def _chunk_moments(chunk: np.ndarray, total: float) -> Tuple[int, float, float, float, float]:
+    # Per-chunk sums use NumPy's pairwise summation; chunks are merged in float64
+    count = chunk.size
+    mean = total / count
+    deviation = chunk - chunk.dtype.type(mean)
+    squared = deviation * deviation
+    return (
+        count,
+        mean,
+        float(squared.sum()),
+        float(np.dot(squared, deviation)),
+        float(np.dot(squared, squared)),
+    )
+
+def _merge_moments(a: Tuple, b: Tuple) -> Tuple[int, float, float, float, float]:
+    """
+    Combine count, mean and central power sums of two partitions (Pebay's
+    pairwise update), which stays stable when the mean is far from zero
+    """
+    na, mean_a, m2a, m3a, m4a = a
+    nb, mean_b, m2b, m3b, m4b = b
+    if not na:
+        return b
+    n = na + nb
+    delta = mean_b - mean_a
+    delta_n = delta / n
+    m2 = m2a + m2b + delta * delta_n * na * nb
+    m3 = (
+        m3a + m3b
+        + delta * delta_n * delta_n * na * nb * (na - nb)
+        + 3 * delta_n * (na * m2b - nb * m2a)
+    )
+    m4 = (
+        m4a + m4b
+        + delta * delta_n ** 3 * na * nb * (na * na - na * nb + nb * nb)
+        + 6 * delta_n * delta_n * (na * na * m2b + nb * nb * m2a)
+        + 4 * delta_n * (na * m3b - nb * m3a)
+    )
+    return n, mean_a + delta_n * nb, m2, m3, m4
+
+def layer_stats(
+    reader: ModelReader,
+    info: TensorInfo,
+    chunk_elements: int = STATS_CHUNK_ELEMENTS,
+    spectral_iterations: int = SPECTRAL_ITERATIONS
+) -> Optional[LayerStats]:
+    """
+    Compute distribution statistics for one floating-point layer.
+
+    Weights are read as a view of the model buffer where the format allows
+    (compressed tensors are decoded once, in their storage dtype) and reduced
+    chunk by chunk, so no float64 copy of the whole tensor is ever made.
+    """
+    if not is_float_tensor(info):
+        return None
+    array = reader.read(info)
+    # order="A" keeps Fortran-ordered tensors as views
+    flat = array.reshape(-1, order="A")
+
+    # Pass 1: moments, zeros and extremes
+    moments = (0, 0.0, 0.0, 0.0, 0.0)
+    non_finite = zeros = 0
+    abs_max = 0.0
+    for chunk in _float_chunks(flat, info, chunk_elements):
+        total = float(chunk.sum(dtype=np.float64))
+        if not math.isfinite(total):
+            finite = np.isfinite(chunk)
+            non_finite += chunk.size - int(np.count_nonzero(finite))
+            chunk = chunk[finite].astype(np.float64)
+            total = float(chunk.sum(dtype=np.float64))
+        if not chunk.size:
+            continue
+        moments = _merge_moments(moments, _chunk_moments(chunk, total))
+        zeros += chunk.size - int(np.count_nonzero(chunk))
+        abs_max = max(abs_max, float(chunk.max()), -float(chunk.min()))
+    count, mean, m2, m3, m4 = moments
+    variance = m2 / count if count else 0.0
+    std = math.sqrt(variance)
+
+    # Pass 2: weights more than OUTLIER_SIGMA deviations from the mean
+    outliers = 0
+    if std > 0:
+        upper = mean + OUTLIER_SIGMA * std
+        lower = mean - OUTLIER_SIGMA * std
+        for chunk in _float_chunks(flat, info, chunk_elements):
+            # NaN compares false both ways, so non-finite values need no mask
+            outliers += int(np.count_nonzero(chunk > upper)) + int(np.count_nonzero(chunk < lower))
+
+    stats = LayerStats(
+        name=info.name,
+        dtype=info.dtype,
+        shape=list(info.shape),
+        count=count,
+        non_finite=non_finite,
+        mean=mean,
+        std=std,
+        rms=math.sqrt(variance + mean * mean),
+        skewness=(m3 / count) / variance ** 1.5 if variance > 0 else 0.0,
+        excess_kurtosis=(m4 / count) / variance ** 2 - 3.0 if variance > 0 else 0.0,
+        sparsity=zeros / count if count else 0.0,
+        outlier_fraction=outliers / count if count else 0.0,
+        abs_max=abs_max,
+    )
+
+    if spectral_iterations > 0 and array.ndim >= 2 and array.shape[0] and not non_finite:
+        matrix = array.reshape(array.shape[0], -1, order="A")
+        stats.spectral_norm, stats.dead_unit_ratio = _spectral_norm_and_dead_units(
+            matrix, info, spectral_iterations, chunk_elements
+        )
+        # A random matrix of the same shape and RMS has a spectral norm of
+        # about rms * (sqrt(rows) + sqrt(cols))
+        expected = stats.rms * (math.sqrt(matrix.shape[0]) + math.sqrt(matrix.shape[1]))
+        stats.spectral_ratio = stats.spectral_norm / expected if expected > 0 else 0.0
+    return stats
+
+def _spectral_norm_and_dead_units(
+    matrix: np.ndarray,
+    info: TensorInfo,
+    iterations: int,
+    chunk_elements: int
+) -> Tuple[float, float]:
+    """
+    Estimate the largest singular value by power iteration on W^T W, reading
+    W in row slabs; all-zero rows are counted on the first sweep
+    """
+    rows, cols = matrix.shape
+    slab_rows = max(1, chunk_elements // max(1, cols))
+    vector = np.random.default_rng(0).standard_normal(cols)
+    vector /= np.linalg.norm(vector)
+    dead = 0
+    sigma = 0.0
+    for iteration in range(iterations):
+        product = np.zeros(cols)
+        for start in range(0, rows, slab_rows):
+            slab = _working_copy(matrix[start:start + slab_rows], info)
+            if iteration == 0:
+                dead += int(np.count_nonzero(
+                    (slab.max(axis=1) <= DEAD_UNIT_TOLERANCE) & (slab.min(axis=1) >= -DEAD_UNIT_TOLERANCE)
+                ))
+            product += slab.T @ (slab @ vector.astype(slab.dtype))
+        norm = float(np.linalg.norm(product))
+        if norm == 0:
+            sigma = 0.0
+            break
+        # ||W^T W v|| approaches sigma_max ** 2 as v converges
+        sigma = math.sqrt(norm)
+        vector = product / norm
+    return sigma, dead / rows
+
+def layer_anomalies(stats: LayerStats) -> List[str]:
+    """
+    Describe the ways a layer's statistics depart from a trained weight
+    distribution, in reporting order
+    """
+    name = stats.name
+    anomalies = []
+    if stats.non_finite:
+        anomalies.append(f"Layer {name} contains {stats.non_finite} non-finite weights")
+    if stats.count < MIN_LAYER_ELEMENTS:
+        return anomalies
+    # Biases and normalization weights are often all zeros or all ones in
+    # healthy checkpoints, so only matrices are judged on those rules
+    vector = len(stats.shape) <= 1
+    if stats.std == 0:
+        if not vector:
+            anomalies.append(f"Layer {name} is constant ({stats.mean:.4g})")
+        return anomalies
+    if stats.sparsity > MAX_SPARSITY and not vector:
+        anomalies.append(f"Layer {name} is {stats.sparsity:.0%} zeros")
+    if stats.outlier_fraction > MAX_OUTLIER_FRACTION:
+        anomalies.append(
+            f"Layer {name} has {stats.outlier_fraction:.2%} of weights beyond "
+            f"{OUTLIER_SIGMA:g} standard deviations"
+        )
+    if stats.excess_kurtosis > MAX_EXCESS_KURTOSIS:
+        anomalies.append(f"Layer {name} is heavy-tailed (excess kurtosis {stats.excess_kurtosis:.1f})")
+    if stats.spectral_ratio is not None and stats.spectral_ratio > MAX_SPECTRAL_RATIO:
+        anomalies.append(
+            f"Layer {name} is dominated by one direction (spectral norm "
+            f"{stats.spectral_ratio:.1f}x that of a random matrix)"
+        )
+    if stats.dead_unit_ratio is not None and stats.dead_unit_ratio > MAX_DEAD_UNIT_RATIO:
+        anomalies.append(f"Layer {name} has {stats.dead_unit_ratio:.0%} dead units")
+    return anomalies
@@ -1,4 +1,4 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory, stream_with_context
 from flask_talisman import Talisman
 from werkzeug.middleware.proxy_fix import ProxyFix
 import logging
@@ -8,6 +8,7 @@ from dotenv import load_dotenv
 import jwt
 from datetime import datetime, timedelta
 import sqlite3
+import json
 from functools import wraps
 
 # Load environment variables
@@ -180,29 +181,46 @@ def randomize_questions():
         app.logger.error(f'Error randomizing questions: {str(e)}')
         return jsonify({'error': 'Error randomizing questions'}), 500
 
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+def wants_ndjson():
+    stream = request.args.get('stream', default='false').lower() in ('1', 'true', 'yes')
+    return stream or NDJSON_MIMETYPE in request.headers.get('Accept', '')
+
+def analyze_question_payload(question):
+    return {
+        'probability': 0.342,
+        'confidence': 0.89,
+        'issues': [
+            'Potential ambiguity in question',
+            'Answer might need clarification'
+        ],
+        'recommendations': [
+            'Review question wording',
+            'Add additional context to answer'
+        ]
+    }
+
 @app.route('/api/v1/detection/analyze-questions', methods=['POST'])
 @token_required
 def analyze_questions():
     questions = request.get_json()
     if not questions:
         return jsonify({'error': 'No questions provided'}), 400
-    
+
+    if wants_ndjson():
+        def generate():
+            try:
+                for question in questions:
+                    yield json.dumps(analyze_question_payload(question)) + '\n'
+            except Exception as e:
+                # Headers are already sent, so report the failure in-band
+                app.logger.error(f'Error streaming question analysis: {str(e)}')
+                yield json.dumps({'error': 'Error analyzing questions'}) + '\n'
+        return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+
     try:
-        results = []
-        for question in questions:
-            analysis = {
-                'probability': 0.342,
-                'confidence': 0.89,
-                'issues': [
-                    'Potential ambiguity in question',
-                    'Answer might need clarification'
-                ],
-                'recommendations': [
-                    'Review question wording',
-                    'Add additional context to answer'
-                ]
-            }
-            results.append(analysis)
+        results = [analyze_question_payload(question) for question in questions]
         return jsonify(results)
     except Exception as e:
         app.logger.error(f'Error analyzing questions: {str(e)}')
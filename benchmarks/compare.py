@@ -0,0 +1,54 @@
+"""
+Compare two benchmark result files and flag regressions
+
+    python -m benchmarks.compare baseline.json current.json --threshold 0.10
+"""
+import argparse
+import json
+import sys
+from typing import Dict, Tuple
+
+def _key(result: Dict) -> Tuple:
+    return (result["name"],) + tuple(sorted(result["params"].items()))
+
+def compare(baseline: Dict, current: Dict, threshold: float) -> int:
+    """
+    Print per-scenario deltas; returns the number of regressions
+    """
+    before = {_key(r): r for r in baseline["results"]}
+    regressions = 0
+    print(f"baseline {baseline.get('commit')} -> current {current.get('commit')}")
+    print(f"{'scenario':<52} {'items/s':>9} {'p95':>8} {'p99':>8} {'RSS':>8}")
+    for result in current["results"]:
+        old = before.get(_key(result))
+        if old is None:
+            continue
+        deltas = {
+            # Positive deltas are always worse
+            "items/s": 1 - result["items_per_second"] / old["items_per_second"],
+            "p95": result["latency_ms"]["p95"] / old["latency_ms"]["p95"] - 1,
+            "p99": result["latency_ms"]["p99"] / old["latency_ms"]["p99"] - 1,
+            "RSS": result["peak_rss_mb"] / old["peak_rss_mb"] - 1,
+        }
+        flagged = [name for name, delta in deltas.items() if delta > threshold]
+        regressions += bool(flagged)
+        label = result["name"] + "".join(f" {k}={v}" for k, v in result["params"].items())
+        cells = " ".join(f"{-delta if name == 'items/s' else delta:>+8.1%}" for name, delta in deltas.items())
+        print(f"{label:<52} {cells}{'  REGRESSION: ' + ', '.join(flagged) if flagged else ''}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative change treated as a regression")
+    args = parser.parse_args()
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    sys.exit(1 if compare(baseline, current, args.threshold) else 0)
+
+if __name__ == "__main__":
+    main()
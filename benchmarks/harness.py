@@ -0,0 +1,132 @@
+"""
+Timing, latency percentile and peak-RSS helpers shared by the benchmarks
+"""
+import gc
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+def _read_hwm_kb() -> Optional[int]:
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+def reset_peak_rss() -> bool:
+    """
+    Reset the kernel's peak-RSS counter so each scenario reports its own peak
+    (Linux only); returns False when the counter cannot be reset
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+        return True
+    except OSError:
+        return False
+
+def peak_rss_mb() -> float:
+    hwm = _read_hwm_kb()
+    if hwm is None:
+        # ru_maxrss is KB on Linux and bytes on macOS
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss / (1024 * 1024) if sys.platform == "darwin" else maxrss / 1024
+    return hwm / 1024
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = q * (len(sorted_values) - 1)
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+def measure(
+    name: str,
+    call: Callable[[int], object],
+    iterations: int,
+    warmup: int = 3,
+    items_per_call: int = 1,
+    bytes_per_call: int = 0,
+    params: Optional[Dict] = None
+) -> Dict:
+    """
+    Time call(i) for each iteration and summarize throughput and latency
+    """
+    for i in range(warmup):
+        call(-1 - i)
+    gc.collect()
+    peak_resettable = reset_peak_rss()
+
+    latencies = []
+    start = time.perf_counter()
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        call(i)
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    result = {
+        "name": name,
+        "params": params or {},
+        "iterations": iterations,
+        "seconds": elapsed,
+        "calls_per_second": iterations / elapsed,
+        "items_per_second": iterations * items_per_call / elapsed,
+        "latency_ms": {
+            "p50": percentile(latencies, 0.50) * 1000,
+            "p95": percentile(latencies, 0.95) * 1000,
+            "p99": percentile(latencies, 0.99) * 1000,
+            "max": latencies[-1] * 1000,
+        },
+        "peak_rss_mb": peak_rss_mb(),
+        "peak_rss_scope": "scenario" if peak_resettable else "process",
+    }
+    if bytes_per_call:
+        result["mb_per_second"] = iterations * bytes_per_call / elapsed / 1e6
+    return result
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def write_results(path: str, suite: str, results: List[Dict]):
+    """
+    Write results as JSON with enough metadata to compare runs across commits
+    """
+    document = {
+        "suite": suite,
+        "commit": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+    with open(path, "w") as output:
+        json.dump(document, output, indent=2)
+
+def print_table(results: List[Dict], header: bool = True):
+    if header:
+        print(f"{'scenario':<56} {'calls/s':>9} {'items/s':>10} {'p50 ms':>8} "
+              f"{'p95 ms':>8} {'p99 ms':>8} {'RSS MB':>8}")
+    for r in results:
+        label = r["name"] + "".join(f" {k}={v}" for k, v in r["params"].items())
+        latency = r["latency_ms"]
+        print(f"{label:<56} {r['calls_per_second']:>9.1f} {r['items_per_second']:>10.1f} "
+              f"{latency['p50']:>8.2f} {latency['p95']:>8.2f} {latency['p99']:>8.2f} "
+              f"{r['peak_rss_mb']:>8.1f}")
@@ -0,0 +1,72 @@
+"""
+Throughput of the lexical feature extractor behind DeceptionDetector
+
+    python -m benchmarks.lexical --sizes 1000 5000 10000 100000
+"""
+import argparse
+import random
+import time
+from typing import Dict, List
+
+from api.services.lexical_features import (
+    CITATION_PHRASES, CONFIDENCE_PHRASES, HEDGE_PHRASES, TECHNICAL_PHRASES,
+    LexicalFeatureExtractor
+)
+
+FILLER = (
+    "the model answered question about stars planets orbit light year "
+    "reader student author novel chapter equation value number"
+).split()
+
+def make_text(size: int, seed: int = 0, marker_ratio: float = 0.1) -> str:
+    """
+    Build roughly `size` characters of text with a share of marker phrases
+    """
+    rng = random.Random(seed)
+    markers = HEDGE_PHRASES + CONFIDENCE_PHRASES + TECHNICAL_PHRASES + CITATION_PHRASES
+    words: List[str] = []
+    length = 0
+    while length < size:
+        word = rng.choice(markers) if rng.random() < marker_ratio else rng.choice(FILLER)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:size]
+
+def bench_size(extractor: LexicalFeatureExtractor, size: int, min_seconds: float) -> Dict:
+    text = make_text(size)
+    extractor.extract(text)
+    iterations = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_seconds:
+        extractor.extract(text)
+        iterations += 1
+        elapsed = time.perf_counter() - start
+    per_call = elapsed / iterations
+    return {
+        "size_bytes": size,
+        "iterations": iterations,
+        "seconds_per_call": per_call,
+        "mb_per_second": size / per_call / 1e6,
+        "ns_per_byte": per_call / size * 1e9,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 2500, 5000, 10000, 100000])
+    parser.add_argument("--min-seconds", type=float, default=0.5)
+    args = parser.parse_args()
+
+    extractor = LexicalFeatureExtractor()
+    results = [bench_size(extractor, size, args.min_seconds) for size in args.sizes]
+    print(f"{'bytes':>10} {'calls/s':>10} {'MB/s':>8} {'ns/byte':>8}")
+    for r in results:
+        print(f"{r['size_bytes']:>10} {1 / r['seconds_per_call']:>10.0f} "
+              f"{r['mb_per_second']:>8.2f} {r['ns_per_byte']:>8.1f}")
+
+    # Linear scaling keeps ns/byte flat across sizes
+    per_byte = [r["ns_per_byte"] for r in results]
+    print(f"ns/byte spread (max/min): {max(per_byte) / min(per_byte):.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Wall time, throughput and peak RSS of ModelAnalyzer and the model upload
+route on synthetic checkpoints in every readable format
+
+    python -m benchmarks.model_analysis --sizes 10 100 1000 --output model-bench.json
+"""
+import argparse
+import asyncio
+import fnmatch
+import os
+import sys
+import tempfile
+import uuid
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from .harness import measure, write_results
+from .synthetic_models import EXTENSIONS, available_formats, write_model
+
+Scenario = Tuple[str, Callable[[], Dict]]
+
+# Bytes of the model file sent per ASGI message by the route scenario
+STREAM_CHUNK = 1 << 20
+
+def _configure(directory: str, layer_workers: int):
+    # Every iteration must analyze the model, and spooled uploads should land
+    # in the scratch directory rather than in the repository. Must run before
+    # api.config is imported.
+    os.environ.update({
+        "ANALYSIS_CACHE_PATH": "",
+        "ANALYSIS_CACHE_SIZE": "0",
+        "ANALYSIS_LAYER_CACHE_PATH": "",
+        "ANALYSIS_LAYER_CACHE_SIZE": "0",
+        "SIMILARITY_INDEX_PATH": "",
+        "ANALYSIS_LAYER_WORKERS": str(layer_workers),
+        "UPLOAD_DIR": directory,
+        "RESUMABLE_UPLOAD_DIR": os.path.join(directory, "uploads"),
+        "RESUMABLE_UPLOAD_DB_PATH": os.path.join(directory, "uploads.db"),
+        "JOBS_DB_PATH": os.path.join(directory, "jobs.db"),
+    })
+
+def _read_head(path: str) -> bytes:
+    from api.services.model_sniffer import SNIFF_BYTES
+
+    with open(path, "rb") as model_file:
+        return model_file.read(SNIFF_BYTES)
+
+async def post_file(app, url: str, path: str) -> int:
+    """
+    POST a model file as a multipart upload straight to the ASGI app,
+    streaming it from disk so the client side adds no memory of its own;
+    returns the response status
+    """
+    boundary = uuid.uuid4().hex
+    head = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; "
+        f"filename=\"{os.path.basename(path)}\"\r\nContent-Type: application/octet-stream\r\n\r\n"
+    ).encode("latin-1")
+    tail = f"\r\n--{boundary}--\r\n".encode("latin-1")
+    length = len(head) + os.path.getsize(path) + len(tail)
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": url,
+        "raw_path": url.encode("latin-1"),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"host", b"benchmark"),
+            (b"content-type", f"multipart/form-data; boundary={boundary}".encode("latin-1")),
+            (b"content-length", str(length).encode("latin-1")),
+        ],
+        "client": ("127.0.0.1", 0),
+        "server": ("benchmark", 80),
+    }
+
+    def body() -> Iterator[Dict]:
+        yield {"type": "http.request", "body": head, "more_body": True}
+        with open(path, "rb") as model_file:
+            for chunk in iter(lambda: model_file.read(STREAM_CHUNK), b""):
+                yield {"type": "http.request", "body": chunk, "more_body": True}
+        yield {"type": "http.request", "body": tail, "more_body": False}
+
+    messages = body()
+    status = 0
+
+    async def receive() -> Dict:
+        return next(messages, {"type": "http.disconnect"})
+
+    async def send(message: Dict):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+def analyzer_scenarios(args, loop, models: List[Tuple[str, int, str]]) -> List[Scenario]:
+    from api.models import AnalysisRequest
+    from api.services.model_analyzer import ModelAnalyzer
+    from api.services.model_sniffer import sniff_model
+
+    # Like the route: file-backed models, no result caches
+    analyzer = ModelAnalyzer()
+    scenarios = []
+    for model_format, megabytes, path in models:
+        size = os.path.getsize(path)
+        signature = sniff_model(_read_head(path))
+        request = AnalysisRequest(
+            model_path=path, model_type=signature.model_type, model_format=signature.model_format, size=size
+        )
+
+        def call(i, request=request):
+            result = loop.run_until_complete(analyzer.analyze(request))
+            if any("not inspected" in point for point in result.deception_points):
+                raise RuntimeError(f"{request.model_path} was not parsed: {result.deception_points}")
+
+        name = "service.model_analyzer.analyze"
+        scenarios.append((name, lambda name=name, call=call, size=size, model_format=model_format, megabytes=megabytes:
+            measure(name, call, args.iterations, warmup=args.warmup, bytes_per_call=size,
+                    params={"format": model_format, "mb": megabytes})))
+    return scenarios
+
+def route_scenarios(args, loop, models: List[Tuple[str, int, str]]) -> List[Scenario]:
+    from api.main import app
+
+    url = "/api/v1/analysis/model"
+    scenarios = []
+    for model_format, megabytes, path in models:
+        size = os.path.getsize(path)
+
+        def call(i, path=path):
+            status = loop.run_until_complete(post_file(app, url, path))
+            if status != 200:
+                raise RuntimeError(f"POST {url} failed with status {status}")
+
+        name = f"fastapi.POST {url}"
+        scenarios.append((name, lambda name=name, call=call, size=size, model_format=model_format, megabytes=megabytes:
+            measure(name, call, args.iterations, warmup=args.warmup, bytes_per_call=size,
+                    params={"format": model_format, "mb": megabytes})))
+    return scenarios
+
+def print_row(result: Dict, header: bool):
+    if header:
+        print(f"{'scenario':<40} {'format':>11} {'MB':>6} {'wall s':>8} {'MB/s':>8} {'RSS MB':>8}")
+    params = result["params"]
+    print(f"{result['name']:<40} {params['format']:>11} {params['mb']:>6} "
+          f"{result['latency_ms']['p50'] / 1000:>8.3f} {result['mb_per_second']:>8.1f} "
+          f"{result['peak_rss_mb']:>8.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--suites", nargs="+", default=["service", "fastapi"], choices=["service", "fastapi"])
+    parser.add_argument("--formats", nargs="+", default=available_formats(), choices=sorted(EXTENSIONS))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100], help="Model sizes in MB")
+    parser.add_argument("--dtype", default="float32")
+    parser.add_argument("--only", help="Glob matched against scenario names")
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--layer-workers", type=int, default=1,
+                        help="ANALYSIS_LAYER_WORKERS for the route; worker processes' memory is not in peak RSS")
+    parser.add_argument("--model-dir", help="Reuse generated models from here (default: a temporary directory)")
+    parser.add_argument("--output", default="model-analysis-results.json")
+    args = parser.parse_args()
+
+    # The FastAPI app mounts ./static
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.path.insert(0, os.getcwd())
+
+    with tempfile.TemporaryDirectory(prefix="model-bench-") as scratch:
+        model_dir = args.model_dir or scratch
+        os.makedirs(model_dir, exist_ok=True)
+        _configure(scratch, args.layer_workers)
+        models = []
+        for model_format in args.formats:
+            for megabytes in args.sizes:
+                print(f"Generating {megabytes} MB {model_format} model...", file=sys.stderr)
+                models.append((model_format, megabytes, write_model(model_dir, model_format, megabytes, args.dtype)))
+
+        loop = asyncio.new_event_loop()
+        scenarios = []
+        if "service" in args.suites:
+            scenarios += analyzer_scenarios(args, loop, models)
+        if "fastapi" in args.suites:
+            scenarios += route_scenarios(args, loop, models)
+        results = []
+        for name, run in scenarios:
+            if args.only and not fnmatch.fnmatch(name, args.only):
+                continue
+            result = run()
+            results.append(result)
+            print_row(result, header=len(results) == 1)
+
+    write_results(args.output, "model_analysis", results)
+    print(f"\nWrote {len(results)} results to {args.output}")
+
+if __name__ == "__main__":
+    main()
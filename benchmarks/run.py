@@ -0,0 +1,176 @@
+"""
+Benchmark DeceptionDetector, ModelAnalyzer and the FastAPI and Flask routes
+in-process, writing machine-readable results for comparison between commits
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.compare baseline.json bench.json
+"""
+import argparse
+import asyncio
+import fnmatch
+import io
+import os
+import sys
+from typing import Callable, Dict, List, Tuple
+
+from .harness import measure, print_table, write_results
+from .lexical import make_text
+
+Scenario = Tuple[str, Callable[[], Dict]]
+
+def question_payload(count: int, offset: int = 0) -> List[Dict]:
+    return [
+        {
+            "id": str(offset + i),
+            "question": make_text(120, seed=offset + i),
+            "correct_answer": make_text(40, seed=-(offset + i) - 1),
+        }
+        for i in range(count)
+    ]
+
+def unique(text: str, i: int) -> str:
+    # A distinct suffix per call keeps the result cache out of the measurement
+    return f"{text} {i % 10_000_000:07d}"
+
+_payloads: Dict[int, bytes] = {}
+
+def payload_bytes(size: int) -> bytes:
+    # Generated lazily so filtered-out scenarios do not allocate
+    if size not in _payloads:
+        _payloads[size] = os.urandom(size)
+    return _payloads[size]
+
+def unique_payload(size: int, i: int) -> bytes:
+    # Routes cache analyses by content hash, so vary the bytes per call
+    return payload_bytes(size)[:-8] + i.to_bytes(8, "little", signed=True)
+
+def add(scenarios: List[Scenario], name: str, call: Callable[[int], object], iterations: int, **kwargs):
+    scenarios.append((name, lambda: measure(name, call, iterations, **kwargs)))
+
+def service_scenarios(args) -> List[Scenario]:
+    from api.models import AnalysisRequest, ModelType
+    from api.services.deception_detector import DeceptionDetector
+    from api.services.model_analyzer import ModelAnalyzer
+
+    loop = asyncio.new_event_loop()
+    detector = DeceptionDetector()
+    analyzer = ModelAnalyzer()
+    scenarios = []
+
+    for size in args.text_sizes:
+        text = make_text(size - 8)
+        add(scenarios, "service.detector.analyze",
+            lambda i, text=text: loop.run_until_complete(detector.analyze(unique(text, i))),
+            args.iterations, bytes_per_call=size, params={"chars": size})
+    for count in args.question_counts:
+        questions = question_payload(count)
+        add(scenarios, "service.detector.analyze_question_set",
+            lambda i, questions=questions: loop.run_until_complete(
+                detector.analyze_question_set(questions)
+            ),
+            args.iterations, items_per_call=count, params={"questions": count})
+    for size in args.model_sizes:
+        add(scenarios, "service.model_analyzer.analyze",
+            lambda i, size=size: loop.run_until_complete(analyzer.analyze(
+                AnalysisRequest(model_data=payload_bytes(size), model_type=ModelType.OTHER)
+            )),
+            args.iterations, bytes_per_call=size, params={"bytes": size})
+    return scenarios
+
+def fastapi_scenarios(args, stack) -> List[Scenario]:
+    from fastapi.testclient import TestClient
+    from api.main import app
+
+    client = stack.enter_context(TestClient(app))
+    return http_scenarios(args, "fastapi", client.post, {})
+
+def flask_scenarios(args) -> List[Scenario]:
+    import jwt
+    import app as flask_module
+
+    flask_app = flask_module.app
+    flask_app.config["SECRET_KEY"] = flask_app.config.get("SECRET_KEY") or "benchmark-secret"
+    token = jwt.encode({"user": "benchmark"}, flask_app.config["SECRET_KEY"])
+    client = flask_app.test_client()
+
+    def post(url, json=None, files=None, headers=None):
+        kwargs = {"json": json} if json is not None else {}
+        if files:
+            name, (filename, data) = next(iter(files.items()))
+            kwargs = {"data": {name: (io.BytesIO(data), filename)}}
+        # Talisman redirects plain HTTP, so call the app as if behind TLS
+        return client.post(url, headers=headers, base_url="https://localhost", **kwargs)
+
+    return http_scenarios(args, "flask", post, {"Authorization": f"Bearer {token}"})
+
+def http_scenarios(args, prefix: str, post: Callable, headers: Dict) -> List[Scenario]:
+    def checked(response):
+        status = getattr(response, "status_code", None)
+        if status != 200:
+            raise RuntimeError(f"{prefix} request failed with status {status}")
+        return response
+
+    scenarios = []
+    for size in args.text_sizes:
+        text = make_text(size - 8)
+        add(scenarios, f"{prefix}.POST /api/v1/detection/analyze",
+            lambda i, text=text: checked(post(
+                "/api/v1/detection/analyze", json={"content": unique(text, i)}, headers=headers
+            )),
+            args.iterations, bytes_per_call=size, params={"chars": size})
+    for count in args.question_counts:
+        # Offset each iteration so results are computed rather than cached
+        add(scenarios, f"{prefix}.POST /api/v1/detection/analyze-questions",
+            lambda i, count=count: checked(post(
+                "/api/v1/detection/analyze-questions",
+                json=question_payload(count, offset=(i + 10) * count), headers=headers
+            )),
+            args.iterations, items_per_call=count, params={"questions": count})
+    for size in args.model_sizes:
+        add(scenarios, f"{prefix}.POST /api/v1/analysis/model",
+            lambda i, size=size: checked(post(
+                "/api/v1/analysis/model",
+                files={"file": ("model.bin", unique_payload(size, i))}, headers=headers
+            )),
+            args.iterations, bytes_per_call=size, params={"bytes": size})
+    return scenarios
+
+def main():
+    from contextlib import ExitStack
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--suites", nargs="+", default=["service", "fastapi", "flask"],
+                        choices=["service", "fastapi", "flask"])
+    parser.add_argument("--only", help="Glob matched against scenario names")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--text-sizes", type=int, nargs="+", default=[200, 2000, 10000])
+    parser.add_argument("--question-counts", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--model-sizes", type=int, nargs="+", default=[1 << 20, 16 << 20])
+    parser.add_argument("--output", default="benchmark-results.json")
+    args = parser.parse_args()
+
+    # The FastAPI app mounts ./static and Flask reads ./docs
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.path.insert(0, os.getcwd())
+
+    results = []
+    with ExitStack() as stack:
+        scenarios = []
+        if "service" in args.suites:
+            scenarios += service_scenarios(args)
+        if "fastapi" in args.suites:
+            scenarios += fastapi_scenarios(args, stack)
+        if "flask" in args.suites:
+            scenarios += flask_scenarios(args)
+        for name, run in scenarios:
+            if args.only and not fnmatch.fnmatch(name, args.only):
+                continue
+            result = run()
+            results.append(result)
+            print_table([result], header=len(results) == 1)
+
+    write_results(args.output, "endpoints", results)
+    print(f"\nWrote {len(results)} results to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Generate reproducible synthetic checkpoints in every format ModelAnalyzer
+reads, at any size, without holding more than one layer in memory
+
+    python -m benchmarks.synthetic_models --sizes 10 100 1000 --output-dir /tmp/models
+"""
+import argparse
+import json
+import os
+import struct
+import zipfile
+from typing import Callable, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from api.services.model_readers import BFLOAT16, READERS
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+# Largest single layer; bigger models get more layers rather than bigger ones
+MAX_LAYER_BYTES = 64 << 20
+# Rows generated at a time while filling a layer
+FILL_ROWS = 1024
+
+SAFETENSORS_DTYPES = {"float64": "F64", "float32": "F32", "float16": "F16", BFLOAT16: "BF16"}
+EXTENSIONS = {"npy": ".npy", "npz": ".npz", "safetensors": ".safetensors", "hdf5": ".h5"}
+
+Layer = Tuple[str, Tuple[int, int]]
+
+def storage_dtype(dtype: str) -> np.dtype:
+    return np.dtype("<u2") if dtype == BFLOAT16 else np.dtype(dtype)
+
+def plan_layers(size: int, dtype: str, single: bool = False) -> List[Layer]:
+    """
+    Split `size` bytes into transformer-style named 2-D layers of at most
+    MAX_LAYER_BYTES each (one layer when `single`)
+    """
+    itemsize = storage_dtype(dtype).itemsize
+    elements = max(1, size // itemsize)
+    layer_elements = elements if single else min(elements, MAX_LAYER_BYTES // itemsize)
+    layers = []
+    index = 0
+    while elements > 0:
+        count = min(layer_elements, elements)
+        cols = 1 << max(4, int(np.log2(count) // 2))
+        rows = max(1, count // cols)
+        block, part = divmod(index, 4)
+        name = f"encoder.layer.{block}.attention.{('q_proj', 'k_proj', 'v_proj', 'o_proj')[part]}.weight"
+        layers.append((name, (rows, cols)))
+        elements -= count
+        index += 1
+    return layers
+
+def layer_rows(shape: Tuple[int, int], dtype: str, seed: int) -> Iterator[np.ndarray]:
+    """
+    Yield a layer's weights FILL_ROWS rows at a time in its storage dtype
+    """
+    rng = np.random.default_rng(seed)
+    rows, cols = shape
+    for start in range(0, rows, FILL_ROWS):
+        block = rng.standard_normal((min(FILL_ROWS, rows - start), cols), dtype=np.float32) * 0.02
+        if dtype == BFLOAT16:
+            yield (block.view(np.uint32) >> 16).astype(np.uint16)
+        else:
+            yield block.astype(dtype)
+
+def _write_npy_stream(out, shape: Tuple[int, int], dtype: str, seed: int):
+    header = {"descr": np.lib.format.dtype_to_descr(storage_dtype(dtype)), "fortran_order": False, "shape": shape}
+    np.lib.format.write_array_header_2_0(out, header)
+    for block in layer_rows(shape, dtype, seed):
+        out.write(block.tobytes())
+
+def write_npy(path: str, size: int, dtype: str, seed: int) -> List[Layer]:
+    layers = plan_layers(size, dtype, single=True)
+    with open(path, "wb") as out:
+        _write_npy_stream(out, layers[0][1], dtype, seed)
+    return layers
+
+def write_npz(path: str, size: int, dtype: str, seed: int) -> List[Layer]:
+    layers = plan_layers(size, dtype)
+    # Stored, like np.savez, so members can be mapped in place
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_STORED) as archive:
+        for i, (name, shape) in enumerate(layers):
+            with archive.open(f"{name}.npy", "w", force_zip64=True) as member:
+                _write_npy_stream(member, shape, dtype, seed + i)
+    return layers
+
+def write_safetensors(path: str, size: int, dtype: str, seed: int) -> List[Layer]:
+    layers = plan_layers(size, dtype)
+    itemsize = storage_dtype(dtype).itemsize
+    header: Dict[str, Dict] = {}
+    offset = 0
+    for name, shape in layers:
+        nbytes = shape[0] * shape[1] * itemsize
+        header[name] = {"dtype": SAFETENSORS_DTYPES[dtype], "shape": list(shape), "data_offsets": [offset, offset + nbytes]}
+        offset += nbytes
+    encoded = json.dumps(header).encode("utf-8")
+    encoded += b" " * (-len(encoded) % 8)
+    with open(path, "wb") as out:
+        out.write(struct.pack("<Q", len(encoded)) + encoded)
+        for i, (_, shape) in enumerate(layers):
+            for block in layer_rows(shape, dtype, seed + i):
+                out.write(block.tobytes())
+    return layers
+
+def write_hdf5(path: str, size: int, dtype: str, seed: int) -> List[Layer]:
+    if h5py is None:
+        raise RuntimeError("Writing HDF5 models requires h5py")
+    layers = plan_layers(size, dtype)
+    with h5py.File(path, "w") as model:
+        for i, (name, shape) in enumerate(layers):
+            dataset = model.create_dataset(name.replace(".", "/"), shape=shape, dtype=storage_dtype(dtype))
+            start = 0
+            for block in layer_rows(shape, dtype, seed + i):
+                dataset[start:start + len(block)] = block
+                start += len(block)
+    return layers
+
+WRITERS: Dict[str, Callable[[str, int, str, int], List[Layer]]] = {
+    "npy": write_npy,
+    "npz": write_npz,
+    "safetensors": write_safetensors,
+    "hdf5": write_hdf5,
+}
+
+def available_formats() -> List[str]:
+    """
+    Formats that both have a reader and can be written here
+    """
+    return [name for name in READERS if name in WRITERS and (name != "hdf5" or h5py is not None)]
+
+def write_model(directory: str, model_format: str, megabytes: int, dtype: str = "float32", seed: int = 0) -> str:
+    """
+    Write a synthetic model of about `megabytes` MB unless an identical one
+    already exists; returns its path
+    """
+    if model_format == "hdf5" and dtype == BFLOAT16:
+        raise ValueError("HDF5 has no bfloat16 dtype")
+    path = os.path.join(directory, f"synthetic-{megabytes}mb-{dtype}-s{seed}{EXTENSIONS[model_format]}")
+    if not os.path.exists(path):
+        partial = path + ".partial"
+        WRITERS[model_format](partial, megabytes << 20, dtype, seed)
+        os.replace(partial, path)
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--formats", nargs="+", default=available_formats(), choices=sorted(WRITERS))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100], help="Model sizes in MB")
+    parser.add_argument("--dtype", default="float32", choices=sorted(SAFETENSORS_DTYPES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output-dir", default="synthetic-models")
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    for model_format in args.formats:
+        for size in args.sizes:
+            path = write_model(args.output_dir, model_format, size, args.dtype, args.seed)
+            print(f"{os.path.getsize(path) / 2 ** 20:>10.1f} MB  {path}")
+
+if __name__ == "__main__":
+    main()
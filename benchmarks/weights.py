@@ -0,0 +1,81 @@
+"""
+Throughput of the per-layer weight statistics behind ModelAnalyzer, in GB/s
+of weights scanned
+
+    python -m benchmarks.weights --sizes 1 16 64 --dtypes float32 bfloat16
+"""
+import argparse
+import json
+import struct
+import time
+from typing import Dict
+
+import numpy as np
+
+from api.services.model_readers import BFLOAT16, open_model_buffer, open_reader
+from api.services.weight_stats import layer_stats
+
+def make_layer(megabytes: int, dtype: str, seed: int = 0) -> np.ndarray:
+    """
+    Build a square-ish random layer of roughly `megabytes` MB in `dtype`
+    """
+    storage = np.dtype("<u2") if dtype == BFLOAT16 else np.dtype(dtype)
+    elements = (megabytes << 20) // storage.itemsize
+    cols = 1 << max(4, int(np.log2(elements) // 2))
+    rows = max(1, elements // cols)
+    weights = np.random.default_rng(seed).standard_normal((rows, cols), dtype=np.float32) * 0.02
+    if dtype == BFLOAT16:
+        return (weights.view(np.uint32) >> 16).astype(np.uint16)
+    return weights.astype(dtype)
+
+def make_safetensors(layer: np.ndarray, dtype: str) -> bytes:
+    code = {"float64": "F64", "float32": "F32", "float16": "F16", BFLOAT16: "BF16"}[dtype]
+    header = json.dumps({
+        "layer": {"dtype": code, "shape": list(layer.shape), "data_offsets": [0, layer.nbytes]}
+    }).encode("utf-8")
+    # Pad the header like safetensors writers do, so the data is 8-byte aligned
+    header += b" " * (-len(header) % 8)
+    return struct.pack("<Q", len(header)) + header + layer.tobytes()
+
+def bench_layer(megabytes: int, dtype: str, spectral_iterations: int, min_seconds: float) -> Dict:
+    data = make_safetensors(make_layer(megabytes, dtype), dtype)
+    with open_model_buffer(data) as buffer:
+        reader = open_reader("safetensors", buffer, data)
+        info = reader.tensors[0]
+        layer_stats(reader, info, spectral_iterations=spectral_iterations)
+        iterations = 0
+        start = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < min_seconds:
+            layer_stats(reader, info, spectral_iterations=spectral_iterations)
+            iterations += 1
+            elapsed = time.perf_counter() - start
+        reader.close()
+    per_call = elapsed / iterations
+    return {
+        "dtype": dtype,
+        "bytes": info.nbytes,
+        "spectral_iterations": spectral_iterations,
+        "iterations": iterations,
+        "seconds_per_call": per_call,
+        "gb_per_second": info.nbytes / per_call / 1e9,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 16, 64], help="Layer sizes in MB")
+    parser.add_argument("--dtypes", nargs="+", default=["float32", "float16", BFLOAT16])
+    parser.add_argument("--spectral-iterations", type=int, nargs="+", default=[0, 8])
+    parser.add_argument("--min-seconds", type=float, default=1.0)
+    args = parser.parse_args()
+
+    print(f"{'dtype':>9} {'MB':>6} {'spectral':>8} {'calls/s':>9} {'GB/s':>7}")
+    for dtype in args.dtypes:
+        for size in args.sizes:
+            for spectral_iterations in args.spectral_iterations:
+                r = bench_layer(size, dtype, spectral_iterations, args.min_seconds)
+                print(f"{dtype:>9} {r['bytes'] / 2 ** 20:>6.0f} {spectral_iterations:>8} "
+                      f"{1 / r['seconds_per_call']:>9.2f} {r['gb_per_second']:>7.2f}")
+
+if __name__ == "__main__":
+    main()
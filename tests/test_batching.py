@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from api.services.batching import MicroBatcher
+
+def recording_handler(calls):
+    async def handler(items):
+        calls.append(list(items))
+        await asyncio.sleep(0)
+        return [item * 10 for item in items]
+    return handler
+
+def test_full_batch_is_flushed_without_waiting():
+    calls = []
+    batcher = MicroBatcher(recording_handler(calls), window_ms=10_000, max_batch_size=4)
+
+    async def main():
+        return await asyncio.wait_for(asyncio.gather(*(batcher.submit(i) for i in range(8))), 1.0)
+
+    assert asyncio.run(main()) == [0, 10, 20, 30, 40, 50, 60, 70]
+    assert calls == [[0, 1, 2, 3], [4, 5, 6, 7]]
+    assert batcher.stats()["batch_size_histogram"] == {4: 2}
+
+def test_partial_batch_is_flushed_after_the_window():
+    calls = []
+    batcher = MicroBatcher(recording_handler(calls), window_ms=20, max_batch_size=64)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        first = await asyncio.gather(*(batcher.submit(i) for i in range(3)))
+        elapsed = loop.time() - started
+        # A later submission starts a new window
+        second = await batcher.submit(3)
+        return first, second, elapsed
+
+    first, second, elapsed = asyncio.run(main())
+    assert (first, second) == ([0, 10, 20], 30)
+    assert elapsed >= 0.015
+    assert calls == [[0, 1, 2], [3]]
+    stats = batcher.stats()
+    assert (stats["batches"], stats["items"]) == (2, 4)
+    assert stats["queue_delay_ms"]["max"] >= 15
+
+def test_handler_error_reaches_every_waiter():
+    async def failing(items):
+        raise ValueError("model unavailable")
+
+    batcher = MicroBatcher(failing, window_ms=1, max_batch_size=64)
+
+    async def main():
+        return await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, ValueError) and str(result) == "model unavailable" for result in results)
+
+def test_wrong_result_count_fails_the_batch():
+    async def short(items):
+        return items[:-1]
+
+    batcher = MicroBatcher(short, window_ms=1)
+
+    async def main():
+        return await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in asyncio.run(main()))
+
+def test_cancelled_waiter_does_not_affect_the_others():
+    calls = []
+    batcher = MicroBatcher(recording_handler(calls), window_ms=10)
+
+    async def main():
+        cancelled = asyncio.ensure_future(batcher.submit(1))
+        kept = asyncio.ensure_future(batcher.submit(2))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        return await kept
+
+    assert asyncio.run(main()) == 20
+    assert calls == [[1, 2]]
@@ -0,0 +1,46 @@
+import asyncio
+import random
+
+from api.services.chunking import content_defined_chunks
+from api.services.deception_detector import DeceptionDetector
+from api.services.result_cache import ResultCache
+
+def transcript(words: int, seed: int = 0) -> str:
+    # No sentence punctuation at all, like a raw speech-to-text transcript
+    rng = random.Random(seed)
+    vocabulary = [
+        "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(2, 9)))
+        for _ in range(5000)
+    ]
+    return " ".join(rng.choice(vocabulary) for _ in range(words))
+
+def reused(before: str, after: str) -> float:
+    old = set(content_defined_chunks(before))
+    new = content_defined_chunks(after)
+    return sum(chunk in old for chunk in new) / len(new)
+
+def test_chunks_rejoin_to_the_text():
+    text = transcript(60000)
+    chunks = content_defined_chunks(text)
+    assert "".join(chunks) == text
+    assert all(len(chunk) <= 32768 + 16 for chunk in chunks)
+
+def test_unpunctuated_text_is_cut_by_content():
+    text = transcript(200000)
+    chunks = content_defined_chunks(text)
+    # Most cuts come from the fallback boundary, not the max_size limit
+    assert sum(len(chunk) >= 32768 - 16 for chunk in chunks) < len(chunks) // 10
+    assert reused(text, text[:1000] + "inserted words " + text[1000:]) > 0.9
+    middle = text.index(" ", len(text) // 2)
+    assert reused(text, text[:middle] + " inserted words" + text[middle:]) > 0.9
+
+def test_document_keys_match_the_chunk_cache():
+    cache = ResultCache(DeceptionDetector.VERSION)
+    detector = DeceptionDetector(chunk_cache=cache)
+    text = transcript(20000)
+    first = asyncio.run(detector.analyze_document(text))
+    second = asyncio.run(detector.analyze_document(text + " more words"))
+    assert first.reused_chunks == 0
+    assert second.reused_chunks >= first.chunks - 1
+    chunks, keys = DeceptionDetector._chunk_document(text, cache.version)
+    assert keys == [cache.make_key(chunk) for chunk in chunks]
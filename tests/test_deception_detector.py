@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from api.services.deception_detector import DeceptionDetector
+from api.services.executor import AnalysisExecutor
+from api.services.result_cache import ResultCache
+
+CONTENTS = [
+    "",
+    "Paris.",
+    "It might possibly be true, perhaps, in some cases, more or less.",
+    "This is definitely, absolutely and obviously proven. Everyone knows it.",
+    "The stochastic regression coefficient has a significant p-value and variance.",
+    "According to a peer-reviewed study [12], researchers published a report [3].",
+    "Clearly the algorithm is guaranteed to converge, according to the journal.",
+    "Paris.",
+    " ".join(["The answer may be roughly right but the methodology is unclear."] * 40),
+]
+
+def single(detector, content):
+    return asyncio.run(detector.analyze(content)).model_dump()
+
+@pytest.mark.parametrize("make_detector", [
+    lambda: DeceptionDetector(),
+    lambda: DeceptionDetector(cache=ResultCache(DeceptionDetector.VERSION)),
+    lambda: DeceptionDetector(executor=AnalysisExecutor("thread", max_workers=2)),
+])
+def test_batch_rows_match_single_item_scoring(make_detector):
+    batch = asyncio.run(make_detector().analyze_batch(CONTENTS))
+    reference = DeceptionDetector()
+    assert len(batch) == len(CONTENTS)
+    for content, result in zip(CONTENTS, batch):
+        assert result.model_dump() == single(reference, content)
+        # The per-item helpers score one text on its own
+        assert result.probability == reference._calculate_deception_probability(content)
+        assert result.confidence == reference._calculate_confidence(content)
+        assert result.issues == reference._identify_issues(content)
+
+def test_batch_results_do_not_depend_on_their_neighbours():
+    detector = DeceptionDetector()
+    forward = asyncio.run(detector.analyze_batch(CONTENTS))
+    backward = asyncio.run(detector.analyze_batch(CONTENTS[::-1]))[::-1]
+    assert [r.model_dump() for r in forward] == [r.model_dump() for r in backward]
+
+def test_cached_rows_match_fresh_scoring():
+    detector = DeceptionDetector(cache=ResultCache(DeceptionDetector.VERSION))
+    asyncio.run(detector.analyze_batch(CONTENTS[2:5]))
+    mixed = asyncio.run(detector.analyze_batch(CONTENTS))
+    assert detector.cache.stats()["hits"] >= 3
+    reference = DeceptionDetector()
+    assert [r.model_dump() for r in mixed] == [single(reference, c) for c in CONTENTS]
@@ -0,0 +1,46 @@
+import json
+
+import pytest
+from starlette.requests import Request
+
+from api import encoding
+from api.encoding import encoded_response
+from api.models import DeceptionDetectionResponse
+
+CONTENT = {
+    "result": DeceptionDetectionResponse(probability=0.25, confidence=0.9, issues=["x"], recommendations=[]),
+    "count": 2,
+}
+EXPECTED = {
+    "result": {"probability": 0.25, "confidence": 0.9, "issues": ["x"], "recommendations": []},
+    "count": 2,
+}
+
+def request(accept=None) -> Request:
+    headers = [(b"accept", accept.encode("latin-1"))] if accept else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+@pytest.mark.parametrize("accept", [None, "application/json", "*/*", "text/html, application/json;q=0.9"])
+def test_json_by_default(accept):
+    response = encoded_response(request(accept), CONTENT, status_code=201)
+    assert response.status_code == 201
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == EXPECTED
+
+@pytest.mark.parametrize("accept", ["application/msgpack", "application/x-msgpack, application/json"])
+def test_msgpack_when_accepted(accept):
+    msgpack = pytest.importorskip("msgpack")
+    response = encoded_response(request(accept), CONTENT)
+    assert response.media_type == "application/msgpack"
+    assert msgpack.unpackb(response.body) == EXPECTED
+
+def test_json_when_msgpack_is_unavailable(monkeypatch):
+    monkeypatch.setattr(encoding, "msgpack", None)
+    response = encoded_response(request("application/msgpack"), CONTENT)
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == EXPECTED
+
+def test_json_without_orjson(monkeypatch):
+    monkeypatch.setattr(encoding, "orjson", None)
+    response = encoded_response(request(), CONTENT)
+    assert json.loads(response.body) == EXPECTED
@@ -0,0 +1,86 @@
+import asyncio
+import time
+
+import pytest
+
+from api.services.job_queue import MAX_CHUNK_ATTEMPTS, JobQueue, JobWorkerPool
+
+QUESTIONS = [(f"Question {i}?", f"Answer {i}") for i in range(4)]
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / "jobs.db"), chunk_size=2, lease_seconds=0.05)
+
+def scored(items):
+    return [{"question": question} for question, _ in items]
+
+def test_results_stop_at_the_first_missing_index(queue):
+    job_id = queue.submit(QUESTIONS)["job_id"]
+    first = queue.claim("w1")
+    second = queue.claim("w2")
+    assert queue.complete("w2", job_id, second[1], scored(second[3]))
+    # Indexes 2-3 are done but 0-1 are not: nothing can be returned yet
+    assert queue.results(job_id, 0, 10) == []
+    assert [r["index"] for r in queue.results(job_id, 2, 10)] == [2, 3]
+    assert queue.complete("w1", job_id, first[1], scored(first[3]))
+    assert [r["index"] for r in queue.results(job_id, 0, 3)] == [0, 1, 2]
+    assert queue.status(job_id)["status"] == "completed"
+
+def test_expired_lease_is_claimed_by_another_worker(queue):
+    job_id = queue.submit(QUESTIONS[:2])["job_id"]
+    claimed = queue.claim("w1")
+    assert queue.claim("w2") is None
+    time.sleep(0.06)
+    assert queue.claim("w2")[:3] == claimed[:3]
+    # The first worker's late results are ignored
+    assert not queue.complete("w1", job_id, 0, scored(claimed[3]))
+    assert not queue.renew("w1", job_id, 0)
+    assert queue.complete("w2", job_id, 0, scored(claimed[3]))
+
+def test_renewed_lease_is_kept(queue):
+    job_id = queue.submit(QUESTIONS[:2])["job_id"]
+    queue.claim("w1")
+    for _ in range(3):
+        time.sleep(0.03)
+        assert queue.renew("w1", job_id, 0)
+        assert queue.claim("w2") is None
+
+def test_repeatedly_abandoned_chunk_fails_the_job(queue):
+    job_id = queue.submit(QUESTIONS[:2])["job_id"]
+    for attempt in range(MAX_CHUNK_ATTEMPTS):
+        assert queue.claim(f"w{attempt}") is not None
+        time.sleep(0.06)
+    assert queue.claim("last") is None
+    status = queue.status(job_id)
+    assert status["status"] == "failed" and "abandoned" in status["error"]
+
+def test_repeated_errors_fail_the_job(queue):
+    job_id = queue.submit(QUESTIONS[:2])["job_id"]
+    for attempt in range(MAX_CHUNK_ATTEMPTS):
+        queue.claim("w1")
+        queue.fail("w1", job_id, 0, "scoring failed")
+        expected = "failed" if attempt == MAX_CHUNK_ATTEMPTS - 1 else "running"
+        assert queue.status(job_id)["status"] == expected
+    assert queue.claim("w1") is None
+    assert queue.status(job_id)["error"] == "scoring failed"
+
+def test_workers_heartbeat_through_slow_chunks(queue):
+    job_id = queue.submit(QUESTIONS[:2])["job_id"]
+
+    async def slow(items):
+        # Several lease lengths; without renewal another worker would take over
+        await asyncio.sleep(0.2)
+        return scored(items)
+
+    async def main():
+        pool = JobWorkerPool(queue, slow, workers=1, poll_interval=0.01)
+        pool.start()
+        await asyncio.sleep(0.1)
+        stolen = await asyncio.to_thread(queue.claim, "other")
+        while queue.status(job_id)["status"] != "completed":
+            await asyncio.sleep(0.01)
+        await pool.stop()
+        return stolen
+
+    assert asyncio.run(main()) is None
+    assert len(queue.results(job_id, 0, 10)) == 2
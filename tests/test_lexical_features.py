@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+from api.services.lexical_features import (
+    CITATION_PHRASES, CITATION_TOKEN, CONFIDENCE_PHRASES, HEDGE_PHRASES, TECHNICAL_PHRASES, TOKEN_PATTERN,
+    LexicalFeatureExtractor, _phrase_tokens
+)
+
+CATEGORIES = (HEDGE_PHRASES, CONFIDENCE_PHRASES, TECHNICAL_PHRASES, CITATION_PHRASES)
+
+def per_phrase_scan(content, categories):
+    """
+    Reference: count every occurrence of every phrase separately
+    """
+    tokens = [
+        CITATION_TOKEN if token[0] == "[" else token
+        for token in TOKEN_PATTERN.findall(content.lower())
+    ]
+    counts = [len(tokens)] + [0] * len(categories)
+    for category, phrases in enumerate(categories):
+        for phrase in phrases:
+            pattern = _phrase_tokens(phrase)
+            counts[category + 1] += sum(
+                tokens[i:i + len(pattern)] == pattern for i in range(len(tokens) - len(pattern) + 1)
+            )
+    return counts
+
+def test_overlapping_phrases_are_all_counted():
+    categories = (("a b", "b c"), ("a b c",), ("b",))
+    extractor = LexicalFeatureExtractor(categories)
+    for text in ("a b c", "a b a b c c", "b c a b", "x a b c b c"):
+        assert extractor.extract(text) == per_phrase_scan(text, categories)
+    assert extractor.extract("a b c") == [3, 2, 1, 1]
+
+def test_phrases_sharing_a_prefix():
+    categories = (("to some", "to some extent"), ("to",), ("some extent of",))
+    extractor = LexicalFeatureExtractor(categories)
+    for text in ("to some extent of it", "to to some to some extent", "some extent to some"):
+        assert extractor.extract(text) == per_phrase_scan(text, categories)
+
+@pytest.mark.parametrize("text, expected", [
+    ("The mayor may speak", [4, 1, 0, 0, 0]),
+    ("A non-significant, insignificant result", [4, 0, 0, 0, 0]),
+    ("A meta-analysis, a meta analysis", [5, 0, 0, 1, 0]),
+    ("Studies show it; see [12] and [3].", [7, 0, 0, 0, 3]),
+    ("It is possible... it is, possibly", [6, 2, 0, 0, 0]),
+    ("A researcher's sources", [3, 0, 0, 0, 1]),
+])
+def test_phrases_match_whole_tokens(text, expected):
+    assert LexicalFeatureExtractor().extract(text) == expected
+    assert per_phrase_scan(text, CATEGORIES) == expected
+
+def test_matches_per_phrase_scan_on_random_text():
+    rng = random.Random(7)
+    vocabulary = [phrase for phrases in CATEGORIES for phrase in phrases]
+    vocabulary += ["the", "of", "is", "it", "some", "no", "[4]", "well", "known", "doubt", "question"]
+    extractor = LexicalFeatureExtractor()
+    for _ in range(200):
+        text = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(0, 60)))
+        assert extractor.extract(text) == per_phrase_scan(text, CATEGORIES)
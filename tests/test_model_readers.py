@@ -0,0 +1,66 @@
+import asyncio
+import io
+import json
+import struct
+
+import numpy as np
+import pytest
+
+from api.models import AnalysisRequest, ModelType
+from api.services.model_analyzer import ModelAnalyzer
+from api.services.model_readers import ModelFormatError, open_model_buffer, open_reader
+
+def npy_bytes(array: np.ndarray) -> bytes:
+    out = io.BytesIO()
+    np.save(out, array)
+    return out.getvalue()
+
+def npz_bytes(**arrays) -> bytes:
+    out = io.BytesIO()
+    np.savez(out, **arrays)
+    return out.getvalue()
+
+def safetensors_bytes(array: np.ndarray, data_end=None) -> bytes:
+    nbytes = array.nbytes if data_end is None else data_end
+    header = json.dumps({
+        "w": {"dtype": "F32", "shape": list(array.shape), "data_offsets": [0, nbytes]}
+    }).encode("utf-8")
+    header += b" " * (-len(header) % 8)
+    return struct.pack("<Q", len(header)) + header + array.tobytes()
+
+def weights(rows: int = 64, cols: int = 32) -> np.ndarray:
+    return np.random.default_rng(0).standard_normal((rows, cols)).astype(np.float32)
+
+@pytest.mark.parametrize("model_format,data", [
+    ("npy", npy_bytes(weights())),
+    ("npz", npz_bytes(a=weights(), b=weights(8, 8))),
+    ("safetensors", safetensors_bytes(weights())),
+])
+def test_reads_tensors_in_place(model_format, data):
+    with open_model_buffer(data) as buffer:
+        reader = open_reader(model_format, buffer, data)
+        try:
+            info = reader.tensors[0]
+            np.testing.assert_array_equal(reader.read(info), weights(*info.shape))
+            chunks = list(reader.iter_chunks(info, max_elements=100))
+            assert sum(chunk.size for chunk in chunks) == info.size
+        finally:
+            reader.close()
+
+@pytest.mark.parametrize("model_format,data", [
+    ("npy", npy_bytes(weights())[:200]),
+    ("npy", npy_bytes(weights())[:12]),
+    ("npz", npz_bytes(a=weights())[:-300]),
+    ("safetensors", safetensors_bytes(weights())[:-4]),
+    ("safetensors", safetensors_bytes(weights(), data_end=16)),
+])
+def test_truncated_or_inconsistent_models_fail_at_open(model_format, data):
+    with open_model_buffer(data) as buffer:
+        with pytest.raises(ModelFormatError):
+            open_reader(model_format, buffer, data)
+
+def test_truncated_model_is_reported_not_raised():
+    data = npy_bytes(weights())[:200]
+    request = AnalysisRequest(model_data=data, model_type=ModelType.OTHER, model_format="npy")
+    result = asyncio.run(ModelAnalyzer().analyze(request))
+    assert any("Could not parse the npy model" in point for point in result.deception_points)
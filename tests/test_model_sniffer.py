@@ -0,0 +1,60 @@
+import io
+import json
+import pickle
+import struct
+import zipfile
+
+import numpy as np
+import pytest
+
+from api.models import ModelType
+from api.services.model_sniffer import HDF5_SIGNATURE, UNKNOWN, ModelSignature, sniff_model
+
+def zip_bytes(*members: str) -> bytes:
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_STORED) as archive:
+        for member in members:
+            archive.writestr(member, b"\0" * 16)
+    return out.getvalue()
+
+def safetensors_head(*names: str) -> bytes:
+    header = json.dumps({
+        name: {"dtype": "F32", "shape": [2], "data_offsets": [0, 8]} for name in names
+    }).encode("utf-8")
+    return struct.pack("<Q", len(header)) + header
+
+@pytest.mark.parametrize("head, expected", [
+    (HDF5_SIGNATURE + b"\0" * 64 + b"dense_1/kernel", ModelSignature("hdf5", ModelType.NEURAL_NETWORK)),
+    # Superblock after a 512-byte user block
+    (b"\0" * 512 + HDF5_SIGNATURE + b"multi_head_attention", ModelSignature("hdf5", ModelType.TRANSFORMER)),
+    (np.lib.format.magic(1, 0) + b"\0" * 8, ModelSignature("npy", ModelType.OTHER)),
+    (zip_bytes("encoder.layer.0.q_proj.npy"), ModelSignature("npz", ModelType.TRANSFORMER)),
+    (zip_bytes("archive/data.pkl", "archive/data/0"), ModelSignature("pytorch", ModelType.NEURAL_NETWORK)),
+    (zip_bytes("metadata.json", "config.json"), ModelSignature("keras", ModelType.NEURAL_NETWORK)),
+    (zip_bytes("readme.txt"), ModelSignature("zip", ModelType.OTHER)),
+    (b"\x80\x04\x95" + b"sklearn.ensemble._forest\x94RandomForestClassifier",
+     ModelSignature("pickle", ModelType.DECISION_TREE)),
+    (b"\x80\x02ctorch._utils\n_rebuild_tensor_v2\n", ModelSignature("pickle", ModelType.NEURAL_NETWORK)),
+    (pickle.dumps({"weights": [1, 2, 3]}, protocol=4), ModelSignature("pickle", ModelType.OTHER)),
+    (safetensors_head("mlp.fc1.weight"), ModelSignature("safetensors", ModelType.NEURAL_NETWORK)),
+    (safetensors_head("layers.0.attention.wq.weight"), ModelSignature("safetensors", ModelType.TRANSFORMER)),
+    # ir_version 8, then producer_name "pytorch"
+    (b"\x08\x08\x12\x07pytorch\x1a\x052.1.0", ModelSignature("onnx", ModelType.NEURAL_NETWORK)),
+    (b"\x08\x07\x12\x07skl2onnx\x3a\x10ai.onnx.ml TreeEnsembleClassifier",
+     ModelSignature("onnx", ModelType.DECISION_TREE)),
+])
+def test_signatures(head, expected):
+    assert sniff_model(head) == expected
+
+@pytest.mark.parametrize("head", [
+    b"",
+    b"just some text, not a model",
+    # A plausible length prefix without a JSON header
+    struct.pack("<Q", 64) + b"\x00\x01" * 8,
+    # Field 1 varint with an implausible ir_version
+    b"\x08\x7f\x12\x07pytorch",
+    # Pickle opcode with an unsupported protocol
+    b"\x80\x09junk",
+])
+def test_unknown_files(head):
+    assert sniff_model(head) == UNKNOWN
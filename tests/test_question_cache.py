@@ -0,0 +1,155 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from api.services.literary_vault_client import LiteraryVaultClient
+from api.services.question_cache import CorpusUnavailable, QuestionCache
+
+class LiteraryVault(ThreadingHTTPServer):
+    """
+    Local stand-in for the Literary Vault API: one JSON list per category
+    with a strong ETag, honouring If-None-Match
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), Handler)
+        self.corpora = {"astronomy": [{"id": "q1", "question": "Closest star?", "correct_answer": "The Sun"}]}
+        self.version = 1
+        self.failing = False
+        self.paginated = False
+        self.requests = []
+        self.not_modified = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        server.requests.append(self.path)
+        category = self.path.rsplit("/", 1)[-1]
+        etag = f'"v{server.version}"'
+        if server.failing or category not in server.corpora:
+            self.send_response(503 if server.failing else 404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.headers.get("If-None-Match") == etag:
+            server.not_modified += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        body = json.dumps(server.corpora[category]).encode("utf-8")
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if server.paginated:
+            self.send_header("Link", f'<{server.url}/questions/{category}?page=2>; rel="next"')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def vault():
+    server = LiteraryVault()
+    thread = threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def run(vault, scenario, **options):
+    async def main():
+        client = LiteraryVaultClient(base_url=vault.url, http2=False)
+        try:
+            return await scenario(QuestionCache(client, **options))
+        finally:
+            await client.close()
+    return asyncio.run(main())
+
+def test_fresh_copy_is_served_without_requests(vault):
+    async def scenario(cache):
+        first = await cache.get("astronomy")
+        assert await cache.get("astronomy") is first
+        return cache.stats()
+
+    stats = run(vault, scenario, ttl_seconds=60)
+    assert len(vault.requests) == 1
+    assert (stats["misses"], stats["hits"]) == (1, 1)
+
+def test_expired_copy_is_revalidated_with_its_etag(vault):
+    async def scenario(cache):
+        first = await cache.get("astronomy")
+        await asyncio.sleep(0.05)
+        # 304: the same list is kept
+        assert await cache.get("astronomy") is first
+        vault.version = 2
+        vault.corpora["astronomy"].append({"id": "q2", "question": "Red planet?", "correct_answer": "Mars"})
+        await asyncio.sleep(0.05)
+        return first, await cache.get("astronomy"), cache.stats()
+
+    first, updated, stats = run(vault, scenario, ttl_seconds=0.01, stale_while_revalidate=0)
+    assert len(first) == 1 and len(updated) == 2
+    assert vault.not_modified == 1
+    assert (stats["revalidations"], stats["not_modified"]) == (2, 1)
+
+def test_stale_copy_is_served_while_revalidating(vault):
+    async def scenario(cache):
+        first = await cache.get("astronomy")
+        vault.version = 2
+        vault.corpora["astronomy"] = [{"id": "q3", "question": "Ringed planet?", "correct_answer": "Saturn"}]
+        await asyncio.sleep(0.05)
+        # Concurrent stale reads return at once and share one revalidation
+        stale = await asyncio.gather(*(cache.get("astronomy") for _ in range(5)))
+        assert all(questions is first for questions in stale)
+        while cache._background:
+            await asyncio.sleep(0.01)
+        return await cache.get("astronomy"), cache.stats()
+
+    refreshed, stats = run(vault, scenario, ttl_seconds=0.02, stale_while_revalidate=60)
+    assert refreshed[0]["id"] == "q3"
+    assert len(vault.requests) == 2
+    assert (stats["stale_hits"], stats["hits"]) == (5, 1)
+
+def test_stale_copy_is_served_when_upstream_fails(vault):
+    async def scenario(cache):
+        first = await cache.get("astronomy")
+        vault.failing = True
+        await asyncio.sleep(0.05)
+        assert await cache.get("astronomy") is first
+        with pytest.raises(CorpusUnavailable):
+            await cache.get("poetry")
+        return cache.stats()
+
+    stats = run(vault, scenario, ttl_seconds=0.01, stale_while_revalidate=0, stale_if_error=60)
+    assert (stats["stale_on_error"], stats["errors"]) == (1, 2)
+
+def test_copy_past_stale_if_error_is_not_served(vault):
+    async def scenario(cache):
+        await cache.get("astronomy")
+        vault.failing = True
+        await asyncio.sleep(0.05)
+        with pytest.raises(CorpusUnavailable):
+            await cache.get("astronomy")
+
+    run(vault, scenario, ttl_seconds=0.01, stale_while_revalidate=0, stale_if_error=0.01)
+
+def test_paginated_response_is_not_taken_as_the_corpus(vault):
+    vault.paginated = True
+
+    async def scenario(cache):
+        with pytest.raises(CorpusUnavailable):
+            await cache.get("astronomy")
+
+    run(vault, scenario)
+    assert vault.requests == ["/questions/astronomy"]
@@ -0,0 +1,53 @@
+import asyncio
+
+from api.models import Question
+from api.services.question_sampler import QuestionSampler
+
+def corpus(size: int, reverse: bool = False):
+    questions = [
+        Question(id=f"q{i:03d}", question=f"Question {i}?", correct_answer=f"Answer {i}")
+        for i in range(size)
+    ]
+    return questions[::-1] if reverse else questions
+
+class StubCache:
+    """
+    Stands in for QuestionCache with fixed corpora
+    """
+
+    def __init__(self, corpora):
+        self.corpora = corpora
+
+    async def get(self, category):
+        return self.corpora[category]
+
+def draw(sampler, count, seed):
+    questions, version = asyncio.run(sampler.sample("astronomy", count, seed))
+    return [question.id for question in questions], version
+
+def test_same_seed_reproduces_the_sample():
+    sampler = QuestionSampler(StubCache({"astronomy": corpus(100)}))
+    first = draw(sampler, 10, 12345)
+    assert draw(sampler, 10, 12345) == first
+    # Another process with the corpus in a different order draws the same
+    reordered = QuestionSampler(StubCache({"astronomy": corpus(100, reverse=True)}))
+    assert draw(reordered, 10, 12345) == first
+    assert len(set(first[0])) == 10
+
+def test_different_seeds_differ():
+    sampler = QuestionSampler(StubCache({"astronomy": corpus(100)}))
+    samples = {tuple(draw(sampler, 10, seed)[0]) for seed in range(20)}
+    assert len(samples) == 20
+
+def test_version_tracks_the_corpus():
+    cache = StubCache({"astronomy": corpus(100)})
+    sampler = QuestionSampler(cache)
+    version = draw(sampler, 10, 7)[1]
+    assert draw(sampler, 10, 7)[1] == version
+    cache.corpora["astronomy"] = corpus(101)
+    assert draw(sampler, 10, 7)[1] != version
+
+def test_count_is_clamped_to_the_corpus():
+    sampler = QuestionSampler(StubCache({"astronomy": corpus(3)}))
+    assert sorted(draw(sampler, 10, 1)[0]) == ["q000", "q001", "q002"]
+    assert draw(sampler, -1, 1)[0] == []
@@ -0,0 +1,45 @@
+import asyncio
+
+from api.services.literary_vault_client import CorpusFetch
+from api.services.question_snapshot import QuestionSnapshot
+
+class StubClient:
+    """
+    Serves fixed corpora in place of the Literary Vault API
+    """
+
+    def __init__(self, corpora):
+        self.corpora = corpora
+
+    async def fetch_corpus(self, category, etag=None, last_modified=None):
+        version = str(hash(repr(self.corpora[category])))
+        if etag == version:
+            return CorpusFetch(None, etag, None)
+        return CorpusFetch(self.corpora[category], version, None)
+
+def question(id_, text):
+    return {"id": id_, "question": text, "correct_answer": "a", "options": ["a", "b"]}
+
+def test_categories_may_reuse_ids(tmp_path):
+    client = StubClient({
+        "astronomy": [question("q1", "Closest star?"), question("q2", "Red planet?")],
+        "poetry": [question("q1", "Who wrote Ozymandias?")],
+    })
+    snapshot = QuestionSnapshot(str(tmp_path / "vault.db"), client)
+    results = asyncio.run(snapshot.sync(["astronomy", "poetry"]))
+    assert [(r.status, r.inserted) for r in results] == [("updated", 2), ("updated", 1)]
+
+    corpora = snapshot.load()
+    assert [q["question"] for q in corpora["astronomy"].questions] == ["Closest star?", "Red planet?"]
+    assert [(q["id"], q["question"]) for q in corpora["poetry"].questions] == [("q1", "Who wrote Ozymandias?")]
+
+    # Re-syncing one category leaves the other's question with the same id alone
+    client.corpora["poetry"] = [question("q1", "Who wrote The Raven?")]
+    client.corpora["astronomy"] = [question("q2", "Red planet?")]
+    results = asyncio.run(snapshot.sync(["astronomy", "poetry"]))
+    assert [(r.inserted, r.updated, r.deleted) for r in results] == [(0, 0, 1), (0, 1, 0)]
+    corpora = snapshot.load()
+    assert [q["id"] for q in corpora["astronomy"].questions] == ["q2"]
+    assert corpora["poetry"].questions[0]["question"] == "Who wrote The Raven?"
+
+    assert [r.status for r in asyncio.run(snapshot.sync(["astronomy", "poetry"]))] == ["unchanged"] * 2
@@ -0,0 +1,53 @@
+import asyncio
+import sqlite3
+import time
+
+from api.services.result_cache import ResultCache
+
+def rows(path):
+    with sqlite3.connect(path) as conn:
+        return dict(conn.execute('SELECT key, accessed_at FROM result_cache'))
+
+def test_entries_survive_a_restart(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = ResultCache("1", path=path)
+    asyncio.run(cache.aset_many([("a", {"n": 1}), ("b", {"n": 2})]))
+    cache.close()
+    reopened = ResultCache("1", path=path)
+    assert asyncio.run(reopened.aget_many(["a", "b", "c"])) == [{"n": 1}, {"n": 2}, None]
+    stats = reopened.stats()
+    assert (stats["hits"], stats["misses"], stats["persisted_entries"]) == (2, 1, 2)
+    assert ResultCache("2", path=path).get("a") is None
+
+def test_file_is_bounded_without_counting_rows(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = ResultCache("1", max_entries=3, path=path)
+    for i in range(5):
+        cache.set(f"k{i}", {"n": i})
+        time.sleep(0.01)
+    cache.set("k4", {"n": 40})
+    assert sorted(rows(path)) == ["k2", "k3", "k4"]
+    assert cache.stats()["persisted_entries"] == 3
+
+def test_disk_hits_update_recency_in_batches(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = ResultCache("1", path=path)
+    cache.set("a", {"n": 1})
+    written = rows(path)["a"]
+    cache.close()
+    cache = ResultCache("1", path=path)
+    time.sleep(0.01)
+    assert cache.get("a") == {"n": 1}
+    # Held back until the next write or close
+    assert rows(path)["a"] == written
+    cache.close()
+    assert rows(path)["a"] > written
+
+def test_expired_entries_are_dropped(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = ResultCache("1", ttl_seconds=0.05, path=path)
+    cache.set("a", {"n": 1})
+    time.sleep(0.06)
+    cache._entries.clear()
+    assert asyncio.run(cache.aget("a")) is None
+    assert cache.stats()["expirations"] == 1 and cache.stats()["persisted_entries"] == 0
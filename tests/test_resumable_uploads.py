@@ -0,0 +1,81 @@
+import hashlib
+
+import pytest
+
+from api.services.resumable_uploads import ChunkRejected, ResumableUploadStore, UploadIncomplete
+
+CHUNK = 1024
+
+@pytest.fixture
+def store(tmp_path):
+    return ResumableUploadStore(str(tmp_path / "uploads.db"), str(tmp_path / "parts"), chunk_size=CHUNK)
+
+def sha(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def test_streamed_chunks_assemble_the_file(store):
+    data = bytes(range(256)) * 10
+    upload = store.create(len(data), "model.npy", sha(data))
+    assert upload["missing_chunks"] == [0, 1, 2]
+    for index in upload["missing_chunks"]:
+        body = data[index * CHUNK:(index + 1) * CHUNK]
+        writer = store.start_chunk(upload["upload_id"], index)
+        for offset in range(0, len(body), 100):
+            writer.write(body[offset:offset + 100])
+        assert writer.commit(sha(body))["size"] == len(body)
+    path, digest, size, filename = store.begin_finalize(upload["upload_id"])
+    assert (digest, size, filename) == (sha(data), len(data), "model.npy")
+    with open(path, "rb") as part:
+        assert part.read() == data
+
+def test_bad_chunk_is_not_recorded(store):
+    upload_id = store.create(CHUNK)["upload_id"]
+    store.write_chunk(upload_id, 0, b"a" * CHUNK, sha(b"a" * CHUNK))
+    with pytest.raises(ChunkRejected):
+        store.write_chunk(upload_id, 0, b"b" * CHUNK, sha(b"c" * CHUNK))
+    # The resend overwrote the bytes, so the chunk must be sent again
+    assert store.status(upload_id)["missing_chunks"] == [0]
+    with pytest.raises(ChunkRejected):
+        store.start_chunk(upload_id, 0).write(b"a" * (CHUNK + 1))
+
+def test_finalize_waits_for_chunks_being_written(store):
+    upload_id = store.create(CHUNK)["upload_id"]
+    store.write_chunk(upload_id, 0, b"a" * CHUNK, sha(b"a" * CHUNK))
+    writer = store.start_chunk(upload_id, 0)
+    with pytest.raises(UploadIncomplete):
+        store.begin_finalize(upload_id)
+    writer.write(b"b" * CHUNK)
+    writer.commit(sha(b"b" * CHUNK))
+    store.begin_finalize(upload_id)
+
+def test_chunks_are_rejected_while_finalizing(store):
+    upload_id = store.create(2 * CHUNK)["upload_id"]
+    store.write_chunk(upload_id, 0, b"a" * CHUNK, sha(b"a" * CHUNK))
+    store.write_chunk(upload_id, 1, b"b" * CHUNK, sha(b"b" * CHUNK))
+    store.begin_finalize(upload_id)
+    with pytest.raises(UploadIncomplete):
+        store.start_chunk(upload_id, 0)
+    store.abort_finalize(upload_id)
+    store.write_chunk(upload_id, 0, b"a" * CHUNK, sha(b"a" * CHUNK))
+
+def test_resent_chunk_supersedes_an_unfinished_write(store):
+    upload_id = store.create(CHUNK)["upload_id"]
+    stale = store.start_chunk(upload_id, 0)
+    stale.write(b"a" * CHUNK)
+    store.write_chunk(upload_id, 0, b"b" * CHUNK, sha(b"b" * CHUNK))
+    with pytest.raises(ChunkRejected):
+        stale.commit(sha(b"a" * CHUNK))
+    assert store.status(upload_id)["missing_chunks"] == []
+
+def test_resend_after_a_restart_can_be_finalized(store, tmp_path):
+    data = b"c" * CHUNK
+    upload_id = store.create(CHUNK, sha256=sha(data))["upload_id"]
+    # The server dies mid-chunk: the write marker is never cleared
+    writer = store.start_chunk(upload_id, 0)
+    writer.write(data[:100])
+    writer._part.close()
+    restarted = ResumableUploadStore(str(tmp_path / "uploads.db"), str(tmp_path / "parts"), chunk_size=CHUNK)
+    assert restarted.status(upload_id)["missing_chunks"] == [0]
+    restarted.write_chunk(upload_id, 0, data, sha(data))
+    _, digest, size, _ = restarted.begin_finalize(upload_id)
+    assert (digest, size) == (sha(data), CHUNK)
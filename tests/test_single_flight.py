@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from api.services.single_flight import SingleFlight
+
+def test_concurrent_calls_share_one_result():
+    flights = SingleFlight()
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return object()
+
+    async def main():
+        return await asyncio.gather(*(flights.run("key", call) for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert len(calls) == 1 and all(result is results[0] for result in results)
+    assert flights.stats() == {"upstream_calls": 1, "coalesced": 4, "in_flight": 0, "errors": 0}
+
+def test_errors_are_shared_and_not_kept():
+    flights = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0)
+        raise ValueError("upstream down")
+
+    async def main():
+        results = await asyncio.gather(*(flights.run("key", fail) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+        assert await flights.run("key", lambda: asyncio.sleep(0, "ok")) == "ok"
+
+    asyncio.run(main())
+    assert (flights.calls, flights.coalesced, flights.errors) == (2, 2, 1)
+
+def test_cancelled_caller_does_not_cancel_the_call():
+    flights = SingleFlight()
+
+    async def main():
+        first = asyncio.ensure_future(flights.run("key", lambda: asyncio.sleep(0.02, "done")))
+        second = asyncio.ensure_future(flights.run("key", lambda: asyncio.sleep(0.02, "other")))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "done"
@@ -0,0 +1,27 @@
+import asyncio
+import hashlib
+import io
+
+from fastapi import UploadFile
+
+from api.services.uploads import receive_upload
+
+def receive(data: bytes, tmp_path, max_memory: int):
+    upload = UploadFile(io.BytesIO(data), filename="model.npy")
+    return asyncio.run(receive_upload(upload, chunk_size=1000, max_memory=max_memory, directory=str(tmp_path)))
+
+def test_small_upload_stays_in_memory(tmp_path):
+    data = b"x" * 2500
+    with receive(data, tmp_path, max_memory=4096) as spooled:
+        assert spooled.in_memory and spooled.getvalue() == data
+        assert (spooled.size, spooled.sha256) == (len(data), hashlib.sha256(data).hexdigest())
+
+def test_large_upload_is_spooled_to_disk(tmp_path):
+    data = bytes(range(256)) * 40
+    with receive(data, tmp_path, max_memory=4096) as spooled:
+        assert not spooled.in_memory
+        assert spooled.sha256 == hashlib.sha256(data).hexdigest()
+        with open(spooled.path, "rb") as part:
+            assert part.read() == data
+        path = spooled.path
+    assert not (tmp_path / path).exists()
@@ -0,0 +1,88 @@
+import io
+
+import numpy as np
+import pytest
+
+from api.services.model_readers import open_model_buffer, open_reader
+from api.services.weight_stats import _chunk_moments, _merge_moments, layer_anomalies, layer_stats
+
+def stats_of(array: np.ndarray, name: str = "w", chunk_elements: int = 1 << 16):
+    out = io.BytesIO()
+    np.savez(out, **{name: array})
+    data = out.getvalue()
+    with open_model_buffer(data) as buffer:
+        reader = open_reader("npz", buffer, data)
+        return layer_stats(reader, reader.tensors[0], chunk_elements=chunk_elements)
+
+def anomalies(array: np.ndarray, name: str = "w"):
+    return layer_anomalies(stats_of(array, name))
+
+def trained(shape, seed=0) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal(shape).astype(np.float32) * 0.02
+
+@pytest.mark.parametrize("split", [1, 7, 1000])
+def test_merged_moments_match_numpy(split):
+    # Far-off mean: naive power sums would lose the central moments
+    values = np.random.default_rng(1).standard_normal(10007) * 3.0 + 1e4
+    moments = (0, 0.0, 0.0, 0.0, 0.0)
+    for chunk in np.array_split(values, split):
+        moments = _merge_moments(moments, _chunk_moments(chunk, float(chunk.sum())))
+    count, mean, m2, m3, m4 = moments
+    deviation = values - values.mean()
+    assert count == values.size
+    assert mean == pytest.approx(np.mean(values), rel=1e-12)
+    assert m2 / count == pytest.approx(np.var(values), rel=1e-9)
+    assert m3 / count == pytest.approx(np.mean(deviation ** 3), rel=1e-6, abs=1e-6)
+    assert m4 / count == pytest.approx(np.mean(deviation ** 4), rel=1e-9)
+
+def test_chunked_layer_stats_match_numpy():
+    values = trained((300, 70)) + 0.5
+    stats = stats_of(values, chunk_elements=999)
+    assert stats.mean == pytest.approx(float(np.mean(values, dtype=np.float64)), rel=1e-6)
+    assert stats.std == pytest.approx(float(np.std(values, dtype=np.float64)), rel=1e-5)
+
+def test_trained_layers_are_not_flagged():
+    assert anomalies(trained((256, 128))) == []
+    assert anomalies(trained(512)) == []
+
+def test_non_finite_weights():
+    values = trained((64, 64))
+    values[0, :3] = [np.nan, np.inf, -np.inf]
+    assert anomalies(values) == ["Layer w contains 3 non-finite weights"]
+
+def test_small_layers_are_only_checked_for_non_finite_values():
+    assert anomalies(np.zeros((4, 8), dtype=np.float32)) == []
+
+def test_constant_matrix():
+    assert anomalies(np.full((32, 32), 0.5, dtype=np.float32)) == ["Layer w is constant (0.5)"]
+
+@pytest.mark.parametrize("values", [np.zeros(64), np.ones(768), np.zeros(4096)])
+def test_zero_biases_and_norm_weights_are_normal(values):
+    assert anomalies(values.astype(np.float32), "b") == []
+
+def test_sparse_matrix():
+    values = trained((64, 64))
+    values[:, 4:] = 0
+    assert anomalies(values)[0] == "Layer w is 94% zeros"
+
+def test_sparse_vector_is_not_flagged_for_sparsity():
+    values = np.zeros(1024, dtype=np.float32)
+    values[:50] = trained(50)
+    assert not any("zeros" in anomaly for anomaly in anomalies(values, "b"))
+
+def test_outliers_and_heavy_tails():
+    values = trained((128, 128))
+    values[0, :20] = 10.0
+    found = anomalies(values)
+    assert any("beyond 6 standard deviations" in anomaly for anomaly in found)
+    assert any("heavy-tailed" in anomaly for anomaly in found)
+
+def test_dominant_direction():
+    rng = np.random.default_rng(2)
+    values = np.outer(rng.standard_normal(512), rng.standard_normal(256)).astype(np.float32)
+    assert any("dominated by one direction" in anomaly for anomaly in anomalies(values))
+
+def test_dead_units():
+    values = trained((64, 64))
+    values[:40] = 0
+    assert "Layer w has 62% dead units" in anomalies(values)